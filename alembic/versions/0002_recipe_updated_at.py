@@ -0,0 +1,23 @@
+"""add recipes.updated_at for HTTP cache validators
+
+Revision ID: 0002_recipe_updated_at
+Revises: 0001_create_tables
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_recipe_updated_at"
+down_revision = "0001_create_tables"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("recipes", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE recipes SET updated_at = created_at")
+    op.create_index("ix_recipes_updated_at", "recipes", ["updated_at"])
+
+def downgrade():
+    op.drop_index("ix_recipes_updated_at", table_name="recipes")
+    with op.batch_alter_table("recipes") as batch_op:
+        batch_op.drop_column("updated_at")
@@ -0,0 +1,31 @@
+"""add provider_stats for per-domain import routing
+
+Revision ID: 0003_provider_stats
+Revises: 0002_recipe_updated_at
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_provider_stats"
+down_revision = "0002_recipe_updated_at"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "provider_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("domain", sa.String(length=255), nullable=False),
+        sa.Column("provider", sa.String(length=20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("successes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_latency_ms", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("total_completeness", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("last_attempt_at", sa.DateTime(), nullable=True),
+        sa.Column("last_success_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("domain", "provider", name="uq_provider_stat_domain"),
+    )
+
+def downgrade():
+    op.drop_table("provider_stats")
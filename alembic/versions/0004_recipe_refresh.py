@@ -0,0 +1,45 @@
+"""add source page state and recipe_revisions for scheduled refreshes
+
+Revision ID: 0004_recipe_refresh
+Revises: 0003_provider_stats
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_recipe_refresh"
+down_revision = "0003_provider_stats"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table("recipes") as batch_op:
+        batch_op.add_column(sa.Column("source_etag", sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column("source_last_modified", sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column("source_hash", sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column("source_status", sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column("last_checked_at", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("check_failures", sa.Integer(), nullable=False, server_default="0"))
+        batch_op.add_column(sa.Column("view_count", sa.Integer(), nullable=False, server_default="0"))
+    op.create_index("ix_recipes_last_checked_at", "recipes", ["last_checked_at"])
+
+    op.create_table(
+        "recipe_revisions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("recipe_id", sa.Integer(), sa.ForeignKey("recipes.id"), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="pending"),
+        sa.Column("method", sa.String(length=20), nullable=True),
+        sa.Column("changes", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("reviewed_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_recipe_revisions_recipe_id", "recipe_revisions", ["recipe_id"])
+
+def downgrade():
+    op.drop_index("ix_recipe_revisions_recipe_id", table_name="recipe_revisions")
+    op.drop_table("recipe_revisions")
+    op.drop_index("ix_recipes_last_checked_at", table_name="recipes")
+    with op.batch_alter_table("recipes") as batch_op:
+        for column in ("view_count", "check_failures", "last_checked_at", "source_status",
+                       "source_hash", "source_last_modified", "source_etag"):
+            batch_op.drop_column(column)
@@ -0,0 +1,81 @@
+"""add derived total time, servings range and ingredient count to recipes
+
+Revision ID: 0005_recipe_derived_fields
+Revises: 0004_recipe_refresh
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.derived import derived_fields
+
+revision = "0005_recipe_derived_fields"
+down_revision = "0004_recipe_refresh"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+recipes = sa.table(
+    "recipes",
+    sa.column("id", sa.Integer),
+    sa.column("prep_time_minutes", sa.Integer),
+    sa.column("cook_time_minutes", sa.Integer),
+    sa.column("servings", sa.String),
+    sa.column("ingredients", sa.Text),
+    sa.column("total_time_minutes", sa.Integer),
+    sa.column("servings_min", sa.Integer),
+    sa.column("servings_max", sa.Integer),
+    sa.column("ingredient_count", sa.Integer),
+)
+
+def upgrade():
+    with op.batch_alter_table("recipes") as batch_op:
+        batch_op.add_column(sa.Column("total_time_minutes", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("servings_min", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("servings_max", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("ingredient_count", sa.Integer(), nullable=True))
+
+    # Keyset batches, so memory and lock time stay flat on large collections;
+    # indexes are created afterwards instead of being maintained row by row
+    conn = op.get_bind()
+    update = (
+        recipes.update()
+        .where(recipes.c.id == sa.bindparam("row_id"))
+        .values(
+            total_time_minutes=sa.bindparam("total_time_minutes"),
+            servings_min=sa.bindparam("servings_min"),
+            servings_max=sa.bindparam("servings_max"),
+            ingredient_count=sa.bindparam("ingredient_count"),
+        )
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(
+                recipes.c.id, recipes.c.prep_time_minutes, recipes.c.cook_time_minutes,
+                recipes.c.servings, recipes.c.ingredients,
+            )
+            .where(recipes.c.id > last_id)
+            .order_by(recipes.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(update, [
+            {"row_id": row.id, **derived_fields(row.prep_time_minutes, row.cook_time_minutes, row.servings, row.ingredients)}
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+    op.create_index("ix_recipes_total_time_minutes", "recipes", ["total_time_minutes"])
+    op.create_index("ix_recipes_ingredient_count", "recipes", ["ingredient_count"])
+    op.create_index("ix_recipes_servings", "recipes", ["servings_max", "servings_min"])
+
+def downgrade():
+    op.drop_index("ix_recipes_servings", table_name="recipes")
+    op.drop_index("ix_recipes_ingredient_count", table_name="recipes")
+    op.drop_index("ix_recipes_total_time_minutes", table_name="recipes")
+    with op.batch_alter_table("recipes") as batch_op:
+        for column in ("ingredient_count", "servings_max", "servings_min", "total_time_minutes"):
+            batch_op.drop_column(column)
@@ -0,0 +1,34 @@
+"""add page_snapshots for the compressed page archive
+
+Revision ID: 0006_page_snapshots
+Revises: 0005_recipe_derived_fields
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_page_snapshots"
+down_revision = "0005_recipe_derived_fields"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "page_snapshots",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("url", sa.String(length=500), nullable=False),
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.Column("codec", sa.String(length=10), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("stored_size", sa.Integer(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(), nullable=True),
+        sa.Column("recipe_id", sa.Integer(), sa.ForeignKey("recipes.id"), nullable=True),
+        sa.UniqueConstraint("url", "digest", name="uq_page_snapshot_url_digest"),
+    )
+    op.create_index("ix_page_snapshots_url", "page_snapshots", ["url"])
+    op.create_index("ix_page_snapshots_recipe_id", "page_snapshots", ["recipe_id"])
+
+def downgrade():
+    op.drop_index("ix_page_snapshots_recipe_id", table_name="page_snapshots")
+    op.drop_index("ix_page_snapshots_url", table_name="page_snapshots")
+    op.drop_table("page_snapshots")
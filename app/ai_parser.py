@@ -1,12 +1,13 @@
 import os
 import json
-from typing import Dict, Any
-from bs4 import BeautifulSoup
-from dotenv import load_dotenv
-import requests
-import google.generativeai as genai
+from functools import lru_cache, partial
+from typing import Callable, Dict, Any, List, Optional
 
-load_dotenv()
+from .chunking import AI_CHUNK_THRESHOLD, AI_CHUNKING, extract_in_chunks
+from .health import breakers, guard
+
+# Provider SDKs, BeautifulSoup and requests are imported on first use,
+# because together they dominate cold-start time. (.env is loaded in app/__init__.py)
 
 # API Keys
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -17,16 +18,41 @@ AI_MODEL_PROVIDER = os.getenv("AI_MODEL_PROVIDER", "ollama").lower()
 # Ollama configuration
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
+# Seconds; a host that is down fails on connect instead of waiting out the read timeout
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "3"))
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "60"))
 
-# Configure Gemini if key is available
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+# Gemini configuration; GEMINI_API_ENDPOINT points the SDK at another host,
+# e.g. the local stand-in server in benchmarks/fake_providers.py
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-pro")
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT") or None
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
 
-def clean_html(html_content: str) -> str:
+# Page text sent in a single prompt when chunking is off or the page is short
+MAX_PAGE_CHARS = int(os.getenv("AI_MAX_PAGE_CHARS", "50000"))
+
+
+@lru_cache(maxsize=None)
+def get_genai():
+    """Import and configure the Gemini SDK once, on first use."""
+    import google.generativeai as genai
+
+    if GEMINI_API_KEY:
+        options = {"api_key": GEMINI_API_KEY}
+        if GEMINI_API_ENDPOINT:
+            # Only the REST transport can talk plain HTTP to a custom endpoint
+            options.update(transport="rest", client_options={"api_endpoint": GEMINI_API_ENDPOINT})
+        genai.configure(**options)
+    return genai
+
+
+def page_text(html_content: str) -> str:
     """
-    Clean HTML content to reduce token usage.
-    Removes scripts, styles, and other non-content elements.
+    Visible page text with structure preserved, without scripts, styles,
+    navigation and other non-content elements.
     """
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html_content, "html.parser")
     
     # Remove script and style elements
@@ -34,29 +60,61 @@ def clean_html(html_content: str) -> str:
         script.decompose()
         
     # Get text content with some structure preservation
-    text = soup.get_text(separator="\n", strip=True)
-    
+    return soup.get_text(separator="\n", strip=True)
+
+
+def clean_html(html_content: str) -> str:
+    """
+    Clean HTML content to reduce token usage.
+    Removes scripts, styles, and other non-content elements.
+    """
     # Truncate if too long (rough token estimation)
-    # Grok has a large context window, but let's be reasonable
-    return text[:50000] 
+    return page_text(html_content)[:MAX_PAGE_CHARS]
 
-def parse_recipe_with_ai(url: str, html_content: str) -> Dict[str, Any]:
+def parse_recipe_with_ai(url: str, html_content: str, provider: Optional[str] = None) -> Dict[str, Any]:
     """
-    Parse recipe data from HTML content using the configured AI provider.
-    Supports: ollama or gemini
+    Parse recipe data from HTML content using an AI provider.
+    Supports: ollama or gemini (defaults to AI_MODEL_PROVIDER)
     """
-    cleaned_text = clean_html(html_content)
-    
-    if AI_MODEL_PROVIDER == "ollama":
-        return parse_with_ollama(url, cleaned_text)
-    elif AI_MODEL_PROVIDER == "gemini":
-        return parse_with_gemini(url, cleaned_text)
+    provider = (provider or AI_MODEL_PROVIDER).lower()
+
+    if provider == "ollama":
+        parse = parse_with_ollama
+    elif provider == "gemini":
+        parse = parse_with_gemini
     else:
-        raise ValueError(f"Unknown AI provider: {AI_MODEL_PROVIDER}. Use 'ollama' or 'gemini'")
+        raise ValueError(f"Unknown AI provider: {provider}. Use 'ollama' or 'gemini'")
+
+    text = page_text(html_content)
+    # Long pages: extract from the most recipe-like windows instead of the first 50k characters
+    if AI_CHUNKING and len(text) > AI_CHUNK_THRESHOLD:
+        return parse_in_chunks(url, text, provider, parse)
+    return parse(url, text[:MAX_PAGE_CHARS])
+
+
+def parse_in_chunks(url: str, text: str, provider: str, parse: Callable[..., Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    extract_in_chunks with the provider's breaker checked and updated once for
+    the whole page, so one bad page counts as one failure rather than one per
+    chunk call. As for a single call, only request errors count.
+    """
+    breaker = breakers[provider]
+    breaker.check()
+    outcomes: List[Optional[BaseException]] = []
+    try:
+        return extract_in_chunks(url, text, partial(parse, outcomes=outcomes))
+    finally:
+        breaker.record_calls(outcomes)
+
 
+def parse_with_ollama(url: str, cleaned_text: str, outcomes: Optional[List] = None) -> Dict[str, Any]:
+    """
+    Parse recipe using local Ollama model. Raises ProviderUnavailable while
+    the Ollama breaker is open, and on request or JSON errors. Only request
+    errors count against the breaker; ``outcomes`` is passed on to guard.
+    """
+    import requests
 
-def parse_with_ollama(url: str, cleaned_text: str) -> Dict[str, Any]:
-    """Parse recipe using local Ollama model"""
     prompt = f"""
     You are a recipe extraction API. Output ONLY valid JSON with these keys:
     - title: str
@@ -88,56 +146,23 @@ def parse_with_ollama(url: str, cleaned_text: str) -> Dict[str, Any]:
         "format": "json"
     }
 
-    try:
-        resp = requests.post(f"{OLLAMA_HOST}/api/chat", json=body, timeout=60)
+    with guard("ollama", outcomes):
+        resp = requests.post(f"{OLLAMA_HOST}/api/chat", json=body, timeout=(OLLAMA_CONNECT_TIMEOUT, OLLAMA_TIMEOUT))
         resp.raise_for_status()
         data = resp.json()
 
-        message = data.get("message", {}).get("content", "")
-        if not message:
-            raise ValueError("No response content from Ollama")
+    message = data.get("message", {}).get("content", "")
+    if not message:
+        raise ValueError("No response content from Ollama")
+    return recipe_from_json(url, json.loads(message.strip()))
 
-        content = message.strip()
-        parsed = json.loads(content)
-        
-        # Ensure newlines are actual newlines, not escaped strings
-        ingredients = parsed.get("ingredients") or ""
-        instructions = parsed.get("instructions") or ""
-        
-        # If the AI returned literal \n strings, replace them with actual newlines
-        if isinstance(ingredients, str) and "\\n" in ingredients:
-            ingredients = ingredients.replace("\\n", "\n")
-        if isinstance(instructions, str) and "\\n" in instructions:
-            instructions = instructions.replace("\\n", "\n")
-        
-        # Clean up tab characters and extra whitespace
-        if isinstance(ingredients, str):
-            ingredients = ingredients.replace("\t", "").replace("\r", "")
-            lines = [" ".join(line.split()) for line in ingredients.split("\n")]
-            ingredients = "\n".join(line for line in lines if line.strip())
-        
-        if isinstance(instructions, str):
-            instructions = instructions.replace("\t", "").replace("\r", "")
-            lines = [" ".join(line.split()) for line in instructions.split("\n")]
-            instructions = "\n".join(line for line in lines if line.strip())
-
-        return {
-            "title": parsed.get("title") or "",
-            "source_url": url,
-            "ingredients": ingredients,
-            "instructions": instructions,
-            "prep_time_minutes": parsed.get("prep_time_minutes"),
-            "cook_time_minutes": parsed.get("cook_time_minutes"),
-            "servings": str(parsed.get("servings") or ""),
-            "image_url": parsed.get("image_url") or "",
-        }
-    except Exception as e:
-        print(f"Ollama parsing error: {e}")
-        return {}
-
-
-def parse_with_gemini(url: str, cleaned_text: str) -> Dict[str, Any]:
-    """Parse recipe using Google Gemini"""
+
+def parse_with_gemini(url: str, cleaned_text: str, outcomes: Optional[List] = None) -> Dict[str, Any]:
+    """
+    Parse recipe using Google Gemini. Raises ProviderUnavailable while the
+    Gemini breaker is open, and on request or JSON errors. As in
+    parse_with_ollama, only request errors count against the breaker.
+    """
     if not GEMINI_API_KEY:
         raise ValueError("GEMINI_API_KEY not set")
     
@@ -174,59 +199,46 @@ def parse_with_gemini(url: str, cleaned_text: str) -> Dict[str, Any]:
     {cleaned_text}
     """
     
-    try:
-        model = genai.GenerativeModel('gemini-pro')
-        response = model.generate_content(prompt)
-        
-        content = response.text.strip()
-        
-        # Remove markdown code blocks if present
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
-        
-        parsed = json.loads(content)
-        
-        # Ensure newlines are actual newlines, not escaped strings
-        ingredients = parsed.get("ingredients") or ""
-        instructions = parsed.get("instructions") or ""
-        
-        # If the AI returned literal \n strings, replace them with actual newlines
-        if isinstance(ingredients, str) and "\\n" in ingredients:
-            ingredients = ingredients.replace("\\n", "\n")
-        if isinstance(instructions, str) and "\\n" in instructions:
-            instructions = instructions.replace("\\n", "\n")
-        
-        # Clean up tab characters and extra whitespace
-        if isinstance(ingredients, str):
-            ingredients = ingredients.replace('\\t', '').replace('\t', '')
-            ingredients = ingredients.replace('\\r', '').replace('\r', '')
-            lines = [' '.join(line.split()) for line in ingredients.split('\n')]
-            ingredients = '\n'.join(line for line in lines if line.strip())
-        
-        if isinstance(instructions, str):
-            instructions = instructions.replace('\\t', '').replace('\t', '')
-            instructions = instructions.replace('\\r', '').replace('\r', '')
-            lines = [' '.join(line.split()) for line in instructions.split('\n')]
-            instructions = '\n'.join(line for line in lines if line.strip())
-        
-        return {
-            "title": parsed.get("title") or "",
-            "source_url": url,
-            "ingredients": ingredients,
-            "instructions": instructions,
-            "prep_time_minutes": parsed.get("prep_time_minutes"),
-            "cook_time_minutes": parsed.get("cook_time_minutes"),
-            "servings": str(parsed.get("servings") or ""),
-            "image_url": parsed.get("image_url") or "",
-        }
-    except Exception as e:
-        print(f"Gemini parsing error: {e}")
-        return {}
-
-
-
+    with guard("gemini", outcomes):
+        model = get_genai().GenerativeModel(GEMINI_MODEL)
+        response = model.generate_content(prompt, request_options={"timeout": GEMINI_TIMEOUT})
+        content = response.text
+
+    return recipe_from_json(url, json.loads(strip_code_fence(content)))
+
+
+def strip_code_fence(content: str) -> str:
+    """Model output without the markdown code block it is sometimes wrapped in."""
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.startswith("```"):
+        content = content[3:]
+    if content.endswith("```"):
+        content = content[:-3]
+    return content.strip()
+
+
+def _clean_lines(text) -> str:
+    """One ingredient or step per line, from text the model may have escaped or padded."""
+    if not isinstance(text, str):
+        return text
+    # If the AI returned literal \n strings, replace them with actual newlines
+    text = text.replace("\\n", "\n")
+    text = text.replace("\\t", "").replace("\t", "").replace("\\r", "").replace("\r", "")
+    lines = [" ".join(line.split()) for line in text.split("\n")]
+    return "\n".join(line for line in lines if line.strip())
+
+
+def recipe_from_json(url: str, parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """Recipe data in the importer's shape from one JSON object returned by a provider."""
+    return {
+        "title": parsed.get("title") or "",
+        "source_url": url,
+        "ingredients": _clean_lines(parsed.get("ingredients") or ""),
+        "instructions": _clean_lines(parsed.get("instructions") or ""),
+        "prep_time_minutes": parsed.get("prep_time_minutes"),
+        "cook_time_minutes": parsed.get("cook_time_minutes"),
+        "servings": str(parsed.get("servings") or ""),
+        "image_url": parsed.get("image_url") or "",
+    }
@@ -0,0 +1,256 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .crud import apply_filters, apply_search, create_recipe_record
+from .database import get_db
+from .image_cache import image_cache
+from .models import Category, Recipe, RecipeCategory, RecipeRevision
+from .refresh import apply_revision, refresh_recipe, reject_revision
+from .routing import domain_of, domain_stats, override_for
+from .shopping import build_shopping_list
+from .schemas import (
+    CategoryOut,
+    RecipeCreate,
+    RecipeOut,
+    RecipePage,
+    RevisionOut,
+    ShoppingListOut,
+    ShoppingListRequest,
+)
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, default=lambda value: value.isoformat(), separators=(",", ":")).encode("utf-8")
+
+
+# Handlers return FastJSONResponse directly so FastAPI skips jsonable_encoder
+# and response-model validation; the Pydantic models document the shapes.
+router = APIRouter(prefix="/api/v1", tags=["api"], default_response_class=FastJSONResponse)
+
+RECIPE_FIELDS = tuple(RecipeOut.model_fields)
+COLUMN_FIELDS = tuple(field for field in RECIPE_FIELDS if field != "categories")
+# Lists leave out the large text blobs unless they are asked for with ?fields=
+SUMMARY_FIELDS = tuple(field for field in RECIPE_FIELDS if field not in ("ingredients", "instructions"))
+
+MAX_PAGE_SIZE = 100
+
+
+def _parse_fields(fields: Optional[str], default: Sequence[str]) -> Tuple[str, ...]:
+    """Turn ?fields=a,b into an ordered tuple of known field names, always starting with id."""
+    if not fields:
+        return tuple(default)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in RECIPE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id"] + requested))
+
+
+def _encode_cursor(recipe_id: int) -> str:
+    return base64.urlsafe_b64encode(str(recipe_id).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _select(db: Session, fields: Sequence[str]):
+    """Query only the requested columns; rows are tuples, not ORM instances."""
+    return db.query(*[getattr(Recipe, name) for name in fields if name in COLUMN_FIELDS])
+
+
+def _to_items(db: Session, rows, fields: Sequence[str]) -> List[Dict[str, Any]]:
+    names = [name for name in fields if name in COLUMN_FIELDS]
+    items = [dict(zip(names, row)) for row in rows]
+
+    if "categories" in fields and items:
+        by_id = {}
+        for item in items:
+            item["categories"] = []
+            by_id[item["id"]] = item
+        links = (
+            db.query(RecipeCategory.recipe_id, Category.id, Category.name, Category.color)
+            .join(Category, Category.id == RecipeCategory.category_id)
+            .filter(RecipeCategory.recipe_id.in_(list(by_id)))
+            .order_by(Category.name)
+        )
+        for recipe_id, category_id, name, color in links:
+            by_id[recipe_id]["categories"].append({"id": category_id, "name": name, "color": color})
+    return items
+
+
+def _page(db: Session, query, fields: Sequence[str], cursor: Optional[str], limit: int) -> Dict[str, Any]:
+    """Keyset pagination on id, newest first."""
+    if cursor:
+        query = query.filter(Recipe.id < _decode_cursor(cursor))
+    rows = query.order_by(Recipe.id.desc()).limit(limit + 1).all()
+    next_cursor = _encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+    return {"items": _to_items(db, rows[:limit], fields), "next_cursor": next_cursor}
+
+
+def _get_one(db: Session, recipe_id: int, fields: Sequence[str]) -> Dict[str, Any]:
+    row = _select(db, fields).filter(Recipe.id == recipe_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return _to_items(db, [row], fields)[0]
+
+
+@router.get("/recipes", response_model=None, responses={200: {"model": RecipePage}})
+def api_list_recipes(
+    fields: Optional[str] = None,
+    category_id: Optional[int] = None,
+    max_time: Optional[int] = Query(None, ge=0, description="Total prep + cook minutes at most"),
+    min_servings: Optional[int] = Query(None, ge=1),
+    max_servings: Optional[int] = Query(None, ge=1),
+    max_ingredients: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    selected = _parse_fields(fields, SUMMARY_FIELDS)
+    query = apply_filters(
+        _select(db, selected),
+        max_time=max_time,
+        min_servings=min_servings,
+        max_servings=max_servings,
+        max_ingredients=max_ingredients,
+    )
+    if category_id:
+        query = query.join(RecipeCategory, RecipeCategory.recipe_id == Recipe.id).filter(
+            RecipeCategory.category_id == category_id
+        )
+    return FastJSONResponse(_page(db, query, selected, cursor, limit))
+
+
+@router.get("/recipes/search", response_model=None, responses={200: {"model": RecipePage}})
+def api_search_recipes(
+    q: str = Query(..., min_length=1),
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    selected = _parse_fields(fields, SUMMARY_FIELDS)
+    return FastJSONResponse(_page(db, apply_search(_select(db, selected), q), selected, cursor, limit))
+
+
+@router.get("/recipes/{recipe_id}", response_model=None, responses={200: {"model": RecipeOut}})
+def api_get_recipe(recipe_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    return FastJSONResponse(_get_one(db, recipe_id, _parse_fields(fields, RECIPE_FIELDS)))
+
+
+@router.post("/recipes", status_code=201, response_model=None, responses={201: {"model": RecipeOut}})
+def api_create_recipe(payload: RecipeCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    try:
+        recipe = create_recipe_record(db, **payload.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    background_tasks.add_task(image_cache.prefetch, recipe.image_url)
+    return FastJSONResponse(_get_one(db, recipe.id, RECIPE_FIELDS), status_code=201)
+
+
+@router.get("/categories", response_model=None, responses={200: {"model": List[CategoryOut]}})
+def api_list_categories(db: Session = Depends(get_db)):
+    rows = (
+        db.query(Category.id, Category.name, Category.color, func.count(RecipeCategory.id))
+        .outerjoin(RecipeCategory, RecipeCategory.category_id == Category.id)
+        .group_by(Category.id)
+        .order_by(Category.name)
+        .all()
+    )
+    return FastJSONResponse(
+        [{"id": id_, "name": name, "color": color, "recipe_count": count} for id_, name, color, count in rows]
+    )
+
+
+@router.post("/shopping-list", response_model=None, responses={200: {"model": ShoppingListOut}})
+def api_shopping_list(payload: ShoppingListRequest, db: Session = Depends(get_db)):
+    selection = [(item.id, item.servings) for item in payload.recipes]
+    return FastJSONResponse(build_shopping_list(db, selection))
+
+
+@router.get("/routing/{domain}")
+def api_domain_routing(domain: str, db: Session = Depends(get_db)):
+    """Recorded import outcomes for a domain, in the order the router would try them."""
+    domain = domain_of(f"https://{domain}")
+    return FastJSONResponse({"domain": domain, "override": override_for(domain), "stats": domain_stats(db, domain)})
+
+
+def _revision_out(revision: RecipeRevision) -> Dict[str, Any]:
+    return {
+        "id": revision.id,
+        "recipe_id": revision.recipe_id,
+        "status": revision.status,
+        "method": revision.method,
+        "changes": json.loads(revision.changes),
+        "created_at": revision.created_at,
+        "reviewed_at": revision.reviewed_at,
+    }
+
+
+def _pending_revision(db: Session, revision_id: int) -> RecipeRevision:
+    revision = db.get(RecipeRevision, revision_id)
+    if not revision:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    if revision.status != "pending":
+        raise HTTPException(status_code=409, detail=f"Revision already {revision.status}")
+    return revision
+
+
+@router.post("/recipes/{recipe_id}/refresh")
+def api_refresh_recipe(recipe_id: int, db: Session = Depends(get_db)):
+    """Check the recipe's source page now, outside the refresh schedule."""
+    outcome = refresh_recipe(db, recipe_id)
+    if outcome == "missing":
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return FastJSONResponse({"recipe_id": recipe_id, "outcome": outcome})
+
+
+@router.get("/revisions", response_model=None, responses={200: {"model": List[RevisionOut]}})
+def api_list_revisions(
+    status: str = "pending",
+    recipe_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    """Changes found by source refreshes, newest first."""
+    query = db.query(RecipeRevision).filter(RecipeRevision.status == status)
+    if recipe_id:
+        query = query.filter(RecipeRevision.recipe_id == recipe_id)
+    revisions = query.order_by(RecipeRevision.id.desc()).limit(limit).all()
+    return FastJSONResponse([_revision_out(revision) for revision in revisions])
+
+
+@router.post("/revisions/{revision_id}/apply", response_model=None, responses={200: {"model": RevisionOut}})
+def api_apply_revision(revision_id: int, db: Session = Depends(get_db)):
+    revision = _pending_revision(db, revision_id)
+    apply_revision(db, revision)
+    return FastJSONResponse(_revision_out(revision))
+
+
+@router.post("/revisions/{revision_id}/reject", response_model=None, responses={200: {"model": RevisionOut}})
+def api_reject_revision(revision_id: int, db: Session = Depends(get_db)):
+    revision = _pending_revision(db, revision_id)
+    reject_revision(db, revision)
+    return FastJSONResponse(_revision_out(revision))
@@ -0,0 +1,119 @@
+"""
+Compressed, content-addressed archive of fetched recipe pages.
+
+Every page fetched for an import or refresh is stored once per distinct
+content under PAGE_ARCHIVE_DIR/blobs/<aa>/<sha256>.<codec>. A page_snapshots
+row links each URL to its blobs and, once it is saved, to the recipe. Blobs
+are zstd-compressed when the zstandard package is installed and gzip
+otherwise. The codec is recorded per snapshot, so archives written with
+either remain readable. app/reextract.py replays the archive through the
+extractors without refetching anything.
+"""
+import gzip
+import hashlib
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .models import PageSnapshot, Recipe
+
+try:
+    import zstandard
+except ImportError:  # fall back to gzip
+    zstandard = None
+
+PAGE_ARCHIVE_ENABLED = os.getenv("PAGE_ARCHIVE_ENABLED", "1") == "1"
+PAGE_ARCHIVE_DIR = os.getenv("PAGE_ARCHIVE_DIR", "./page_archive")
+PAGE_ARCHIVE_LEVEL = int(os.getenv("PAGE_ARCHIVE_LEVEL", "9"))
+
+CODECS = ("zstd", "gzip")
+
+
+def compress(data: bytes, codec: str, level: int = PAGE_ARCHIVE_LEVEL) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=min(level, 9))
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd archive blobs")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class PageArchive:
+    """Blob store for page HTML, keyed by the SHA-256 of the raw bytes."""
+
+    def __init__(self, root: str, codec: Optional[str] = None):
+        self.root = Path(root)
+        self.codec = codec or ("zstd" if zstandard is not None else "gzip")
+
+    def blob_path(self, digest: str, codec: str) -> Path:
+        return self.root / "blobs" / digest[:2] / f"{digest}.{'zst' if codec == 'zstd' else 'gz'}"
+
+    def put(self, html: str) -> Tuple[str, str, int, int]:
+        """Store a page if it is new. Returns (digest, codec, size, stored size)."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        for codec in (self.codec,) + tuple(c for c in CODECS if c != self.codec):
+            path = self.blob_path(digest, codec)
+            if path.exists():
+                return digest, codec, len(data), path.stat().st_size
+        blob = compress(data, self.codec)
+        path = self.blob_path(digest, self.codec)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(blob)
+        os.replace(tmp, path)
+        return digest, self.codec, len(data), len(blob)
+
+    def get(self, digest: str, codec: str) -> str:
+        return decompress(self.blob_path(digest, codec).read_bytes(), codec).decode("utf-8")
+
+
+page_archive = PageArchive(PAGE_ARCHIVE_DIR)
+
+
+def archive_page(db: Session, url: str, html: str, recipe_id: Optional[int] = None) -> Optional[PageSnapshot]:
+    """
+    Store a fetched page and record the snapshot. A page whose content was
+    already archived for this URL only gets its fetched_at moved forward.
+    """
+    if not PAGE_ARCHIVE_ENABLED or not html:
+        return None
+    digest, codec, size, stored_size = page_archive.put(html)
+    now = datetime.utcnow()
+    snapshot = db.query(PageSnapshot).filter_by(url=url, digest=digest).first()
+    if snapshot is None:
+        try:
+            with db.begin_nested():
+                snapshot = PageSnapshot(
+                    url=url, digest=digest, codec=codec, size=size, stored_size=stored_size,
+                    fetched_at=now, recipe_id=recipe_id,
+                )
+                db.add(snapshot)
+        except IntegrityError:
+            # Another request archived the same page first
+            snapshot = db.query(PageSnapshot).filter_by(url=url, digest=digest).one()
+    snapshot.fetched_at = now
+    if recipe_id is not None:
+        snapshot.recipe_id = recipe_id
+    db.commit()
+    return snapshot
+
+
+def link_snapshots(db: Session, recipe: Recipe):
+    """Attach snapshots fetched during the import preview to the recipe saved from it."""
+    db.execute(
+        update(PageSnapshot)
+        .where(PageSnapshot.url == recipe.source_url, PageSnapshot.recipe_id.is_(None))
+        .values(recipe_id=recipe.id)
+    )
+    db.commit()
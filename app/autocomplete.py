@@ -0,0 +1,317 @@
+"""
+Typeahead suggestions over recipe titles, ingredient names and categories.
+
+Suggestions are held in memory as a sorted array of normalized keys searched
+with bisect. Every word start of a suggestion is a key, so "chick" finds
+"Lemon Herb Chicken" as well as "chicken thighs". Keys are interned and
+paired with a compact array of suggestion ids instead of per-entry tuples.
+A one to three letter prefix matches too many keys to rank on each
+keystroke, so the best suggestions for short prefixes are kept up to date
+as recipes are added.
+
+The index is built from the database on first use. create_recipe_record
+adds new recipes to it directly. Bulk changes (restores, applied revisions)
+mark it stale, and it is rebuilt in the background while the old one keeps
+answering. Each worker process has its own index, so at most every
+AUTOCOMPLETE_CHECK_SECONDS it also compares the collection's counts and
+latest updated_at with those it was built from, and rebuilds when another
+worker has changed the recipes.
+"""
+import bisect
+import heapq
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .models import Category, Recipe, RecipeCategory
+from .shopping import parse_line
+
+KINDS = ("recipe", "ingredient", "category")
+MAX_KEY_CHARS = 24
+# Prefixes up to this length answer from the precomputed top lists
+TOP_PREFIX_CHARS = 3
+MAX_LIMIT = 20
+# Upper bound on keys ranked for one longer prefix
+MAX_SCAN = 5000
+MAX_INGREDIENT_CHARS = 60
+AUTOCOMPLETE_CHECK_SECONDS = float(os.getenv("AUTOCOMPLETE_CHECK_SECONDS", "5"))
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, accent-free words separated by single spaces."""
+    text = text or ""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def _word_keys(text: str) -> List[str]:
+    words = normalize(text).split()
+    return list(dict.fromkeys(sys.intern(" ".join(words[i:])[:MAX_KEY_CHARS]) for i in range(len(words))))
+
+
+def _short_prefixes(keys: Sequence[str]) -> List[str]:
+    return list(dict.fromkeys(key[:n] for key in keys for n in range(1, min(len(key), TOP_PREFIX_CHARS) + 1)))
+
+
+class PrefixIndex:
+    """Sorted key array over weighted suggestions. Safe for concurrent readers and writers."""
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._key_ids = array("l")
+        # One slot per suggestion
+        self._kinds = bytearray()
+        self._texts: List[str] = []
+        self._refs = array("l")
+        self._weights = array("d")
+        self._by_name: Dict[Tuple[int, str], int] = {}
+        self._top: Dict[str, List[int]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def _suggestion(self, kind: str, name: Optional[str], text: str, ref: int) -> Tuple[int, bool]:
+        """
+        (id, created) of the suggestion for a kind and normalized name. Recipe
+        titles pass no name: each recipe is its own suggestion and is never
+        looked up again.
+        """
+        lookup = (KINDS.index(kind), name)
+        if name is not None:
+            sid = self._by_name.get(lookup)
+            if sid is not None:
+                return sid, False
+        sid = len(self._texts)
+        self._kinds.append(lookup[0])
+        self._texts.append(text)
+        self._refs.append(ref)
+        self._weights.append(0.0)
+        if name is not None:
+            self._by_name[lookup] = sid
+        return sid, True
+
+    def _insert_keys(self, sid: int, keys: Sequence[str]):
+        for key in keys:
+            pos = bisect.bisect_right(self._keys, key)
+            self._keys.insert(pos, key)
+            self._key_ids.insert(pos, sid)
+
+    def _promote(self, sid: int):
+        """Re-rank sid in the top lists of its short prefixes after its weight grew."""
+        weight = self._weights[sid]
+        for prefix in _short_prefixes(_word_keys(self._texts[sid])):
+            top = self._top.setdefault(prefix, [])
+            if sid not in top:
+                if len(top) >= MAX_LIMIT and weight <= self._weights[top[-1]]:
+                    continue
+                top.append(sid)
+            top.sort(key=lambda other: -self._weights[other])
+            del top[MAX_LIMIT:]
+
+    def _add(self, kind: str, text: str, ref: int = -1, weight: float = 1.0, name: Optional[str] = None):
+        if not normalize(text):
+            return
+        sid, created = self._suggestion(kind, name, text, ref)
+        if created:
+            self._insert_keys(sid, _word_keys(text))
+        self._weights[sid] += weight
+        self._promote(sid)
+
+    def add_recipe(self, recipe_id: int, title: str, ingredients: str = "",
+                   categories: Iterable[Tuple[int, str]] = (), weight: float = 1.0):
+        """Index a new recipe: its title, and one more use of each ingredient and category."""
+        with self._lock:
+            self._add("recipe", title, recipe_id, weight)
+            for name, text in _ingredient_names(ingredients).items():
+                self._add("ingredient", text, name=name)
+            for category_id, category_name in categories:
+                self._add("category", category_name, category_id, name=normalize(category_name))
+
+    @classmethod
+    def build(cls, recipes: Iterable[Tuple[int, str, str, float]],
+              categories: Iterable[Tuple[int, str, int]]) -> "PrefixIndex":
+        """
+        Bulk-build from (id, title, ingredients, weight) and (category id, name,
+        recipe count) rows. Keys are sorted once and the short-prefix lists are
+        filled in one pass, instead of paying for per-insert upkeep.
+        """
+        index = cls()
+        for recipe_id, title, ingredients, weight in recipes:
+            if normalize(title):
+                sid, _ = index._suggestion("recipe", None, title, recipe_id)
+                index._weights[sid] += weight
+            for name, text in _ingredient_names(ingredients).items():
+                sid, _ = index._suggestion("ingredient", name, text, -1)
+                index._weights[sid] += 1.0
+        for category_id, name, count in categories:
+            if normalize(name):
+                sid, _ = index._suggestion("category", normalize(name), name, category_id)
+                index._weights[sid] += count
+
+        keys = [_word_keys(text) for text in index._texts]
+        pairs = sorted((key, sid) for sid, sid_keys in enumerate(keys) for key in sid_keys)
+        index._keys = [key for key, _ in pairs]
+        index._key_ids = array("l", (sid for _, sid in pairs))
+        del pairs
+        for sid in sorted(range(len(keys)), key=lambda s: -index._weights[s]):
+            for prefix in _short_prefixes(keys[sid]):
+                top = index._top.setdefault(prefix, [])
+                if len(top) < MAX_LIMIT:
+                    top.append(sid)
+        return index
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Up to ``limit`` suggestions whose words start with ``prefix``, heaviest first."""
+        query = normalize(prefix)
+        limit = max(1, min(limit, MAX_LIMIT))
+        if not query:
+            return []
+        with self._lock:
+            if len(query) <= TOP_PREFIX_CHARS:
+                sids = self._top.get(query, [])[:limit]
+            else:
+                key = query[:MAX_KEY_CHARS]
+                lo = bisect.bisect_left(self._keys, key)
+                hi = bisect.bisect_left(self._keys, key + "\uffff", lo, min(len(self._keys), lo + MAX_SCAN))
+                candidates = set(self._key_ids[lo:hi])
+                if len(query) > MAX_KEY_CHARS:
+                    # Keys are truncated; check the full text
+                    candidates = {sid for sid in candidates if f" {query}" in f" {normalize(self._texts[sid])}"}
+                sids = heapq.nlargest(limit, candidates, key=lambda sid: (self._weights[sid], -sid))
+            return [self._out(sid) for sid in sids]
+
+    def _out(self, sid: int) -> Dict:
+        return {
+            "text": self._texts[sid],
+            "kind": KINDS[self._kinds[sid]],
+            "id": self._refs[sid] if self._refs[sid] >= 0 else None,
+            "weight": self._weights[sid],
+        }
+
+
+def _ingredient_names(ingredients: str) -> Dict[str, str]:
+    """{normalized name: display name} for a recipe's ingredient lines."""
+    names: Dict[str, str] = {}
+    for line in (ingredients or "").splitlines():
+        name, text = _ingredient_name(line.strip())
+        if name:
+            names.setdefault(name, text)
+    return names
+
+
+@lru_cache(maxsize=20000)
+def _ingredient_name(line: str) -> Tuple[str, str]:
+    if not line:
+        return "", ""
+    text = parse_line(line)[2]
+    return (normalize(text), text) if len(text) <= MAX_INGREDIENT_CHARS else ("", "")
+
+
+_index: Optional[PrefixIndex] = None
+_stale = False
+_build_lock = threading.Lock()
+# crud.collection_stats when the index was built, and when it was last compared
+_version: Optional[Tuple] = None
+_checked_at = 0.0
+
+
+def build_from_db(db: Session) -> PrefixIndex:
+    recipes = (
+        (row.id, row.title, row.ingredients, 1.0 + (row.view_count or 0))
+        for row in db.execute(
+            select(Recipe.id, Recipe.title, Recipe.ingredients, Recipe.view_count).execution_options(yield_per=2000)
+        )
+    )
+    categories = db.execute(
+        select(Category.id, Category.name, func.count(RecipeCategory.id))
+        .outerjoin(RecipeCategory, RecipeCategory.category_id == Category.id)
+        .group_by(Category.id)
+    ).all()
+    return PrefixIndex.build(recipes, categories)
+
+
+def _build(db: Session) -> PrefixIndex:
+    global _version, _checked_at
+    from .crud import collection_stats
+
+    # Read before building, so changes made during the build show up as a new version
+    version = tuple(collection_stats(db))
+    index = build_from_db(db)
+    _version, _checked_at = version, time.monotonic()
+    return index
+
+
+def _changed_elsewhere(db: Session) -> bool:
+    """Whether the collection no longer matches the index's version; checked every AUTOCOMPLETE_CHECK_SECONDS."""
+    global _checked_at
+    from .crud import collection_stats
+
+    now = time.monotonic()
+    if now - _checked_at < AUTOCOMPLETE_CHECK_SECONDS:
+        return False
+    _checked_at = now
+    return tuple(collection_stats(db)) != _version
+
+
+def get_index(db: Session) -> PrefixIndex:
+    """The shared index, built on first use. A stale index is rebuilt in the background."""
+    global _index, _stale
+    if _index is None:
+        with _build_lock:
+            if _index is None:
+                _index = _build(db)
+                _stale = False
+        return _index
+    if not _stale and _changed_elsewhere(db):
+        _stale = True
+    if _stale and _build_lock.acquire(blocking=False):
+        _stale = False
+        engine = db.get_bind()
+
+        def _rebuild():
+            global _index, _stale
+            try:
+                with Session(engine) as session:
+                    _index = _build(session)
+            except Exception as e:
+                print(f"Autocomplete rebuild error: {e}")
+                _stale = True
+            finally:
+                _build_lock.release()
+
+        threading.Thread(target=_rebuild, name="autocomplete-rebuild", daemon=True).start()
+    return _index
+
+
+def add_recipe(recipe: Recipe):
+    """Add a just-saved recipe to the index, if it has been built."""
+    if _index is not None:
+        _index.add_recipe(
+            recipe.id, recipe.title, recipe.ingredients or "",
+            [(category.id, category.name) for category in recipe.categories],
+        )
+
+
+def invalidate():
+    global _stale
+    _stale = True
+
+
+def reset():
+    """Drop the index; the next request builds it again from the database."""
+    global _index, _stale, _version, _checked_at
+    _index, _stale, _version, _checked_at = None, False, None, 0.0
@@ -0,0 +1,260 @@
+"""
+Streaming NDJSON export and bulk restore of the recipe collection.
+
+Usage:
+    python -m app.backup export --output recipes.ndjson
+    python -m app.backup restore recipes.ndjson --chunk-size 1000
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from . import autocomplete
+from .derived import derived_fields
+from .models import Category, Recipe, RecipeCategory
+
+EXPORT_BATCH_SIZE = 500
+RESTORE_CHUNK_SIZE = 1000
+
+RECIPE_COLUMNS = [column.name for column in Recipe.__table__.columns]
+DATETIME_COLUMNS = {"created_at", "updated_at"}
+OPTIONAL_DATETIME_COLUMNS = {"last_checked_at"}
+# Counters added after older exports were written, filled with their defaults
+SCALAR_DEFAULTS = {
+    column.name: column.default.arg
+    for column in Recipe.__table__.columns
+    if column.default is not None and column.default.is_scalar
+}
+
+
+def _encode(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_export(db: Session, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """
+    Yield one JSON line per recipe, with its categories, ordered by id.
+
+    Rows are streamed with yield_per and categories are looked up once per
+    batch, so memory stays flat however large the collection is.
+    """
+    columns = [getattr(Recipe, name) for name in RECIPE_COLUMNS]
+    result = db.execute(select(*columns).order_by(Recipe.id).execution_options(yield_per=batch_size))
+
+    for rows in result.partitions():
+        ids = [row.id for row in rows]
+        categories: Dict[int, List[Dict[str, Any]]] = {}
+        links = db.execute(
+            select(RecipeCategory.recipe_id, Category.name, Category.color)
+            .join(Category, Category.id == RecipeCategory.category_id)
+            .where(RecipeCategory.recipe_id.in_(ids))
+            .order_by(Category.name)
+        )
+        for recipe_id, name, color in links:
+            categories.setdefault(recipe_id, []).append({"name": name, "color": color})
+
+        for row in rows:
+            record = {name: _encode(value) for name, value in zip(RECIPE_COLUMNS, row)}
+            record["categories"] = categories.get(row.id, [])
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _decode(record: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    # Every row carries every column: executemany needs one parameter shape
+    values = {name: record.get(name) for name in RECIPE_COLUMNS}
+    for name, default in SCALAR_DEFAULTS.items():
+        if values[name] is None:
+            values[name] = default
+    for name in DATETIME_COLUMNS:
+        values[name] = datetime.fromisoformat(values[name]) if values[name] else now
+    for name in OPTIONAL_DATETIME_COLUMNS:
+        values[name] = datetime.fromisoformat(values[name]) if values[name] else None
+    # Recomputed rather than trusted, so exports from before they existed restore correctly
+    values.update(derived_fields(
+        values["prep_time_minutes"], values["cook_time_minutes"], values["servings"], values["ingredients"]
+    ))
+    return values
+
+
+def _parse_record(line: str) -> Dict[str, Any]:
+    """One export line as a record, or ValueError if it cannot be restored."""
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object")
+    for name in ("title", "source_url"):
+        if not isinstance(record.get(name), str) or not record[name].strip():
+            raise ValueError(f"missing {name}")
+    if record.get("id") is not None and (type(record["id"]) is not int or record["id"] < 1):
+        raise ValueError("id must be a positive integer")
+    categories = record.get("categories") or []
+    if not isinstance(categories, list) or not all(
+        isinstance(category, dict) and isinstance(category.get("name"), str) and category["name"]
+        for category in categories
+    ):
+        raise ValueError("categories must be a list of objects with a name")
+    try:
+        _decode(record, datetime.utcnow())
+    except (TypeError, ValueError) as e:
+        raise ValueError(str(e)) from e
+    return record
+
+
+def _upsert_categories(conn, records: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Insert categories missing by name and return a name -> id map for the chunk."""
+    wanted: Dict[str, Any] = {}
+    for record in records:
+        for category in record.get("categories") or []:
+            wanted.setdefault(category["name"], category.get("color"))
+    if not wanted:
+        return {}
+
+    names = list(wanted)
+    existing = dict(conn.execute(select(Category.name, Category.id).where(Category.name.in_(names))).all())
+    missing = [{"name": name, "color": wanted[name]} for name in names if name not in existing]
+    if missing:
+        conn.execute(insert(Category), missing)
+        created = select(Category.name, Category.id).where(Category.name.in_([m["name"] for m in missing]))
+        existing.update(conn.execute(created).all())
+    return existing
+
+
+def _restore_chunk(conn, lines: List[Tuple[int, str]]) -> Dict[str, Any]:
+    records, invalid = [], []
+    for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            records.append(_parse_record(line))
+        except ValueError:
+            invalid.append(number)
+
+    # Recipes already present (by id) are skipped so a restore can be re-run,
+    # and so are repeats of an id within the upload (the first one wins)
+    ids = [record["id"] for record in records if record.get("id") is not None]
+    seen = set(conn.execute(select(Recipe.id).where(Recipe.id.in_(ids))).scalars()) if ids else set()
+    kept = []
+    for record in records:
+        if record.get("id") is not None:
+            if record["id"] in seen:
+                continue
+            seen.add(record["id"])
+        kept.append(record)
+    skipped = len(records) - len(kept) + len(invalid)
+    records = kept
+
+    if any(record.get("id") is None for record in records):
+        next_id = (conn.execute(select(Recipe.id).order_by(Recipe.id.desc()).limit(1)).scalar() or 0) + 1
+        next_id = max([next_id] + [record["id"] + 1 for record in records if record.get("id") is not None])
+        for record in records:
+            if record.get("id") is None:
+                record["id"] = next_id
+                next_id += 1
+
+    category_ids = _upsert_categories(conn, records)
+
+    now = datetime.utcnow()
+    rows = [_decode(record, now) for record in records]
+    # Restored rows count as changed now, so list pages validated by max(updated_at) are not answered 304
+    for row in rows:
+        row["updated_at"] = now
+    if rows:
+        conn.execute(insert(Recipe), rows)
+
+    links = [
+        {"recipe_id": record["id"], "category_id": category_ids[name]}
+        for record in records
+        for name in dict.fromkeys(category["name"] for category in record.get("categories") or [])
+    ]
+    if links:
+        conn.execute(insert(RecipeCategory), links)
+
+    return {"restored": len(rows), "skipped": skipped, "links": len(links), "invalid_lines": invalid}
+
+
+def restore(lines: Iterable[str], engine: Engine, chunk_size: int = RESTORE_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Bulk-load NDJSON produced by iter_export.
+
+    Each chunk of lines is inserted with executemany inside its own
+    transaction; categories are matched by name and created when missing.
+    Lines that are not valid records are skipped and their (1-based) numbers
+    listed in ``invalid_lines``.
+    """
+    totals: Dict[str, Any] = {"restored": 0, "skipped": 0, "links": 0, "invalid_lines": []}
+    start = time.perf_counter()
+
+    iterator = enumerate(lines, 1)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        with engine.begin() as conn:
+            for key, value in _restore_chunk(conn, chunk).items():
+                totals[key] += value
+
+    if totals["restored"] and engine.dialect.name == "postgresql":
+        # Explicit ids do not advance the serial sequence
+        with engine.begin() as conn:
+            conn.execute(text("SELECT setval(pg_get_serial_sequence('recipes', 'id'), (SELECT MAX(id) FROM recipes))"))
+
+    elapsed = time.perf_counter() - start
+    if totals["restored"]:
+        autocomplete.invalidate()
+    return {
+        **totals,
+        "seconds": round(elapsed, 3),
+        "recipes_per_second": round(totals["restored"] / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def main(argv=None):
+    from .database import SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_cmd = sub.add_parser("export", help="write every recipe as NDJSON")
+    export_cmd.add_argument("--output", "-o", help="file to write (default: stdout)")
+    restore_cmd = sub.add_parser("restore", help="load recipes from an NDJSON export")
+    restore_cmd.add_argument("path", help="NDJSON file, or - for stdin")
+    restore_cmd.add_argument("--chunk-size", type=int, default=RESTORE_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        db = SessionLocal()
+        count = 0
+        try:
+            for line in iter_export(db):
+                out.write(line)
+                count += 1
+        finally:
+            db.close()
+            if out is not sys.stdout:
+                out.close()
+        print(f"Exported {count} recipes", file=sys.stderr)
+    else:
+        source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+        try:
+            stats = restore(source, engine, chunk_size=args.chunk_size)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        print(
+            f"Restored {stats['restored']} recipes ({stats['skipped']} skipped) "
+            f"in {stats['seconds']:.2f}s - {stats['recipes_per_second']} recipes/s",
+            file=sys.stderr,
+        )
+        if stats["invalid_lines"]:
+            print("Invalid lines: " + ", ".join(map(str, stats["invalid_lines"])), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
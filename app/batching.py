@@ -0,0 +1,176 @@
+"""
+Multi-page Gemini extraction for bulk work such as re-extraction runs.
+
+With one page per request, request overhead and the per-minute request
+quota run out long before the token quota does. Here several cleaned pages
+are packed into one prompt, up to GEMINI_BATCH_TOKENS estimated input tokens
+and GEMINI_BATCH_MAX_PAGES pages. Gemini answers with a JSON array holding
+one recipe per page, each tagged with its page's URL, and the results are
+matched back to their pages by that URL. Pages missing from the answer, or
+extracted without a title, are retried one at a time through
+parse_with_gemini. A batch that fails outright is retried the same way.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple
+
+from . import metrics
+from .ai_parser import (
+    GEMINI_MODEL, GEMINI_TIMEOUT, MAX_PAGE_CHARS, get_genai, page_text, parse_in_chunks, parse_with_gemini,
+    recipe_from_json, strip_code_fence,
+)
+from .chunking import AI_CHUNK_THRESHOLD, AI_CHUNKING
+from .health import guard
+
+GEMINI_BATCH_TOKENS = int(os.getenv("GEMINI_BATCH_TOKENS", "24000"))
+GEMINI_BATCH_MAX_PAGES = int(os.getenv("GEMINI_BATCH_MAX_PAGES", "8"))
+GEMINI_BATCH_WORKERS = int(os.getenv("GEMINI_BATCH_WORKERS", "4"))
+# Rough size of an English token, as in clean_html's budget
+CHARS_PER_TOKEN = 4
+
+metrics.describe("gemini_batch_requests_total", "counter", "Multi-page Gemini requests by outcome")
+metrics.describe("gemini_batch_pages_total", "counter", "Pages sent in multi-page Gemini requests by outcome")
+
+Page = Tuple[str, str]
+
+BATCH_PROMPT = """
+You are a recipe extraction API. Below are {count} web pages, each starting with a
+"=== PAGE n ===" line and its Source URL. Extract the recipe from every page.
+
+Return ONLY a valid JSON array with one object per page, in page order, with these keys:
+- page: int (the n of its "=== PAGE n ===" line)
+- url: str (the page's Source URL, copied exactly)
+- title: str
+- ingredients: str (newline separated list, one ingredient per line with amount)
+- instructions: str (newline separated list, one step per line)
+- prep_time_minutes: int or null
+- cook_time_minutes: int or null
+- servings: str or null
+- image_url: str or null
+
+Put each ingredient's amount FIRST, then the ingredient name, e.g. "2 ounces rye whiskey".
+Never mix data from different pages. If a page has no recipe, return its object with an empty title.
+If data is missing, use null or empty string appropriately.
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def pack_batches(pages: Sequence[Page], token_budget: int = GEMINI_BATCH_TOKENS,
+                 max_pages: int = GEMINI_BATCH_MAX_PAGES) -> List[List[Page]]:
+    """
+    Group (url, text) pages, in order, into batches within the token budget
+    and page limit. A page over the budget on its own gets a batch to itself.
+    """
+    batches: List[List[Page]] = []
+    current: List[Page] = []
+    used = 0
+    for url, text in pages:
+        tokens = estimate_tokens(text)
+        if current and (used + tokens > token_budget or len(current) >= max_pages):
+            batches.append(current)
+            current, used = [], 0
+        current.append((url, text))
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_batch_prompt(pages: Sequence[Page]) -> str:
+    parts = [BATCH_PROMPT.format(count=len(pages))]
+    for number, (url, text) in enumerate(pages, 1):
+        parts.append(f"=== PAGE {number} ===\nSource URL: {url}\nPage text:\n{text}\n")
+    return "\n".join(parts)
+
+
+def parse_batch_response(content: str, urls: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    {url: recipe data} for the pages Gemini extracted with a title. Items are
+    matched by URL, falling back to the page number when the model rewrote
+    the URL. Unknown and duplicate items are dropped.
+    """
+    items = json.loads(strip_code_fence(content))
+    if isinstance(items, dict):
+        items = items.get("recipes", [items])
+    wanted = set(urls)
+    results: Dict[str, Dict[str, Any]] = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        url = item.get("url")
+        if url not in wanted:
+            page = item.get("page")
+            if not isinstance(page, int) or not 1 <= page <= len(urls):
+                continue
+            url = urls[page - 1]
+        if url in results:
+            continue
+        recipe = recipe_from_json(url, item)
+        if recipe["title"]:
+            results[url] = recipe
+    return results
+
+
+def parse_batch_with_gemini(pages: Sequence[Page]) -> Dict[str, Dict[str, Any]]:
+    """Extract several (url, cleaned text) pages in one request. Raises if the request or its JSON fails."""
+    with guard("gemini"):
+        model = get_genai().GenerativeModel(GEMINI_MODEL)
+        response = model.generate_content(build_batch_prompt(pages), request_options={"timeout": GEMINI_TIMEOUT})
+        content = response.text
+    return parse_batch_response(content, [url for url, _ in pages])
+
+
+def _run_batch(batch: List[Page]) -> Dict[str, Dict[str, Any]]:
+    found: Dict[str, Dict[str, Any]] = {}
+    if len(batch) > 1:
+        try:
+            found = parse_batch_with_gemini(batch)
+            metrics.inc("gemini_batch_requests_total", outcome="success")
+        except Exception as e:
+            print(f"Gemini batch error ({len(batch)} pages): {e}")
+            metrics.inc("gemini_batch_requests_total", outcome="failure")
+        metrics.inc("gemini_batch_pages_total", len(found), outcome="extracted")
+    for url, text in batch:
+        if url not in found:
+            if len(batch) > 1:
+                metrics.inc("gemini_batch_pages_total", outcome="retried")
+            try:
+                found[url] = parse_with_gemini(url, text)
+            except Exception as e:
+                print(f"Gemini parsing error for {url}: {e}")
+                found[url] = {}
+    return found
+
+
+def extract_batch(pages: Sequence[Page], token_budget: int = GEMINI_BATCH_TOKENS,
+                  max_pages: int = GEMINI_BATCH_MAX_PAGES,
+                  workers: int = GEMINI_BATCH_WORKERS) -> Dict[str, Dict[str, Any]]:
+    """
+    Extract (url, html) pages with as few Gemini requests as possible.
+    Returns {url: recipe data}, with {} for pages that could not be extracted.
+    Long pages go through the chunked single-page path, as in
+    parse_recipe_with_ai.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    short: List[Page] = []
+    for url, html in dict(pages).items():
+        text = page_text(html)
+        if AI_CHUNKING and len(text) > AI_CHUNK_THRESHOLD:
+            try:
+                results[url] = parse_in_chunks(url, text, "gemini", parse_with_gemini)
+            except Exception as e:
+                print(f"Gemini parsing error for {url}: {e}")
+                results[url] = {}
+        else:
+            short.append((url, text[:MAX_PAGE_CHARS]))
+
+    batches = pack_batches(short, token_budget, max_pages)
+    if batches:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as pool:
+            for found in pool.map(_run_batch, batches):
+                results.update(found)
+    return results
@@ -0,0 +1,142 @@
+"""
+Map-reduce extraction for long pages.
+
+Long page text is split into overlapping windows. Each window is scored for
+how much it looks like a recipe card, the best few are sent to the AI
+provider in parallel, and the partial results are merged into one recipe.
+Each prompt stays small, and a recipe near the end of a long blog post is
+no longer cut off.
+"""
+import os
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from .units import UNIT_ALIASES
+
+AI_CHUNKING = os.getenv("AI_CHUNKING", "1") == "1"
+# Pages shorter than this go to the provider in one piece
+AI_CHUNK_THRESHOLD = int(os.getenv("AI_CHUNK_THRESHOLD", "12000"))
+AI_CHUNK_SIZE = int(os.getenv("AI_CHUNK_SIZE", "6000"))
+AI_CHUNK_OVERLAP = int(os.getenv("AI_CHUNK_OVERLAP", "800"))
+AI_CHUNK_TOP_K = int(os.getenv("AI_CHUNK_TOP_K", "3"))
+
+HEADINGS = re.compile(r"^\s*(ingredients|instructions|directions|method|preparation|steps|you will need)\b", re.I | re.M)
+META = re.compile(r"\b(prep time|cook time|total time|servings|serves|yield|calories)\b", re.I)
+STEP = re.compile(r"^\s*(?:step\s*)?\d+[.)]\s+\S", re.I | re.M)
+QUANTITY = re.compile(r"^\s*(?:\d+\s+\d+/\d+|\d+/\d+|\d+(?:\.\d+)?|[½⅓⅔¼¾⅛])\s*([a-zA-Z]+\.?)?")
+VERBS = re.compile(r"\b(preheat|whisk|stir|bake|simmer|saute|sauté|chop|mix|combine|season|boil|fold|knead|roast)\b", re.I)
+
+LIST_FIELDS = ("ingredients", "instructions")
+MERGE_MIN_SCORE_RATIO = 0.25
+SCALAR_FIELDS = ("prep_time_minutes", "cook_time_minutes", "servings", "image_url")
+
+
+def split_chunks(text: str, size: int = AI_CHUNK_SIZE, overlap: int = AI_CHUNK_OVERLAP) -> List[str]:
+    """Overlapping windows of about ``size`` characters, broken at line boundaries."""
+    if len(text) <= size:
+        return [text]
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + size)
+        if end < len(text):
+            newline = text.rfind("\n", start + size // 2, end)
+            end = newline if newline > start else end
+        chunks.append(text[start:end])
+        if end >= len(text):
+            break
+        next_start = end - overlap
+        newline = text.find("\n", next_start, end)
+        start = max(start + 1, newline + 1 if newline != -1 else next_start)
+    return chunks
+
+
+def score_chunk(chunk: str) -> float:
+    """How much a window looks like a recipe card: measured ingredients, headings, steps."""
+    measured = counted = 0
+    for line in chunk.splitlines():
+        match = QUANTITY.match(line) if len(line) <= 120 else None
+        if not match:
+            continue
+        if (match.group(1) or "").rstrip(".").lower() in UNIT_ALIASES:
+            measured += 1
+        else:
+            counted += 1
+    return (
+        3.0 * measured
+        + 1.0 * counted
+        + 8.0 * len(HEADINGS.findall(chunk))
+        + 2.0 * len(META.findall(chunk))
+        + 2.0 * len(STEP.findall(chunk))
+        + 0.5 * len(VERBS.findall(chunk))
+    )
+
+
+def top_chunks(chunks: List[str], k: int = AI_CHUNK_TOP_K) -> List[Tuple[int, float, str]]:
+    """The k best-scoring windows as (position, score, text), in page order."""
+    scored = sorted(((score_chunk(chunk), i) for i, chunk in enumerate(chunks)), reverse=True)[:k]
+    return sorted((i, score, chunks[i]) for score, i in scored)
+
+
+def _line_key(line: str) -> str:
+    return " ".join(re.sub(r"[^\w\s/]", " ", line.lower()).split())
+
+
+def merge_results(partials: List[Tuple[float, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Merge per-chunk extractions, given as (chunk score, result) in page order.
+
+    List fields are concatenated in page order with duplicate lines from the
+    window overlaps removed. The title is the one most chunks agree on, and
+    other fields come from the best-scoring chunk that has them. Chunks
+    scoring far below the best one are ignored, since anything extracted
+    from preamble text is usually invented.
+    """
+    partials = [(score, result) for score, result in partials if result]
+    if not partials:
+        return {}
+    floor = max(score for score, _ in partials) * MERGE_MIN_SCORE_RATIO
+    partials = [(score, result) for score, result in partials if score >= floor]
+    by_score = sorted(partials, key=lambda item: item[0], reverse=True)
+
+    titles = Counter(result.get("title") for _, result in partials if result.get("title"))
+    best_title = next((result["title"] for _, result in by_score if result.get("title")), "")
+    title = max(titles, key=lambda name: (titles[name], name == best_title)) if titles else ""
+
+    merged: Dict[str, Any] = {"title": title, "source_url": partials[0][1].get("source_url", "")}
+    for field in LIST_FIELDS:
+        seen, lines = set(), []
+        for _, result in partials:
+            for line in (result.get(field) or "").splitlines():
+                key = _line_key(line)
+                if key and key not in seen:
+                    seen.add(key)
+                    lines.append(line.strip())
+        merged[field] = "\n".join(lines)
+    for field in SCALAR_FIELDS:
+        merged[field] = next((result[field] for _, result in by_score if result.get(field)), None)
+    merged["servings"] = merged["servings"] or ""
+    merged["image_url"] = merged["image_url"] or ""
+    return merged
+
+
+def extract_in_chunks(url: str, text: str, parse: Callable[[str, str], Dict[str, Any]],
+                      k: int = AI_CHUNK_TOP_K) -> Dict[str, Any]:
+    """Run ``parse`` over the best windows of ``text`` in parallel and merge the results."""
+    selected = top_chunks(split_chunks(text), k)
+
+    def run(chunk: str):
+        try:
+            return parse(url, chunk), None
+        except Exception as e:
+            return {}, e
+
+    with ThreadPoolExecutor(max_workers=len(selected)) as pool:
+        outcomes = list(pool.map(run, [chunk for _, _, chunk in selected]))
+
+    errors = [error for _, error in outcomes if error is not None]
+    if len(errors) == len(outcomes):
+        raise errors[0]
+    return merge_results([(score, result) for (_, score, _), (result, _) in zip(selected, outcomes)])
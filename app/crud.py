@@ -0,0 +1,200 @@
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session, joinedload
+
+from . import autocomplete
+from .archive import link_snapshots
+from .derived import apply_derived
+from .models import Category, Recipe, RecipeCategory
+
+
+def apply_search(query: Query, q: Optional[str]) -> Query:
+    """Filter a Recipe query (or select) by a free-text term across title, ingredients and instructions."""
+    if not q:
+        return query
+    search_term = f"%{q}%"
+    return query.filter(
+        (Recipe.title.ilike(search_term)) |
+        (Recipe.ingredients.ilike(search_term)) |
+        (Recipe.instructions.ilike(search_term))
+    )
+
+
+def apply_filters(
+    query: Query,
+    max_time: Optional[int] = None,
+    min_servings: Optional[int] = None,
+    max_servings: Optional[int] = None,
+    max_ingredients: Optional[int] = None,
+) -> Query:
+    """
+    Range filters on the derived numeric columns. A servings range matches
+    recipes whose own range overlaps it, so "serves 6-8" matches min_servings=4, max_servings=6.
+    """
+    if max_time is not None:
+        query = query.filter(Recipe.total_time_minutes <= max_time)
+    if min_servings is not None:
+        query = query.filter(Recipe.servings_max >= min_servings)
+    if max_servings is not None:
+        query = query.filter(Recipe.servings_min <= max_servings)
+    if max_ingredients is not None:
+        query = query.filter(Recipe.ingredient_count <= max_ingredients)
+    return query
+
+
+# List page orderings; each leads with an indexed column, newest first among ties
+SORTS = {
+    "newest": (Recipe.created_at.desc(),),
+    "quickest": (Recipe.total_time_minutes.asc().nulls_last(), Recipe.created_at.desc()),
+    "fewest_ingredients": (Recipe.ingredient_count.asc().nulls_last(), Recipe.created_at.desc()),
+    "most_servings": (Recipe.servings_max.desc().nulls_last(), Recipe.created_at.desc()),
+}
+
+
+def list_recipes_query(
+    db: Session,
+    category_id: Optional[int] = None,
+    q: Optional[str] = None,
+    sort: str = "newest",
+    filters: Optional[Dict[str, int]] = None,
+) -> Query:
+    """Recipes for the list page, newest first unless ``sort`` says otherwise, with categories eagerly loaded."""
+    query = db.query(Recipe).options(joinedload(Recipe.categories)).order_by(*SORTS[sort])
+    if category_id:
+        query = query.join(RecipeCategory).filter(RecipeCategory.category_id == category_id)
+    return apply_filters(apply_search(query, q), **(filters or {}))
+
+
+def get_recipe(db: Session, recipe_id: int) -> Optional[Recipe]:
+    return (
+        db.query(Recipe)
+        .options(joinedload(Recipe.categories))
+        .filter(Recipe.id == recipe_id)
+        .first()
+    )
+
+
+def recipes_select(
+    category_id: Optional[int] = None,
+    q: Optional[str] = None,
+    sort: str = "newest",
+    filters: Optional[Dict[str, int]] = None,
+) -> Select:
+    """The list_recipes_query statement in 2.0 select() form, for async sessions."""
+    stmt = select(Recipe).options(joinedload(Recipe.categories)).order_by(*SORTS[sort])
+    if category_id:
+        stmt = stmt.join(RecipeCategory).where(RecipeCategory.category_id == category_id)
+    return apply_filters(apply_search(stmt, q), **(filters or {}))
+
+
+async def list_recipes_async(
+    db: AsyncSession,
+    category_id: Optional[int] = None,
+    q: Optional[str] = None,
+    sort: str = "newest",
+    filters: Optional[Dict[str, int]] = None,
+) -> Sequence[Recipe]:
+    result = await db.execute(recipes_select(category_id, q, sort, filters))
+    return result.unique().scalars().all()
+
+
+async def get_recipe_async(db: AsyncSession, recipe_id: int) -> Optional[Recipe]:
+    stmt = select(Recipe).options(joinedload(Recipe.categories)).where(Recipe.id == recipe_id)
+    return (await db.execute(stmt)).unique().scalars().first()
+
+
+async def list_categories_async(db: AsyncSession) -> Sequence[Category]:
+    return (await db.execute(select(Category).order_by(Category.name))).scalars().all()
+
+
+_RECIPE_STATS = select(func.count(Recipe.id), func.max(Recipe.updated_at), func.max(Recipe.id))
+_CATEGORY_STATS = select(
+    select(func.count(Category.id)).scalar_subquery(),
+    select(func.count(RecipeCategory.id)).scalar_subquery(),
+)
+
+
+async def collection_stats_async(db: AsyncSession):
+    """
+    (recipe count, latest updated_at, highest id, category count, category link
+    count) for list-page validators. Read from the database, so every worker
+    process derives the same ETag.
+    """
+    recipe_count, last_modified, max_id = (await db.execute(_RECIPE_STATS)).one()
+    category_count, link_count = (await db.execute(_CATEGORY_STATS)).one()
+    return recipe_count, last_modified, max_id, category_count, link_count
+
+
+def collection_stats(db: Session):
+    """collection_stats_async for sync sessions."""
+    recipe_count, last_modified, max_id = db.execute(_RECIPE_STATS).one()
+    category_count, link_count = db.execute(_CATEGORY_STATS).one()
+    return recipe_count, last_modified, max_id, category_count, link_count
+
+
+def create_recipe_record(
+    db: Session,
+    *,
+    title: str,
+    source_url: str,
+    ingredients: str = "",
+    instructions: str = "",
+    prep_time_minutes: Optional[int] = None,
+    cook_time_minutes: Optional[int] = None,
+    servings: str = "",
+    image_url: str = "",
+    category_ids: Optional[List[int]] = None,
+    new_category: str = "",
+) -> Recipe:
+    """
+    Save a recipe with its categories and add it to the autocomplete index.
+    List-page validators come from collection_stats_async, so nothing else
+    needs invalidating. Raises ValueError when the title or source URL is blank.
+    """
+    cleaned_title = title.strip()
+    cleaned_url = source_url.strip()
+
+    if not cleaned_title or not cleaned_url:
+        raise ValueError("Title and source URL are required.")
+
+    recipe = Recipe(
+        title=cleaned_title,
+        source_url=cleaned_url,
+        ingredients=(ingredients or "").strip(),
+        instructions=(instructions or "").strip(),
+        prep_time_minutes=prep_time_minutes,
+        cook_time_minutes=cook_time_minutes,
+        servings=(servings or "").strip() or None,
+        image_url=(image_url or "").strip() or None,
+    )
+    apply_derived(recipe)
+
+    # Attach existing categories
+    if category_ids:
+        existing = (
+            db.query(Category)
+            .filter(Category.id.in_(category_ids))
+            .order_by(Category.name)
+            .all()
+        )
+        recipe.categories.extend(existing)
+
+    # Create a new category if provided
+    cleaned_new_cat = (new_category or "").strip()
+    if cleaned_new_cat:
+        found = db.query(Category).filter(Category.name == cleaned_new_cat).first()
+        if not found:
+            found = Category(name=cleaned_new_cat)
+            db.add(found)
+            db.flush()  # ensures id is available
+        if found not in recipe.categories:
+            recipe.categories.append(found)
+
+    db.add(recipe)
+    db.commit()
+    db.refresh(recipe)
+    autocomplete.add_recipe(recipe)
+    link_snapshots(db, recipe)
+    return recipe
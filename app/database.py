@@ -1,7 +1,14 @@
+import os
+from functools import lru_cache
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-DATABASE_URL = "sqlite:///./recipes.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./recipes.db")
+
+# Async driver used by the read-heavy routes; derived from DATABASE_URL unless set
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or None
 
 # SQLite needs check_same_thread when used with FastAPI's threadpool
 engine = create_engine(
@@ -21,3 +28,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def async_url(url: str) -> str:
+    """The async-driver form of a sync database URL (sqlite -> aiosqlite, postgresql -> asyncpg)."""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+@lru_cache(maxsize=None)
+def get_async_sessionmaker():
+    """Create the async engine on first use, so the driver is only loaded when needed."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL or async_url(DATABASE_URL))
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    """Provide an AsyncSession per request; queries run without holding a worker thread."""
+    async with get_async_sessionmaker()() as db:
+        yield db
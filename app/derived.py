@@ -0,0 +1,75 @@
+"""
+Numeric fields derived from the free-text recipe columns, stored alongside
+them so time and servings can be filtered and sorted with indexes.
+"""
+import re
+from typing import Dict, Optional, Tuple
+
+# Number words only as whole words, so "often" or "tenderloin" is not read as ten
+_NUMBER = r"(\d+(?:\.\d+)?|\b(?:one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve)\b)"
+_RANGE_RE = re.compile(_NUMBER + r"\s*(?:-|–|—|to|or)\s*" + _NUMBER + r"(\s*dozen)?", re.I)
+_SINGLE_RE = re.compile(_NUMBER + r"(\s*dozen)?", re.I)
+_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+MAX_SERVINGS = 1000
+
+
+def _number(token: str) -> float:
+    return float(_WORDS.get(token.lower(), token))
+
+
+def parse_servings_range(servings: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (min, max) servings from yield text such as "4", "Serves 6-8",
+    "4 to 6 servings", "2 dozen cookies" or "one loaf"; (None, None) when
+    there is no usable number.
+    """
+    text = servings or ""
+    match = _RANGE_RE.search(text)
+    if match:
+        low, high = sorted((_number(match.group(1)), _number(match.group(2))))
+        dozen = match.group(3)
+    else:
+        match = _SINGLE_RE.search(text)
+        if not match:
+            return None, None
+        low = high = _number(match.group(1))
+        dozen = match.group(2)
+    if dozen:
+        low, high = low * 12, high * 12
+    low, high = max(1, round(low)), round(high)
+    if not high or high > MAX_SERVINGS:
+        return None, None
+    return low, high
+
+
+def count_ingredients(ingredients: Optional[str]) -> int:
+    """Ingredient lines, leaving out blank lines and section headings such as "For the sauce:"."""
+    return sum(1 for line in (ingredients or "").splitlines() if line.strip() and not line.strip().endswith(":"))
+
+
+def total_time(prep_time_minutes: Optional[int], cook_time_minutes: Optional[int]) -> Optional[int]:
+    if prep_time_minutes is None and cook_time_minutes is None:
+        return None
+    return (prep_time_minutes or 0) + (cook_time_minutes or 0)
+
+
+def derived_fields(prep_time_minutes: Optional[int], cook_time_minutes: Optional[int],
+                   servings: Optional[str], ingredients: Optional[str]) -> Dict[str, Optional[int]]:
+    servings_min, servings_max = parse_servings_range(servings)
+    return {
+        "total_time_minutes": total_time(prep_time_minutes, cook_time_minutes),
+        "servings_min": servings_min,
+        "servings_max": servings_max,
+        "ingredient_count": count_ingredients(ingredients),
+    }
+
+
+def apply_derived(recipe) -> None:
+    """Recompute a Recipe's derived columns from its text fields."""
+    for name, value in derived_fields(
+        recipe.prep_time_minutes, recipe.cook_time_minutes, recipe.servings, recipe.ingredients
+    ).items():
+        setattr(recipe, name, value)
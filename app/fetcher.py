@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "15"))
+
+# Record/replay for reproducible imports: with FETCH_REPLAY_DIR set, pages are
+# served from recorded fixtures and the network is never touched; with
+# FETCH_RECORD_DIR set, every live fetch is saved there.
+FETCH_REPLAY_DIR = os.getenv("FETCH_REPLAY_DIR") or None
+FETCH_RECORD_DIR = os.getenv("FETCH_RECORD_DIR") or None
+FETCH_REPLAY_LATENCY_MS = float(os.getenv("FETCH_REPLAY_LATENCY_MS", "0"))
+
+FETCH_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
+
+
+class FixtureStore:
+    """Recorded pages on disk, one JSON file per URL named by its SHA-256."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path(self, url: str) -> Path:
+        return self.root / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def load(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self.path(url).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def save(self, url: str, html: str, status: int = 200, content_type: str = "text/html",
+             etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.root.mkdir(parents=True, exist_ok=True)
+        fixture = {
+            "url": url,
+            "status": status,
+            "content_type": content_type,
+            "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "etag": etag,
+            "last_modified": last_modified,
+            "html": html,
+        }
+        self.path(url).write_text(json.dumps(fixture, ensure_ascii=False), encoding="utf-8")
+
+    def __len__(self) -> int:
+        return len(list(self.root.glob("*.json"))) if self.root.exists() else 0
+
+
+def fetch_page(url: str) -> str:
+    """Return the HTML for a recipe page, honouring record/replay settings."""
+    if FETCH_REPLAY_DIR:
+        fixture = FixtureStore(FETCH_REPLAY_DIR).load(url)
+        if fixture is None:
+            raise LookupError(f"No recorded page for {url}")
+        if FETCH_REPLAY_LATENCY_MS:
+            time.sleep(FETCH_REPLAY_LATENCY_MS / 1000)
+        if fixture.get("status", 200) >= 400:
+            raise LookupError(f"Recorded status {fixture['status']} for {url}")
+        return fixture["html"]
+
+    import requests
+
+    resp = requests.get(url, headers=FETCH_HEADERS, timeout=FETCH_TIMEOUT)
+    resp.raise_for_status()
+    if FETCH_RECORD_DIR:
+        FixtureStore(FETCH_RECORD_DIR).save(url, resp.text, resp.status_code, resp.headers.get("content-type", "text/html"))
+    return resp.text
+
+
+def fetch_if_changed(url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Conditional GET for refreshes. Returns {"status", "html", "etag", "last_modified"};
+    status is 304 with no html when the server says the page is unchanged.
+    HTTP error statuses are returned rather than raised so callers can tell
+    a removed page (404/410) from a transient failure.
+    """
+    if FETCH_REPLAY_DIR:
+        fixture = FixtureStore(FETCH_REPLAY_DIR).load(url)
+        if fixture is None:
+            raise LookupError(f"No recorded page for {url}")
+        if FETCH_REPLAY_LATENCY_MS:
+            time.sleep(FETCH_REPLAY_LATENCY_MS / 1000)
+        validators = {"etag": fixture.get("etag"), "last_modified": fixture.get("last_modified")}
+        if (etag and etag == validators["etag"]) or (last_modified and last_modified == validators["last_modified"]):
+            return {"status": 304, "html": None, **validators}
+        return {"status": fixture.get("status", 200), "html": fixture["html"], **validators}
+
+    import requests
+
+    headers = dict(FETCH_HEADERS)
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    resp = requests.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+    validators = {"etag": resp.headers.get("etag"), "last_modified": resp.headers.get("last-modified")}
+    if resp.status_code == 200 and FETCH_RECORD_DIR:
+        FixtureStore(FETCH_RECORD_DIR).save(
+            url, resp.text, resp.status_code, resp.headers.get("content-type", "text/html"), **validators
+        )
+    return {"status": resp.status_code, "html": resp.text if resp.status_code == 200 else None, **validators}
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from jinja2 import Environment
+from markupsafe import Markup
+
+FRAGMENT_CACHE_SIZE = int(os.getenv("FRAGMENT_CACHE_SIZE", "5000"))
+# Optional second tier so fragments survive restarts; disabled when unset
+FRAGMENT_CACHE_DIR = os.getenv("FRAGMENT_CACHE_DIR") or None
+FRAGMENT_CACHE_DISK_ENTRIES = int(os.getenv("FRAGMENT_CACHE_DISK_ENTRIES", "50000"))
+
+
+class FragmentCache:
+    """
+    Bounded in-memory LRU of rendered HTML with an optional on-disk tier.
+    The disk tier is bounded too: past ``max_disk_entries`` files, the least
+    recently used tenth (by modification time, refreshed on reads) is removed.
+    """
+
+    def __init__(self, max_entries: int, disk_dir: Optional[str] = None,
+                 max_disk_entries: int = FRAGMENT_CACHE_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_entries = len(self._disk_files())
+        self.hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key: str) -> Path:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.disk_dir / digest[:2] / f"{digest}.html"
+
+    def _disk_files(self) -> List[Path]:
+        if self.disk_dir is None or not self.disk_dir.exists():
+            return []
+        return list(self.disk_dir.glob("*/*.html"))
+
+    def _prune_disk(self):
+        stamped = []
+        for path in self._disk_files():
+            try:
+                stamped.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                pass
+        stamped.sort()
+        excess = len(stamped) - self.max_disk_entries + self.max_disk_entries // 10
+        for _, path in stamped[:max(excess, 0)]:
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._disk_entries = len(stamped) - max(excess, 0)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return html
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                html = path.read_text(encoding="utf-8")
+                os.utime(path)
+            except FileNotFoundError:
+                html = None
+            if html is not None:
+                self._remember(key, html)
+                with self._lock:
+                    self.hits += 1
+                return html
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, html: str):
+        self._remember(key, html)
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            is_new = not path.exists()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(html, encoding="utf-8")
+            os.replace(tmp, path)
+            if is_new:
+                with self._lock:
+                    self._disk_entries += 1
+                    full = self._disk_entries > self.max_disk_entries
+                if full:
+                    self._prune_disk()
+
+    def _remember(self, key: str, html: str):
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def install(env: Environment, cache: FragmentCache):
+    """
+    Expose ``fragment(name, recipe)`` to templates.
+
+    Renders ``fragments/<name>.html`` with the recipe and caches the HTML
+    under the recipe id and version. The template source hash is part of the
+    key so edited templates never serve stale markup from the disk tier.
+    Category names and colours are too: renaming, recolouring or relinking a
+    category does not touch the recipe's updated_at.
+    """
+    template_digests: Dict[str, str] = {}
+
+    def _template_digest(name: str) -> str:
+        digest = template_digests.get(name)
+        if digest is None:
+            source, _, _ = env.loader.get_source(env, name)
+            digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+            template_digests[name] = digest
+        return digest
+
+    def fragment(name: str, recipe) -> Markup:
+        template_name = f"fragments/{name}.html"
+        version = recipe.updated_at or recipe.created_at
+        categories = "|".join(f"{category.id}:{category.name}:{category.color}" for category in recipe.categories)
+        key = (
+            f"{name}:{_template_digest(template_name)}:{recipe.id}:{version.isoformat() if version else ''}:"
+            f"{hashlib.sha1(categories.encode('utf-8')).hexdigest()[:12]}"
+        )
+
+        html = cache.get(key)
+        if html is None:
+            html = env.get_template(template_name).render(recipe=recipe)
+            cache.set(key, html)
+        return Markup(html)
+
+    env.globals["fragment"] = fragment
+
+
+fragment_cache = FragmentCache(FRAGMENT_CACHE_SIZE, FRAGMENT_CACHE_DIR)
@@ -0,0 +1,268 @@
+"""
+Circuit breakers and health probes for the AI providers.
+
+Each provider has a breaker. After BREAKER_FAILURES consecutive failed
+calls it opens, and calls are refused at once with ProviderUnavailable
+instead of waiting on connection attempts and timeouts. After
+BREAKER_RESET_SECONDS one trial call is let through (half-open). The
+breaker closes if the trial succeeds and opens again if it fails.
+
+A background thread probes each provider every HEALTH_PROBE_SECONDS: Ollama's
+/api/tags (the model must be pulled) and Gemini's model metadata, which
+uses no tokens. A failed probe opens the breaker straight away, so an
+outage is noticed before any import has to hit it. A successful probe
+moves an open breaker to half-open. /healthz reports the result.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from . import metrics
+
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "3"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+HEALTH_PROBES_ENABLED = os.getenv("HEALTH_PROBES_ENABLED", "1") == "1"
+HEALTH_PROBE_SECONDS = float(os.getenv("HEALTH_PROBE_SECONDS", "15"))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "2"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+metrics.describe("provider_breaker_transitions_total", "counter", "Circuit breaker state changes by provider and new state")
+metrics.describe("provider_breaker_rejections_total", "counter", "Provider calls refused by an open circuit breaker")
+metrics.describe("provider_probes_total", "counter", "Provider health probes by outcome")
+
+
+class ProviderUnavailable(Exception):
+    """A provider's circuit breaker is open; the call was not attempted."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one provider. Safe to share between threads."""
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURES,
+                 reset_seconds: float = BREAKER_RESET_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def _move(self, state: str):
+        if state != self.state:
+            self.state = state
+            metrics.inc("provider_breaker_transitions_total", provider=self.name, state=state)
+        if state == OPEN:
+            self.opened_at = self.clock()
+        self._trial = False
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead. An open breaker lets one trial call through once its wait is over."""
+        with self._lock:
+            if self.state == OPEN and self.clock() - self.opened_at >= self.reset_seconds:
+                self._move(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def check(self):
+        if not self.allow():
+            metrics.inc("provider_breaker_rejections_total", provider=self.name)
+            raise ProviderUnavailable(f"{self.name.title()} is unavailable (circuit open: {self.last_error})")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._move(CLOSED)
+
+    def record_failure(self, error: str):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error[:200]
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._move(OPEN)
+
+    def release(self):
+        """A call ended without an outcome (interrupted): let the next call be the trial."""
+        with self._lock:
+            self._trial = False
+
+    def record_calls(self, outcomes: List[Optional[BaseException]]):
+        """
+        One outcome for several calls made as one, such as the chunks of a
+        page: a success if any call got through, else one failure.
+        """
+        if any(error is None for error in outcomes):
+            self.record_success()
+        elif outcomes:
+            error = outcomes[-1]
+            self.record_failure(f"{type(error).__name__}: {error}")
+        else:
+            self.release()
+
+    def trip(self, error: str):
+        """Open now, whatever the failure count (a failed health probe)."""
+        with self._lock:
+            self.last_error = error[:200]
+            self._move(OPEN)
+
+    def probe_succeeded(self):
+        """The provider answers again: let the next call through as a trial."""
+        with self._lock:
+            if self.state == OPEN:
+                self._move(HALF_OPEN)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "last_error": self.last_error,
+                "open_for_seconds": round(self.clock() - self.opened_at, 1) if self.state == OPEN else None,
+            }
+
+
+breakers: Dict[str, CircuitBreaker] = {name: CircuitBreaker(name) for name in ("ollama", "gemini")}
+
+
+@contextmanager
+def guard(provider: str, outcomes: Optional[List[Optional[BaseException]]] = None) -> Iterator[None]:
+    """
+    Run a provider call through its breaker. Refuses the call while the
+    breaker is open. Any exception from the call counts as a failure.
+
+    With ``outcomes`` the breaker is left alone and the call's exception (or
+    None) is appended instead, for callers that check the breaker once and
+    record several calls as one with CircuitBreaker.record_calls.
+    """
+    if outcomes is not None:
+        try:
+            yield
+        except Exception as e:
+            outcomes.append(e)
+            raise
+        outcomes.append(None)
+        return
+
+    breaker = breakers[provider]
+    breaker.check()
+    recorded = False
+    try:
+        yield
+    except Exception as e:
+        breaker.record_failure(f"{type(e).__name__}: {e}")
+        recorded = True
+        raise
+    else:
+        breaker.record_success()
+        recorded = True
+    finally:
+        # KeyboardInterrupt or a cancelled worker must not hold a half-open trial forever
+        if not recorded:
+            breaker.release()
+
+
+def probe_ollama():
+    import requests
+
+    from .ai_parser import OLLAMA_HOST, OLLAMA_MODEL
+
+    resp = requests.get(f"{OLLAMA_HOST}/api/tags", timeout=HEALTH_PROBE_TIMEOUT)
+    resp.raise_for_status()
+    names = {model.get("name", "") for model in resp.json().get("models", [])}
+    if OLLAMA_MODEL not in names and f"{OLLAMA_MODEL}:latest" not in names:
+        raise RuntimeError(f"model {OLLAMA_MODEL} is not pulled")
+
+
+def probe_gemini():
+    from .ai_parser import GEMINI_MODEL, get_genai
+
+    get_genai().get_model(f"models/{GEMINI_MODEL}", request_options={"timeout": HEALTH_PROBE_TIMEOUT})
+
+
+def configured() -> Dict[str, bool]:
+    from .ai_parser import GEMINI_API_KEY
+
+    return {"ollama": True, "gemini": bool(GEMINI_API_KEY)}
+
+
+PROBES: Dict[str, Callable[[], None]] = {"ollama": probe_ollama, "gemini": probe_gemini}
+_probes: Dict[str, Dict] = {}
+_stop = threading.Event()
+
+
+def probe(provider: str) -> bool:
+    """Probe one provider and update its breaker. Returns whether it answered."""
+    start = time.perf_counter()
+    try:
+        PROBES[provider]()
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {str(e)[:150]}"
+    _probes[provider] = {
+        "ok": error is None,
+        "error": error,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        "at": time.time(),
+    }
+    metrics.inc("provider_probes_total", provider=provider, outcome="success" if error is None else "failure")
+    if error is None:
+        breakers[provider].probe_succeeded()
+    else:
+        breakers[provider].trip(f"probe failed: {error}")
+    return error is None
+
+
+def probe_all():
+    for provider, enabled in configured().items():
+        if enabled:
+            probe(provider)
+
+
+def start_probes() -> Optional[threading.Thread]:
+    """Probe the configured providers now and then every HEALTH_PROBE_SECONDS, in a daemon thread."""
+    if not HEALTH_PROBES_ENABLED:
+        return None
+    _stop.clear()
+
+    def _run():
+        while True:
+            try:
+                probe_all()
+            except Exception as e:
+                print(f"Health probe error: {e}")
+            if _stop.wait(HEALTH_PROBE_SECONDS):
+                return
+
+    thread = threading.Thread(target=_run, name="health-probes", daemon=True)
+    thread.start()
+    return thread
+
+
+def stop_probes():
+    _stop.set()
+
+
+def provider_health() -> Dict[str, Dict]:
+    """Breaker state and last probe of each provider, for /healthz."""
+    enabled = configured()
+    return {
+        name: {"configured": enabled[name], **breaker.snapshot(), "probe": _probes.get(name)}
+        for name, breaker in breakers.items()
+    }
+
+
+def reset():
+    """Close every breaker and forget probe results."""
+    for name in list(breakers):
+        breakers[name] = CircuitBreaker(name)
+    _probes.clear()
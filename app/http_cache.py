@@ -0,0 +1,84 @@
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# Cache-Control per route; "no-cache" lets browsers and proxies keep a copy
+# but revalidate it with If-None-Match on every use.
+CACHE_CONTROL: Dict[str, str] = {
+    "list_recipes": os.getenv("CACHE_CONTROL_LIST_RECIPES", "no-cache"),
+    "recipe_detail": os.getenv("CACHE_CONTROL_RECIPE_DETAIL", "no-cache"),
+}
+
+
+def _build_id() -> str:
+    """
+    Hash of the templates (and DEPLOY_ID, if set), so a deploy that changes
+    what pages look like invalidates old copies. Every worker process computes
+    the same value, unlike a per-process start time.
+    """
+    digest = hashlib.sha1(os.getenv("DEPLOY_ID", "").encode("utf-8"))
+    templates = Path(__file__).parent / "templates"
+    for path in sorted(templates.rglob("*")):
+        if path.is_file():
+            digest.update(path.relative_to(templates).as_posix().encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+# Included in every ETag
+BUILD_ID = _build_id()
+
+
+def make_etag(*parts) -> str:
+    """Build a weak ETag from the values the rendered page depends on."""
+    raw = "|".join([BUILD_ID] + [str(part) for part in parts])
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison: ignore the W/ prefix on both sides
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since for a GET request."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def cache_headers(route: str, etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL[route]}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    return headers
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
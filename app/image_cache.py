@@ -0,0 +1,223 @@
+import hashlib
+import ipaddress
+import os
+import socket
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from .fetcher import FETCH_HEADERS
+
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", "./image_cache")
+IMAGE_CACHE_MAX_MB = int(os.getenv("IMAGE_CACHE_MAX_MB", "256"))
+IMAGE_CACHE_CONTROL = os.getenv("IMAGE_CACHE_CONTROL", "public, max-age=2592000")
+# Limits on a source image: download size, decoded pixels and redirects followed
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_MB", "10")) * 1024 * 1024
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", "40000000"))
+IMAGE_MAX_REDIRECTS = 5
+
+# Bounding boxes (width, height) for each stored variant
+VARIANTS: Dict[str, Tuple[int, int]] = {
+    "thumb": (480, 360),
+    "detail": (1200, 900),
+}
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _addresses(host: str) -> List[str]:
+    return [info[4][0] for info in socket.getaddrinfo(host, None)]
+
+
+def check_public_url(url: str):
+    """Raise ValueError unless ``url`` is http(s) on a host that resolves only to public addresses."""
+    parts = urlparse(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Not an http(s) URL: {url[:100]}")
+    for address in _addresses(parts.hostname):
+        if not ipaddress.ip_address(address.split("%")[0]).is_global:
+            raise ValueError(f"Refusing to fetch from a private address: {parts.hostname}")
+
+
+def download_image(url: str) -> bytes:
+    """
+    Fetch a user-supplied image URL, checking every redirect target with
+    check_public_url and reading at most IMAGE_MAX_BYTES.
+    """
+    import requests
+
+    for _ in range(IMAGE_MAX_REDIRECTS + 1):
+        check_public_url(url)
+        with requests.get(url, headers=FETCH_HEADERS, timeout=15, stream=True, allow_redirects=False) as resp:
+            if resp.is_redirect:
+                url = urljoin(url, resp.headers["location"])
+                continue
+            resp.raise_for_status()
+            length = resp.headers.get("content-length", "")
+            if length.isdigit() and int(length) > IMAGE_MAX_BYTES:
+                raise ValueError(f"Image too large: {length} bytes")
+            data = bytearray()
+            for chunk in resp.iter_content(64 * 1024):
+                data += chunk
+                if len(data) > IMAGE_MAX_BYTES:
+                    raise ValueError(f"Image too large: over {IMAGE_MAX_BYTES} bytes")
+            return bytes(data)
+    raise ValueError(f"Too many redirects: {url[:100]}")
+
+
+def resize_variants(data: bytes) -> Dict[str, bytes]:
+    """Decode an image and return JPEG bytes for every configured variant."""
+    from PIL import Image
+
+    Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+    try:
+        source = Image.open(BytesIO(data))
+    except Image.DecompressionBombError as e:
+        raise ValueError(f"Image too large: {e}") from e
+    with source as img:
+        if img.width * img.height > IMAGE_MAX_PIXELS:
+            raise ValueError(f"Image too large: {img.width}x{img.height}")
+        img = img.convert("RGB")
+        variants = {}
+        for name, box in VARIANTS.items():
+            copy = img.copy()
+            copy.thumbnail(box)
+            out = BytesIO()
+            copy.save(out, format="JPEG", quality=82, optimize=True, progressive=True)
+            variants[name] = out.getvalue()
+    return variants
+
+
+class ImageCache:
+    """
+    Content-addressed on-disk cache of resized recipe images.
+
+    Variants are stored under the SHA-256 of the original image bytes, so the
+    same picture hotlinked from several URLs is only kept once. A small index
+    maps each source URL to its content hash. Total size is capped and the
+    least recently served variants are evicted first.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lru: "OrderedDict[Path, int]" = OrderedDict()
+        self._total = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._url_locks: Dict[str, threading.Lock] = {}
+
+    def _blob_path(self, digest: str, variant: str) -> Path:
+        return self.root / "blobs" / digest[:2] / f"{digest}-{variant}.jpg"
+
+    def _index_path(self, url: str) -> Path:
+        return self.root / "urls" / _sha256(url.encode("utf-8"))
+
+    def _load(self):
+        """Rebuild the LRU from disk, oldest files first. Caller holds the lock."""
+        if self._loaded:
+            return
+        blobs = self.root / "blobs"
+        if blobs.exists():
+            files = [(p.stat().st_mtime, p) for p in blobs.glob("*/*.jpg")]
+            for _, path in sorted(files):
+                size = path.stat().st_size
+                self._lru[path] = size
+                self._total += size
+        self._loaded = True
+
+    def _touch(self, path: Path):
+        with self._lock:
+            self._load()
+            if path in self._lru:
+                self._lru.move_to_end(path)
+
+    def _store(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._load()
+            self._total -= self._lru.pop(path, 0)
+            self._lru[path] = len(data)
+            self._total += len(data)
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used variants until under the cap. Caller holds the lock."""
+        while self._total > self.max_bytes and len(self._lru) > 1:
+            path, size = self._lru.popitem(last=False)
+            self._total -= size
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def lookup(self, url: str, variant: str) -> Optional[Tuple[Path, str]]:
+        """Return (path, content hash) of a cached variant, or None on a miss."""
+        index = self._index_path(url)
+        try:
+            digest = index.read_text().strip()
+        except FileNotFoundError:
+            return None
+        path = self._blob_path(digest, variant)
+        if not path.exists():
+            return None
+        self._touch(path)
+        return path, digest
+
+    def fetch(self, url: str) -> str:
+        """Download an image, store all variants and return its content hash."""
+        data = download_image(url)
+        digest = _sha256(data)
+
+        for variant, blob in resize_variants(data).items():
+            path = self._blob_path(digest, variant)
+            if path.exists():
+                self._touch(path)
+            else:
+                self._store(path, blob)
+
+        index = self._index_path(url)
+        index.parent.mkdir(parents=True, exist_ok=True)
+        index.write_text(digest)
+        return digest
+
+    def get(self, url: str, variant: str) -> Tuple[Path, str]:
+        """Return a cached variant, fetching the source image on a miss."""
+        if variant not in VARIANTS:
+            raise KeyError(f"Unknown image variant: {variant}")
+
+        hit = self.lookup(url, variant)
+        if hit:
+            return hit
+
+        # One download per URL even when several requests miss at once
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+        with url_lock:
+            hit = self.lookup(url, variant)
+            if hit:
+                return hit
+            digest = self.fetch(url)
+        with self._lock:
+            self._url_locks.pop(url, None)
+        return self._blob_path(digest, variant), digest
+
+    def prefetch(self, url: Optional[str]):
+        """Warm the cache for a URL; meant to run as a background task."""
+        if not url:
+            return
+        try:
+            self.get(url, "thumb")
+        except Exception as e:
+            print(f"Image prefetch error for {url}: {e}")
+
+
+image_cache = ImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_MB * 1024 * 1024)
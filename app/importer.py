@@ -0,0 +1,125 @@
+"""
+Recipe extraction for imports: fetch the page once, then try the extraction
+methods in the order chosen by the per-domain router.
+"""
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .ai_parser import parse_recipe_with_ai
+from .archive import archive_page
+from .fetcher import fetch_page
+from .health import ProviderUnavailable, configured
+from .routing import completeness, domain_of, plan, record_attempts
+
+
+def _serialize_scraped(scraper) -> dict:
+    """Normalize scraped recipe data into our expected shape."""
+    def _join_lines(items: Optional[List[str]]) -> str:
+        if not items:
+            return ""
+        cleaned = [item.strip() for item in items if item and item.strip()]
+        return "\n".join(cleaned)
+
+    def _safe_call(func, default=None):
+        try:
+            return func() or default
+        except:
+            return default
+
+    return {
+        "title": _safe_call(scraper.title, ""),
+        "source_url": scraper.url or "",
+        "ingredients": _join_lines(_safe_call(scraper.ingredients, [])),
+        "instructions": _join_lines(_safe_call(scraper.instructions_list, [])),
+        "prep_time_minutes": _safe_call(scraper.prep_time),
+        "cook_time_minutes": _safe_call(scraper.cook_time),
+        "servings": _safe_call(scraper.yields, ""),
+        "image_url": _safe_call(scraper.image, ""),
+    }
+
+
+def extract_with(method: str, url: str, html: str) -> Dict:
+    """Run one extraction method; raises when it yields no recipe."""
+    if method == "standard":
+        # Imported here rather than at module level: recipe_scrapers loads
+        # hundreds of site modules and would dominate cold start
+        from recipe_scrapers import scrape_html
+
+        recipe_data = _serialize_scraped(scrape_html(html, org_url=url))
+        recipe_data["source_url"] = url
+    else:
+        recipe_data = parse_recipe_with_ai(url, html, provider=method)
+
+    if not recipe_data.get("title"):
+        raise ValueError(f"{method.title()} returned empty result")
+    return recipe_data
+
+
+def extract_recipe(db: Session, url: str) -> Tuple[Dict, str, Optional[str], List[str]]:
+    """
+    Import a recipe page. Returns (recipe_data, method_used, error, failed_methods).
+
+    Each attempt's outcome is recorded so the router learns which method
+    works best for the domain.
+    """
+    try:
+        html = fetch_page(url)
+    except Exception as e:
+        return {}, "failed", f"Could not fetch page: {str(e)[:100]}", []
+    try:
+        archive_page(db, url, html)
+    except Exception as e:
+        db.rollback()
+        print(f"Page archive error for {url}: {e}")
+    return extract_from_html(db, url, html)
+
+
+def extract_from_html(db: Session, url: str, html: str) -> Tuple[Dict, str, Optional[str], List[str]]:
+    """extract_recipe for a page that has already been fetched."""
+    domain = domain_of(url)
+    order, _ = plan(db, domain)
+    attempts, errors, failed = [], [], []
+    recipe_data, method_used = {}, "failed"
+    enabled = configured()
+
+    for method in order:
+        if not enabled.get(method, True):
+            # No API key: not the domain's fault, so not recorded either
+            errors.append(f"{method.title()}: not configured")
+            failed.append(method)
+            continue
+        start = time.perf_counter()
+        try:
+            recipe_data = extract_with(method, url, html)
+        except ProviderUnavailable as e:
+            # Refused by the circuit breaker without a request: nothing
+            # learned about this domain, so it is not recorded
+            errors.append(f"{method.title()}: {str(e)[:50]}")
+            failed.append(method)
+            continue
+        except Exception as e:
+            recipe_data = {}
+            errors.append(f"{method.title()}: {str(e)[:50]}")
+            failed.append(method)
+        latency_ms = (time.perf_counter() - start) * 1000
+        ok = bool(recipe_data)
+        attempts.append({
+            "provider": method,
+            "ok": ok,
+            "latency_ms": latency_ms,
+            "completeness": completeness(recipe_data) if ok else 0.0,
+        })
+        if ok:
+            method_used = method
+            break
+
+    try:
+        record_attempts(db, domain, attempts)
+    except Exception as e:
+        db.rollback()
+        print(f"Routing stats error: {e}")
+
+    error = None if recipe_data else f"All methods failed. {', '.join(errors)}"
+    return recipe_data, method_used, error, failed
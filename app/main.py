@@ -1,59 +1,73 @@
+from contextlib import asynccontextmanager
 from typing import List, Optional
-import requests
+from urllib.parse import quote_plus
 
-from fastapi import Depends, FastAPI, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import BackgroundTasks, Depends, FastAPI, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.responses import FileResponse, HTMLResponse, PlainTextResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from recipe_scrapers import scrape_me
-from sqlalchemy.orm import Session, joinedload
-
-from .database import get_db
-from .models import Category, Recipe, RecipeCategory
-from .ai_parser import parse_recipe_with_ai, AI_MODEL_PROVIDER, GEMINI_API_KEY, OLLAMA_HOST
-
-app = FastAPI(title="Recipe Importer")
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .api import FastJSONResponse, router as api_router
+from .autocomplete import MAX_LIMIT as AUTOCOMPLETE_MAX_LIMIT, get_index as get_autocomplete_index
+from .backup import iter_export, restore
+from .crud import (
+    SORTS,
+    collection_stats_async,
+    create_recipe_record,
+    get_recipe_async,
+    list_categories_async,
+    list_recipes_async,
+)
+from .database import get_async_db, get_db
+from .health import provider_health, start_probes, stop_probes
+from .models import Category, Recipe
+from .fragment_cache import fragment_cache, install as install_fragment_cache
+from .http_cache import (
+    cache_headers,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+from .image_cache import IMAGE_CACHE_CONTROL, VARIANTS, image_cache
+from .importer import extract_recipe
+from .shopping import build_shopping_list, parse_selection
+from .metrics import render as render_metrics
+from .refresh import flush_views_async, record_view, start_scheduler, stop_scheduler
+from .warmup import start_warmup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_warmup()
+    start_scheduler()
+    start_probes()
+    yield
+    stop_probes()
+    stop_scheduler()
+
+
+app = FastAPI(title="Recipe Importer", lifespan=lifespan)
+app.include_router(api_router)
 
 templates = Jinja2Templates(directory="app/templates")
-
-
-def _serialize_scraped(scraper) -> dict:
-    """Normalize scraped recipe data into our expected shape."""
-    def _join_lines(items: Optional[List[str]]) -> str:
-        if not items:
-            return ""
-        cleaned = [item.strip() for item in items if item and item.strip()]
-        return "\n".join(cleaned)
-
-    def _safe_call(func, default=None):
-        try:
-            return func() or default
-        except:
-            return default
-
-    return {
-        "title": _safe_call(scraper.title, ""),
-        "source_url": scraper.url or "",
-        "ingredients": _join_lines(_safe_call(scraper.ingredients, [])),
-        "instructions": _join_lines(_safe_call(scraper.instructions_list, [])),
-        "prep_time_minutes": _safe_call(scraper.prep_time),
-        "cook_time_minutes": _safe_call(scraper.cook_time),
-        "servings": _safe_call(scraper.yields, ""),
-        "image_url": _safe_call(scraper.image, ""),
-    }
+install_fragment_cache(templates.env, fragment_cache)
 
 
 @app.get("/", response_class=HTMLResponse)
 def home(request: Request):
-    return templates.TemplateResponse("home.html", {"request": request})
+    return templates.TemplateResponse(request, "home.html")
 
 
 @app.get("/manual", response_class=HTMLResponse)
-def manual_entry(request: Request, db: Session = Depends(get_db)):
-    categories = db.query(Category).order_by(Category.name).all()
+async def manual_entry(request: Request, db: AsyncSession = Depends(get_async_db)):
+    categories = await list_categories_async(db)
     return templates.TemplateResponse(
+        request,
         "edit_recipe.html",
         {
-            "request": request,
             "recipe": {},
             "categories": categories,
             "error": None,
@@ -62,55 +76,17 @@ def manual_entry(request: Request, db: Session = Depends(get_db)):
 
 
 @app.post("/import", response_class=HTMLResponse)
-async def import_recipe(
+def import_recipe(
     request: Request,
     url: str = Form(...),
     db: Session = Depends(get_db),
 ):
     categories = db.query(Category).order_by(Category.name).all()
-    recipe_data: dict = {}
-    error: Optional[str] = None
-    method_used = "standard"
-
     cleaned_url = url.strip()
-    
-    # Try 1: Standard scraper first (fastest and most reliable for supported sites)
-    try:
-        scraper = scrape_me(cleaned_url)
-        recipe_data = _serialize_scraped(scraper)
-        recipe_data["source_url"] = cleaned_url
-        method_used = "standard"
-    except Exception as e1:
-        # Try 2: Fallback to Gemini AI
-        try:
-            import os
-            os.environ["AI_MODEL_PROVIDER"] = "gemini"
-            
-            headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
-            resp = requests.get(cleaned_url, headers=headers, timeout=15)
-            resp.raise_for_status()
-            recipe_data = parse_recipe_with_ai(cleaned_url, resp.text)
-            method_used = "gemini"
-            
-            if not recipe_data.get("title"):
-                raise ValueError("Gemini returned empty result")
-        except Exception as e2:
-            # Try 3: Final fallback to Ollama
-            try:
-                import os
-                os.environ["AI_MODEL_PROVIDER"] = "ollama"
-                
-                headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
-                resp = requests.get(cleaned_url, headers=headers, timeout=15)
-                resp.raise_for_status()
-                recipe_data = parse_recipe_with_ai(cleaned_url, resp.text)
-                method_used = "ollama"
-                
-                if not recipe_data.get("title"):
-                    raise ValueError("Ollama returned empty result")
-            except Exception as e3:
-                error = f"All methods failed. Standard: {str(e1)[:50]}, Gemini: {str(e2)[:50]}, Ollama: {str(e3)[:50]}"
-                method_used = "failed"
+
+    # Fetches the page once, then tries each extraction method in the order
+    # the per-domain router picks (standard scraper, Gemini, Ollama)
+    recipe_data, method_used, error, failed_methods = extract_recipe(db, cleaned_url)
 
     # Ensure we have a dict even on error
     if not recipe_data:
@@ -128,15 +104,16 @@ async def import_recipe(
     # Add info about which method was successful
     if not error and method_used != "failed":
         success_message = f"Recipe imported using {method_used.upper()} method."
-        if method_used != "standard":
-            success_message += f" (Standard scraper failed, used {method_used.upper()} as fallback)"
+        if failed_methods:
+            tried = " and ".join(method.upper() for method in failed_methods)
+            success_message += f" ({tried} failed, used {method_used.upper()} as fallback)"
     else:
         success_message = None
 
     return templates.TemplateResponse(
+        request,
         "edit_recipe.html",
         {
-            "request": request,
             "recipe": recipe_data,
             "categories": categories,
             "error": error,
@@ -146,8 +123,9 @@ async def import_recipe(
 
 
 @app.post("/recipes")
-async def create_recipe(
+def create_recipe(
     request: Request,
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     source_url: str = Form(...),
     ingredients: str = Form(""),
@@ -160,98 +138,226 @@ async def create_recipe(
     new_category: str = Form(""),
     db: Session = Depends(get_db),
 ):
-    cleaned_title = title.strip()
-    cleaned_url = source_url.strip()
-
-    if not cleaned_title or not cleaned_url:
-        raise HTTPException(status_code=400, detail="Title and source URL are required.")
-
-    recipe = Recipe(
-        title=cleaned_title,
-        source_url=cleaned_url,
-        ingredients=ingredients.strip(),
-        instructions=instructions.strip(),
-        prep_time_minutes=prep_time_minutes,
-        cook_time_minutes=cook_time_minutes,
-        servings=servings.strip() or None,
-        image_url=image_url.strip() or None,
-    )
-
-    # Attach existing categories
-    if category_ids:
-        existing = (
-            db.query(Category)
-            .filter(Category.id.in_(category_ids))
-            .order_by(Category.name)
-            .all()
+    try:
+        recipe = create_recipe_record(
+            db,
+            title=title,
+            source_url=source_url,
+            ingredients=ingredients,
+            instructions=instructions,
+            prep_time_minutes=prep_time_minutes,
+            cook_time_minutes=cook_time_minutes,
+            servings=servings,
+            image_url=image_url,
+            category_ids=category_ids,
+            new_category=new_category,
         )
-        recipe.categories.extend(existing)
-
-    # Create a new category if provided
-    cleaned_new_cat = new_category.strip()
-    if cleaned_new_cat:
-        found = db.query(Category).filter(Category.name == cleaned_new_cat).first()
-        if not found:
-            found = Category(name=cleaned_new_cat)
-            db.add(found)
-            db.flush()  # ensures id is available
-        recipe.categories.append(found)
-
-    db.add(recipe)
-    db.commit()
-    db.refresh(recipe)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Fetch and resize the image now so the first list render is served locally
+    background_tasks.add_task(image_cache.prefetch, recipe.image_url)
 
     return RedirectResponse(url=f"/recipes/{recipe.id}", status_code=303)
 
 
+def _optional_int(name: str, value: Optional[str]) -> Optional[int]:
+    if value is None or not value.strip():
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be a whole number")
+
+
 @app.get("/recipes", response_class=HTMLResponse)
-def list_recipes(
+async def list_recipes(
     request: Request,
-    category_id: Optional[int] = None,
+    category_id: Optional[str] = None,
     q: Optional[str] = None,
-    db: Session = Depends(get_db),
+    max_time: Optional[str] = None,
+    min_servings: Optional[str] = None,
+    max_servings: Optional[str] = None,
+    max_ingredients: Optional[str] = None,
+    sort: str = "newest",
+    db: AsyncSession = Depends(get_async_db),
 ):
-    query = db.query(Recipe).options(joinedload(Recipe.categories)).order_by(Recipe.created_at.desc())
-    if category_id:
-        query = query.join(RecipeCategory).filter(RecipeCategory.category_id == category_id)
-    if q:
-        search_term = f"%{q}%"
-        query = query.filter(
-            (Recipe.title.ilike(search_term)) |
-            (Recipe.ingredients.ilike(search_term)) |
-            (Recipe.instructions.ilike(search_term))
+    # The filter form submits "" for "Any", so numbers are parsed here rather than by FastAPI
+    category_id = _optional_int("category_id", category_id)
+    filters = {
+        name: parsed
+        for name, value in (
+            ("max_time", max_time),
+            ("min_servings", min_servings),
+            ("max_servings", max_servings),
+            ("max_ingredients", max_ingredients),
         )
-    recipes = query.all()
+        if (parsed := _optional_int(name, value)) is not None
+    }
+    if sort not in SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SORTS)}")
 
-    categories = db.query(Category).order_by(Category.name).all()
+    # Validate against a cheap aggregate before running the real query
+    stats = await collection_stats_async(db)
+    last_modified = stats[1]
+    etag = make_etag(*stats, category_id, q, sort, sorted(filters.items()))
+    headers = cache_headers("list_recipes", etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(headers)
 
-    return templates.TemplateResponse(
+    recipes = await list_recipes_async(db, category_id, q, sort, filters)
+
+    categories = await list_categories_async(db)
+
+    # Rendering every card is CPU-bound; keep it off the event loop
+    return await run_in_threadpool(
+        templates.TemplateResponse,
+        request,
         "recipes_list.html",
         {
-            "request": request,
             "recipes": recipes,
             "categories": categories,
             "selected_category_id": category_id,
             "search_query": q,
+            "filters": filters,
+            "sort": sort,
         },
+        headers=headers,
     )
 
 
+@app.get("/autocomplete")
+def autocomplete(
+    prefix: str = "",
+    limit: int = Query(8, ge=1, le=AUTOCOMPLETE_MAX_LIMIT),
+    db: Session = Depends(get_db),
+):
+    """Typeahead suggestions for the search box: recipe titles, ingredients and categories."""
+    suggestions = get_autocomplete_index(db).suggest(prefix, limit)
+    for suggestion in suggestions:
+        if suggestion["kind"] == "recipe":
+            suggestion["url"] = f"/recipes/{suggestion['id']}"
+        elif suggestion["kind"] == "category":
+            suggestion["url"] = f"/recipes?category_id={suggestion['id']}"
+        else:
+            suggestion["url"] = f"/recipes?q={quote_plus(suggestion['text'])}"
+    return FastJSONResponse({"prefix": prefix, "suggestions": suggestions})
+
+
 @app.get("/recipes/{recipe_id}", response_class=HTMLResponse)
-def recipe_detail(recipe_id: int, request: Request, db: Session = Depends(get_db)):
-    recipe = (
-        db.query(Recipe)
-        .options(joinedload(Recipe.categories))
-        .filter(Recipe.id == recipe_id)
-        .first()
-    )
+async def recipe_detail(recipe_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    version = (
+        await db.execute(select(Recipe.updated_at, Recipe.created_at).where(Recipe.id == recipe_id))
+    ).first()
+    if not version:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    # Buffered in memory and written every VIEW_FLUSH_SECONDS; the refresh scheduler checks popular recipes first
+    if record_view(recipe_id):
+        try:
+            await flush_views_async(db)
+        except Exception as e:
+            await db.rollback()
+            print(f"View count flush error: {e}")
+
+    last_modified = version.updated_at or version.created_at
+    etag = make_etag(recipe_id, last_modified)
+    headers = cache_headers("recipe_detail", etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(headers)
+
+    recipe = await get_recipe_async(db, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
     return templates.TemplateResponse(
+        request,
         "recipe_detail.html",
         {
-            "request": request,
             "recipe": recipe,
         },
+        headers=headers,
+    )
+
+
+@app.get("/shopping-list", response_class=HTMLResponse)
+def shopping_list(request: Request, recipes: str = "", db: Session = Depends(get_db)):
+    """Combined ingredients for ?recipes=12:6,15 (recipe id, optional target servings)."""
+    try:
+        selection = parse_selection(recipes)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Use recipes=<id>[:<servings>],...")
+    shopping = build_shopping_list(db, selection) if selection else None
+    return templates.TemplateResponse(
+        request,
+        "shopping_list.html",
+        {"shopping": shopping, "selection": recipes},
+    )
+
+
+@app.get("/images/{recipe_id}")
+def recipe_image(recipe_id: int, request: Request, size: str = "thumb", db: Session = Depends(get_db)):
+    if size not in VARIANTS:
+        raise HTTPException(status_code=404, detail="Unknown image size")
+
+    recipe = db.get(Recipe, recipe_id)
+    if not recipe or not recipe.image_url:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    try:
+        path, digest = image_cache.get(recipe.image_url, size)
+    except Exception as e:
+        # Fall back to hotlinking rather than showing a broken image
+        print(f"Image cache error for recipe {recipe_id}: {e}")
+        return RedirectResponse(url=recipe.image_url, status_code=307)
+
+    etag = f'"{digest[:16]}-{size}"'
+    headers = {"Cache-Control": IMAGE_CACHE_CONTROL, "ETag": etag}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
+
+
+@app.get("/export.ndjson")
+def export_recipes(db: Session = Depends(get_db)):
+    return StreamingResponse(
+        iter_export(db),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="recipes.ndjson"'},
     )
+
+
+@app.post("/restore")
+def restore_recipes(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    lines = (line.decode("utf-8", errors="replace") for line in file.file)
+    return restore(lines, db.get_bind())
+
+
+@app.get("/healthz")
+def healthz(db: Session = Depends(get_db)):
+    """
+    Database and AI provider status. "degraded" while a configured provider's
+    circuit breaker is not closed; imports then fall back to the other
+    methods. 503 only when the database is unreachable.
+    """
+    try:
+        db.execute(text("SELECT 1"))
+        database = {"ok": True}
+    except Exception as e:
+        database = {"ok": False, "error": f"{type(e).__name__}: {str(e)[:150]}"}
+    providers = provider_health()
+    if not database["ok"]:
+        status = "error"
+    elif any(p["configured"] and p["state"] != "closed" for p in providers.values()):
+        status = "degraded"
+    else:
+        status = "ok"
+    return FastJSONResponse(
+        {"status": status, "database": database, "providers": providers},
+        status_code=503 if status == "error" else 200,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,74 @@
+"""
+In-process counters and summaries, rendered in Prometheus text format at /metrics.
+"""
+import threading
+from typing import Dict, Tuple
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_lock = threading.Lock()
+_counters: Dict[_Key, float] = {}
+_summaries: Dict[_Key, Tuple[int, float]] = {}
+_help: Dict[str, Tuple[str, str]] = {}
+
+
+def _key(name: str, labels: Dict[str, str]) -> _Key:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def describe(name: str, kind: str, text: str):
+    """Register HELP/TYPE lines for a metric ("counter" or "summary")."""
+    _help[name] = (kind, text)
+
+
+def inc(name: str, amount: float = 1.0, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + amount
+
+
+def observe(name: str, value: float, **labels):
+    key = _key(name, labels)
+    with _lock:
+        count, total = _summaries.get(key, (0, 0.0))
+        _summaries[key] = (count + 1, total + value)
+
+
+def value(name: str, **labels) -> float:
+    return _counters.get(_key(name, labels), 0.0)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _summaries.clear()
+
+
+def _labels(pairs) -> str:
+    body = ",".join(f'{label}="{val}"' for label, val in pairs)
+    return f"{{{body}}}" if body else ""
+
+
+def render() -> str:
+    with _lock:
+        counters = sorted(_counters.items())
+        summaries = sorted(_summaries.items())
+
+    lines = []
+    seen = set()
+
+    def header(name: str):
+        if name not in seen and name in _help:
+            kind, text = _help[name]
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+        seen.add(name)
+
+    for (name, pairs), amount in counters:
+        header(name)
+        lines.append(f"{name}{_labels(pairs)} {amount:g}")
+    for (name, pairs), (count, total) in summaries:
+        header(name)
+        lines.append(f"{name}_count{_labels(pairs)} {count}")
+        lines.append(f"{name}_sum{_labels(pairs)} {total:g}")
+    return "\n".join(lines) + "\n"
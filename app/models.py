@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from .database import Base
@@ -31,6 +31,22 @@ class Recipe(Base):
     servings = Column(String(50))
     image_url = Column(String(500))
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    # Derived from the text fields on save (see app/derived.py) for filtering and sorting
+    total_time_minutes = Column(Integer, index=True)
+    servings_min = Column(Integer)
+    servings_max = Column(Integer)
+    ingredient_count = Column(Integer, index=True)
+
+    # Source page state for scheduled refreshes (see app/refresh.py)
+    source_etag = Column(String(255))
+    source_last_modified = Column(String(64))
+    source_hash = Column(String(64))
+    source_status = Column(String(20))
+    last_checked_at = Column(DateTime, index=True)
+    check_failures = Column(Integer, nullable=False, default=0)
+    view_count = Column(Integer, nullable=False, default=0)
 
     categories = relationship(
         "Category",
@@ -42,6 +58,13 @@ class Recipe(Base):
         back_populates="recipe",
         cascade="all, delete-orphan",
     )
+    revisions = relationship(
+        "RecipeRevision",
+        back_populates="recipe",
+        cascade="all, delete-orphan",
+    )
+
+    __table_args__ = (Index("ix_recipes_servings", "servings_max", "servings_min"),)
 
 
 class Category(Base):
@@ -61,3 +84,51 @@ class Category(Base):
         back_populates="category",
         cascade="all, delete-orphan",
     )
+
+
+class ProviderStat(Base):
+    """Observed import outcomes for one extraction method on one domain."""
+    __tablename__ = "provider_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    domain = Column(String(255), nullable=False)
+    provider = Column(String(20), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    successes = Column(Integer, nullable=False, default=0)
+    total_latency_ms = Column(Float, nullable=False, default=0.0)
+    total_completeness = Column(Float, nullable=False, default=0.0)
+    last_attempt_at = Column(DateTime)
+    last_success_at = Column(DateTime)
+
+    __table_args__ = (UniqueConstraint("domain", "provider", name="uq_provider_stat_domain"),)
+
+
+class RecipeRevision(Base):
+    """Field changes found when a recipe's source page was re-extracted, kept for review."""
+    __tablename__ = "recipe_revisions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="pending")
+    method = Column(String(20))
+    changes = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    reviewed_at = Column(DateTime)
+
+    recipe = relationship("Recipe", back_populates="revisions")
+
+
+class PageSnapshot(Base):
+    """A fetched page stored in the compressed archive (see app/archive.py)."""
+    __tablename__ = "page_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String(500), nullable=False, index=True)
+    digest = Column(String(64), nullable=False)
+    codec = Column(String(10), nullable=False)
+    size = Column(Integer, nullable=False)
+    stored_size = Column(Integer, nullable=False)
+    fetched_at = Column(DateTime, default=datetime.utcnow)
+    recipe_id = Column(Integer, ForeignKey("recipes.id"), index=True)
+
+    __table_args__ = (UniqueConstraint("url", "digest", name="uq_page_snapshot_url_digest"),)
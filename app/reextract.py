@@ -0,0 +1,200 @@
+"""
+Re-run extraction over archived pages instead of refetching every site.
+
+For each recipe the most recent archived snapshot of its source page is
+decompressed and extracted again in a process pool: the standard scraper
+(recipe_scrapers + _serialize_scraped), or an AI provider (page text from
+clean_html/chunking). With --batch, Gemini extracts several pages per
+request (app/batching.py). Only fields whose value changed are written
+back. Empty results never overwrite stored data. Progress and throughput
+are printed at the end.
+
+Usage:
+    python -m app.reextract --workers 4
+    python -m app.reextract --method gemini --limit 200 --dry-run
+    python -m app.reextract --method gemini --batch
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .models import PageSnapshot, Recipe
+
+REEXTRACT_COMMIT_EVERY = 200
+# Pages handed to extract_batch at a time in --batch mode
+REEXTRACT_BATCH_GROUP = 200
+
+# (recipe id, url, digest, codec, method, archive root)
+Task = Tuple[int, str, str, str, str, str]
+
+
+def latest_snapshots(db: Session, limit: Optional[int] = None,
+                     recipe_id: Optional[int] = None) -> Iterator[Tuple[int, str, str, str]]:
+    """(recipe id, url, digest, codec) of each recipe's most recent archived page."""
+    stmt = (
+        select(PageSnapshot.recipe_id, PageSnapshot.url, PageSnapshot.digest, PageSnapshot.codec)
+        .where(PageSnapshot.recipe_id.is_not(None))
+        .order_by(PageSnapshot.recipe_id, PageSnapshot.fetched_at.desc(), PageSnapshot.id.desc())
+        .execution_options(yield_per=1000)
+    )
+    if recipe_id is not None:
+        stmt = stmt.where(PageSnapshot.recipe_id == recipe_id)
+    previous, count = None, 0
+    for row in db.execute(stmt):
+        if row.recipe_id == previous:
+            continue
+        previous = row.recipe_id
+        yield row.recipe_id, row.url, row.digest, row.codec
+        count += 1
+        if limit is not None and count >= limit:
+            return
+
+
+def extract_snapshot(task: Task) -> Tuple[int, Dict, Optional[str]]:
+    """Worker: decompress one archived page and extract it. Returns (recipe id, recipe data, error)."""
+    from .archive import PageArchive
+    from .importer import extract_with
+
+    recipe_id, url, digest, codec, method, root = task
+    try:
+        html = PageArchive(root).get(digest, codec)
+        return recipe_id, extract_with(method, url, html), None
+    except Exception as e:
+        return recipe_id, {}, f"{type(e).__name__}: {str(e)[:100]}"
+
+
+def batched_results(tasks: List[Task]) -> Iterator[Tuple[int, Dict, Optional[str]]]:
+    """extract_snapshot results for Gemini, with several pages per request."""
+    from .archive import PageArchive
+    from .batching import extract_batch
+
+    for start in range(0, len(tasks), REEXTRACT_BATCH_GROUP):
+        pages, recipe_ids = [], {}
+        for recipe_id, url, digest, codec, _, root in tasks[start:start + REEXTRACT_BATCH_GROUP]:
+            try:
+                html = PageArchive(root).get(digest, codec)
+            except Exception as e:
+                yield recipe_id, {}, f"{type(e).__name__}: {str(e)[:100]}"
+                continue
+            if url not in recipe_ids:
+                pages.append((url, html))
+            recipe_ids.setdefault(url, []).append(recipe_id)
+        found = extract_batch(pages)
+        for url, ids in recipe_ids.items():
+            recipe_data = found.get(url) or {}
+            for recipe_id in ids:
+                if recipe_data.get("title"):
+                    yield recipe_id, recipe_data, None
+                else:
+                    yield recipe_id, {}, "ValueError: Gemini returned empty result"
+
+
+def reextract(db: Session, method: str = "standard", workers: Optional[int] = None, limit: Optional[int] = None,
+              recipe_id: Optional[int] = None, dry_run: bool = False, root: Optional[str] = None,
+              batch: bool = False) -> Dict:
+    """
+    Re-extract archived pages and write back changed fields. Returns counts,
+    per-field change totals and throughput. ``batch`` sends Gemini several
+    pages per request instead of running one process per page.
+    """
+    if batch and method != "gemini":
+        raise ValueError("Batch extraction is only available for gemini")
+    from . import autocomplete
+    from .archive import page_archive
+    from .derived import apply_derived
+    from .refresh import diff_recipe
+
+    root = root or str(page_archive.root)
+    tasks = [
+        (rid, url, digest, codec, method, root)
+        for rid, url, digest, codec in latest_snapshots(db, limit=limit, recipe_id=recipe_id)
+    ]
+    stats = {"pages": len(tasks), "changed": 0, "unchanged": 0, "failed": 0, "fields": Counter(), "errors": Counter()}
+    start = time.perf_counter()
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(32, len(tasks) // (workers * 4) or 1))
+    pending = 0
+    # Batches are Gemini requests made from this process; only per-page extraction needs a pool
+    pool = None if batch else ProcessPoolExecutor(max_workers=workers)
+    try:
+        results = batched_results(tasks) if pool is None else pool.map(extract_snapshot, tasks, chunksize=chunksize)
+        for rid, recipe_data, error in results:
+            if error:
+                stats["failed"] += 1
+                stats["errors"][error.split(":")[0]] += 1
+                continue
+            recipe = db.get(Recipe, rid)
+            changes = diff_recipe(recipe, recipe_data) if recipe else {}
+            if not changes:
+                stats["unchanged"] += 1
+                continue
+            stats["changed"] += 1
+            stats["fields"].update(changes.keys())
+            if dry_run:
+                continue
+            for field, change in changes.items():
+                setattr(recipe, field, change["new"])
+            apply_derived(recipe)
+            pending += 1
+            if pending >= REEXTRACT_COMMIT_EVERY:
+                db.commit()
+                pending = 0
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if not dry_run:
+        db.commit()
+        if stats["changed"]:
+            autocomplete.invalidate()
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["pages_per_second"] = round(len(tasks) / elapsed, 1) if elapsed > 0 else None
+    stats["fields"] = dict(stats["fields"])
+    stats["errors"] = dict(stats["errors"])
+    return stats
+
+
+def main(argv=None):
+    from .database import SessionLocal
+    from .routing import PROVIDERS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--method", choices=PROVIDERS, default="standard")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="extraction processes")
+    parser.add_argument("--limit", type=int, help="recipes to re-extract")
+    parser.add_argument("--recipe", type=int, help="re-extract a single recipe")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without saving them")
+    parser.add_argument("--batch", action="store_true", help="several pages per Gemini request")
+    args = parser.parse_args(argv)
+    if args.batch and args.method != "gemini":
+        parser.error("--batch requires --method gemini")
+
+    db = SessionLocal()
+    try:
+        stats = reextract(db, args.method, args.workers, args.limit, args.recipe, args.dry_run, batch=args.batch)
+    finally:
+        db.close()
+    print(
+        f"{'Would update' if args.dry_run else 'Updated'} {stats['changed']} of {stats['pages']} recipes "
+        f"({stats['unchanged']} unchanged, {stats['failed']} failed) in {stats['seconds']:.1f}s "
+        f"- {stats['pages_per_second']} pages/s with {args.workers} workers",
+        file=sys.stderr,
+    )
+    if stats["fields"]:
+        print("Changed fields: " + ", ".join(f"{name} {count}" for name, count in sorted(stats["fields"].items())),
+              file=sys.stderr)
+    if stats["errors"]:
+        print("Errors: " + ", ".join(f"{name} {count}" for name, count in stats["errors"].items()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""
+Scheduled refresh of imported recipes from their source pages.
+
+Recipes whose source was last checked more than REFRESH_INTERVAL_HOURS ago
+are revisited, least recently checked (or most viewed) first. Each visit is
+a conditional GET with the stored ETag / Last-Modified. Pages that return
+304, or whose visible text hashes the same as last time, are not
+re-extracted. Changed pages go through the normal extraction cascade, and
+any field differences are stored as a RecipeRevision for review (or applied
+directly with REFRESH_AUTO_APPLY=1). Pages that return 404/410 are marked
+gone and no longer visited.
+
+Usage:
+    python -m app.refresh --limit 100
+    python -m app.refresh --recipe 42
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import autocomplete, metrics
+from .archive import archive_page
+from .derived import apply_derived
+from .fetcher import fetch_if_changed
+from .importer import extract_from_html
+from .models import Recipe, RecipeRevision
+from .routing import RECIPE_FIELDS, domain_of
+
+REFRESH_ENABLED = os.getenv("REFRESH_ENABLED", "0") == "1"
+REFRESH_INTERVAL_HOURS = float(os.getenv("REFRESH_INTERVAL_HOURS", "168"))
+REFRESH_TICK_SECONDS = float(os.getenv("REFRESH_TICK_SECONDS", "300"))
+REFRESH_BATCH_SIZE = int(os.getenv("REFRESH_BATCH_SIZE", "50"))
+# "oldest" (least recently checked first) or "views" (most viewed first)
+REFRESH_PRIORITY = os.getenv("REFRESH_PRIORITY", "oldest")
+REFRESH_RATE_PER_MINUTE = float(os.getenv("REFRESH_RATE_PER_MINUTE", "30"))
+REFRESH_PER_HOST = int(os.getenv("REFRESH_PER_HOST", "2"))
+REFRESH_WORKERS = int(os.getenv("REFRESH_WORKERS", "4"))
+REFRESH_MAX_FAILURES = int(os.getenv("REFRESH_MAX_FAILURES", "5"))
+REFRESH_AUTO_APPLY = os.getenv("REFRESH_AUTO_APPLY", "0") == "1"
+# Only the worker process holding this file lock runs the scheduler
+REFRESH_LOCK_FILE = os.getenv("REFRESH_LOCK_FILE", "./refresh.lock")
+# Detail pages write buffered views out at most this often, scheduler or not
+VIEW_FLUSH_SECONDS = float(os.getenv("VIEW_FLUSH_SECONDS", "10"))
+
+metrics.describe("recipe_refresh_total", "counter", "Source page refreshes by outcome")
+
+# Detail-page views since the last flush, written to recipes.view_count in batches
+_views: Counter = Counter()
+_views_lock = threading.Lock()
+_views_flushed_at = time.monotonic()
+_stop = threading.Event()
+_lock_file = None
+
+
+def record_view(recipe_id: int) -> bool:
+    """Buffer a view. Returns True when the buffer is due to be flushed (every VIEW_FLUSH_SECONDS)."""
+    global _views_flushed_at
+    with _views_lock:
+        _views[recipe_id] += 1
+        now = time.monotonic()
+        if now - _views_flushed_at < VIEW_FLUSH_SECONDS:
+            return False
+        _views_flushed_at = now
+        return True
+
+
+def _take_views() -> Dict[int, int]:
+    with _views_lock:
+        pending = dict(_views)
+        _views.clear()
+    return pending
+
+
+def flush_views(db: Session):
+    """Add the buffered view counts to recipes.view_count."""
+    for recipe_id, count in _take_views().items():
+        _set_state(db, recipe_id, view_count=Recipe.view_count + count)
+    db.commit()
+
+
+async def flush_views_async(db: AsyncSession):
+    """flush_views for the async detail route."""
+    for recipe_id, count in _take_views().items():
+        await db.execute(_state_update(recipe_id, view_count=Recipe.view_count + count))
+    await db.commit()
+
+
+def _state_update(recipe_id: int, **values):
+    # Bookkeeping columns only: keep updated_at, which drives the HTTP cache validators
+    return update(Recipe).where(Recipe.id == recipe_id).values(updated_at=Recipe.updated_at, **values)
+
+
+def _set_state(db: Session, recipe_id: int, **values):
+    db.execute(_state_update(recipe_id, **values))
+
+
+def content_hash(html: str) -> str:
+    """Hash of the page's visible text, so markup-only changes do not trigger re-extraction."""
+    from .ai_parser import page_text
+
+    return hashlib.sha256(" ".join(page_text(html).split()).encode("utf-8")).hexdigest()
+
+
+def due_recipes(db: Session, now: Optional[datetime] = None, limit: int = REFRESH_BATCH_SIZE,
+                priority: str = REFRESH_PRIORITY) -> List[Tuple[int, str]]:
+    """(id, source_url) of recipes due for a check, highest priority first."""
+    cutoff = (now or datetime.utcnow()) - timedelta(hours=REFRESH_INTERVAL_HOURS)
+    order = [Recipe.view_count.desc()] if priority == "views" else []
+    stmt = (
+        select(Recipe.id, Recipe.source_url)
+        .where(
+            or_(Recipe.last_checked_at.is_(None), Recipe.last_checked_at < cutoff),
+            or_(Recipe.source_status.is_(None), Recipe.source_status != "gone"),
+            Recipe.check_failures < REFRESH_MAX_FAILURES,
+        )
+        .order_by(*order, Recipe.last_checked_at.asc().nulls_first(), Recipe.id)
+        .limit(limit)
+    )
+    return [(row.id, row.source_url) for row in db.execute(stmt)]
+
+
+def interleave_hosts(items: Iterable[Tuple[int, str]]) -> List[Tuple[int, str]]:
+    """Round-robin across hosts, keeping priority order within each, so workers are not all queued on one site."""
+    queues: Dict[str, deque] = defaultdict(deque)
+    for item in items:
+        queues[domain_of(item[1])].append(item)
+    ordered = []
+    while queues:
+        for host in list(queues):
+            ordered.append(queues[host].popleft())
+            if not queues[host]:
+                del queues[host]
+    return ordered
+
+
+class RateLimiter:
+    """Spaces calls to at most ``per_minute`` across all threads."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class HostLimiter:
+    """At most ``per_host`` concurrent fetches to any one host."""
+
+    def __init__(self, per_host: int):
+        self.per_host = max(1, per_host)
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, host: str):
+        with self._lock:
+            semaphore = self._slots.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with semaphore:
+            yield
+
+
+def _comparable(value):
+    return value.strip() if isinstance(value, str) else value
+
+
+def diff_recipe(recipe: Recipe, recipe_data: Dict) -> Dict[str, Dict]:
+    """Fields where the fresh extraction differs, as {field: {"old", "new"}}. Empty new values are ignored."""
+    changes = {}
+    for field in RECIPE_FIELDS:
+        new = _comparable(recipe_data.get(field))
+        old = _comparable(getattr(recipe, field))
+        if new in (None, "") or new == old:
+            continue
+        changes[field] = {"old": old, "new": new}
+    return changes
+
+
+def apply_revision(db: Session, revision: RecipeRevision):
+    recipe = revision.recipe
+    changes = json.loads(revision.changes)
+    for field, change in changes.items():
+        setattr(recipe, field, change["new"])
+    apply_derived(recipe)
+    revision.status = "applied"
+    revision.reviewed_at = datetime.utcnow()
+    db.commit()
+    if "title" in changes or "ingredients" in changes:
+        autocomplete.invalidate()
+
+
+def reject_revision(db: Session, revision: RecipeRevision):
+    revision.status = "rejected"
+    revision.reviewed_at = datetime.utcnow()
+    db.commit()
+
+
+def refresh_recipe(db: Session, recipe_id: int) -> str:
+    """
+    Check one recipe's source page. Returns the outcome: not_modified,
+    unchanged, changed, baseline (first check, validators recorded), gone,
+    error or missing.
+    """
+    recipe = db.get(Recipe, recipe_id)
+    if recipe is None:
+        return "missing"
+    url, stored_hash = recipe.source_url, recipe.source_hash
+    now = datetime.utcnow()
+    failed = {"last_checked_at": now, "check_failures": Recipe.check_failures + 1, "source_status": "error"}
+
+    try:
+        page = fetch_if_changed(url, recipe.source_etag, recipe.source_last_modified)
+    except Exception as e:
+        print(f"Refresh fetch error for recipe {recipe_id}: {e}")
+        _set_state(db, recipe_id, **failed)
+        db.commit()
+        return "error"
+
+    if page["status"] == 304:
+        _set_state(db, recipe_id, last_checked_at=now, check_failures=0, source_status="ok")
+        db.commit()
+        return "not_modified"
+    if page["status"] in (404, 410):
+        _set_state(db, recipe_id, last_checked_at=now, source_status="gone")
+        db.commit()
+        return "gone"
+    if page["status"] != 200:
+        _set_state(db, recipe_id, **failed)
+        db.commit()
+        return "error"
+
+    try:
+        archive_page(db, url, page["html"], recipe_id)
+    except Exception as e:
+        db.rollback()
+        print(f"Page archive error for {url}: {e}")
+
+    state = {
+        "last_checked_at": now,
+        "check_failures": 0,
+        "source_status": "ok",
+        "source_etag": page["etag"],
+        "source_last_modified": page["last_modified"],
+        "source_hash": content_hash(page["html"]),
+    }
+    if stored_hash is None or state["source_hash"] == stored_hash:
+        # First visit only records the page as it is now; later visits compare against it
+        _set_state(db, recipe_id, **state)
+        db.commit()
+        return "baseline" if stored_hash is None else "unchanged"
+
+    recipe_data, method_used, error, _ = extract_from_html(db, url, page["html"])
+    if error:
+        print(f"Refresh extraction error for recipe {recipe_id}: {error}")
+        _set_state(db, recipe_id, **failed)
+        db.commit()
+        return "error"
+
+    recipe = db.get(Recipe, recipe_id)
+    changes = diff_recipe(recipe, recipe_data)
+    _set_state(db, recipe_id, **state)
+    revision = None
+    if changes:
+        revision = RecipeRevision(recipe_id=recipe_id, method=method_used, changes=json.dumps(changes))
+        db.add(revision)
+    db.commit()
+    if revision is not None and REFRESH_AUTO_APPLY:
+        db.refresh(recipe)
+        apply_revision(db, revision)
+    return "changed" if changes else "unchanged"
+
+
+def run_once(session_factory=None, limit: int = REFRESH_BATCH_SIZE, workers: int = REFRESH_WORKERS,
+             rate_per_minute: float = REFRESH_RATE_PER_MINUTE, per_host: int = REFRESH_PER_HOST) -> Dict[str, int]:
+    """Check the recipes currently due, with rate and per-host caps. Returns outcome counts."""
+    if session_factory is None:
+        from .database import SessionLocal as session_factory
+
+    db = session_factory()
+    try:
+        flush_views(db)
+        due = interleave_hosts(due_recipes(db, limit=limit))
+    finally:
+        db.close()
+    if not due:
+        return {}
+
+    limiter = RateLimiter(rate_per_minute)
+    hosts = HostLimiter(per_host)
+
+    def work(item: Tuple[int, str]) -> str:
+        recipe_id, url = item
+        with hosts.slot(domain_of(url)):
+            limiter.acquire()
+            db = session_factory()
+            try:
+                outcome = refresh_recipe(db, recipe_id)
+            except Exception as e:
+                db.rollback()
+                print(f"Refresh error for recipe {recipe_id}: {e}")
+                outcome = "error"
+            finally:
+                db.close()
+        metrics.inc("recipe_refresh_total", outcome=outcome)
+        return outcome
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return dict(Counter(pool.map(work, due)))
+
+
+def acquire_scheduler_lock(path: str = REFRESH_LOCK_FILE) -> bool:
+    """
+    Take the scheduler's lock file without waiting. Held until
+    release_scheduler_lock or process exit, so with several worker processes
+    only one runs the scheduler.
+    """
+    global _lock_file
+    handle = open(path, "a+")
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    _lock_file = handle
+    return True
+
+
+def release_scheduler_lock():
+    global _lock_file
+    if _lock_file is not None:
+        _lock_file.close()
+        _lock_file = None
+
+
+def start_scheduler() -> Optional[threading.Thread]:
+    """
+    Run run_once() every REFRESH_TICK_SECONDS in a daemon thread, if enabled
+    and no other worker process holds the scheduler lock.
+    """
+    if not REFRESH_ENABLED:
+        return None
+    if not acquire_scheduler_lock():
+        print("Refresh scheduler already running in another worker")
+        return None
+    _stop.clear()
+
+    def _run():
+        while not _stop.wait(REFRESH_TICK_SECONDS):
+            try:
+                outcomes = run_once()
+            except Exception as e:
+                print(f"Refresh scheduler error: {e}")
+                continue
+            if outcomes:
+                print(f"Refreshed {sum(outcomes.values())} recipes: {outcomes}")
+
+    thread = threading.Thread(target=_run, name="refresh", daemon=True)
+    thread.start()
+    return thread
+
+
+def stop_scheduler():
+    _stop.set()
+    release_scheduler_lock()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=REFRESH_BATCH_SIZE, help="recipes to check")
+    parser.add_argument("--recipe", type=int, help="check this recipe now, even if not due")
+    args = parser.parse_args(argv)
+
+    if args.recipe:
+        from .database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            print(f"Recipe {args.recipe}: {refresh_recipe(db, args.recipe)}")
+        finally:
+            db.close()
+        return
+
+    start = time.perf_counter()
+    outcomes = run_once(limit=args.limit)
+    print(f"Checked {sum(outcomes.values())} recipes in {time.perf_counter() - start:.1f}s: {outcomes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Per-domain choice of extraction method for imports.
+
+Every import attempt is recorded in provider_stats (success, latency and how
+many recipe fields came back). For each domain the router tries first the
+method with the lowest expected time to a successful extraction. Methods
+with too little history keep the default order, and methods that keep
+failing go last. A small share of imports explores a different method first
+so the statistics stay current.
+"""
+import os
+import random
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import metrics
+from .models import ProviderStat
+
+PROVIDERS = ("standard", "gemini", "ollama")
+
+ROUTING_ENABLED = os.getenv("ROUTING_ENABLED", "1") == "1"
+
+
+def parse_default_order(spec: str) -> List[str]:
+    """Provider names from a comma separated list; every provider when none are valid."""
+    order = list(dict.fromkeys(name.strip() for name in spec.split(",") if name.strip() in PROVIDERS))
+    return order or list(PROVIDERS)
+
+
+ROUTING_DEFAULT_ORDER = parse_default_order(os.getenv("ROUTING_DEFAULT_ORDER", ",".join(PROVIDERS)))
+ROUTING_EXPLORE_RATE = float(os.getenv("ROUTING_EXPLORE_RATE", "0.1"))
+ROUTING_MIN_ATTEMPTS = int(os.getenv("ROUTING_MIN_ATTEMPTS", "3"))
+ROUTING_MIN_SUCCESS_RATE = float(os.getenv("ROUTING_MIN_SUCCESS_RATE", "0.5"))
+
+# Fixed orders per domain, e.g. "allrecipes.com=standard;example.com=ollama,gemini".
+# A domain also matches its subdomains; only the listed methods are tried.
+ROUTING_OVERRIDES = os.getenv("ROUTING_OVERRIDES", "")
+
+RECIPE_FIELDS = ("title", "ingredients", "instructions", "prep_time_minutes", "cook_time_minutes", "servings", "image_url")
+
+metrics.describe("import_route_decisions_total", "counter", "Import routing decisions by reason and first method")
+metrics.describe("import_attempts_total", "counter", "Extraction attempts by method and outcome")
+metrics.describe("import_attempt_latency_ms", "summary", "Extraction attempt latency in milliseconds")
+
+
+def parse_overrides(spec: str) -> Dict[str, List[str]]:
+    overrides = {}
+    for entry in filter(None, (part.strip() for part in spec.split(";"))):
+        domain, _, order = entry.partition("=")
+        providers = [name.strip() for name in order.split(",") if name.strip() in PROVIDERS]
+        if domain.strip() and providers:
+            overrides[domain.strip().lower()] = providers
+    return overrides
+
+
+_overrides = parse_overrides(ROUTING_OVERRIDES)
+
+
+def domain_of(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def completeness(recipe_data: Dict) -> float:
+    """Share of the recipe fields that came back non-empty."""
+    return sum(1 for field in RECIPE_FIELDS if recipe_data.get(field)) / len(RECIPE_FIELDS)
+
+
+def override_for(domain: str) -> Optional[List[str]]:
+    parts = domain.split(".")
+    for i in range(len(parts) - 1):
+        order = _overrides.get(".".join(parts[i:]))
+        if order:
+            return order
+    return None
+
+
+def _rank(stats: Dict[str, ProviderStat]) -> List[str]:
+    def sort_key(provider: str):
+        default_index = ROUTING_DEFAULT_ORDER.index(provider)
+        stat = stats.get(provider)
+        if stat is None or stat.attempts < ROUTING_MIN_ATTEMPTS:
+            return (1, default_index, default_index)
+        # Laplace smoothing keeps one lucky or unlucky attempt from dominating
+        success_rate = (stat.successes + 1) / (stat.attempts + 2)
+        if success_rate < ROUTING_MIN_SUCCESS_RATE:
+            return (2, -success_rate, default_index)
+        # Expected time to a complete extraction: slow, flaky or sparse methods all rank lower
+        mean_latency = stat.total_latency_ms / stat.attempts
+        mean_completeness = stat.total_completeness / stat.successes if stat.successes else 1.0
+        return (0, mean_latency / (success_rate * max(mean_completeness, 0.1)), default_index)
+
+    return sorted(ROUTING_DEFAULT_ORDER, key=sort_key)
+
+
+def plan(db: Session, domain: str, rng: random.Random = random) -> Tuple[List[str], str]:
+    """Return the methods to try for a domain, in order, and why."""
+    order = override_for(domain)
+    if order:
+        reason = "override"
+    elif not ROUTING_ENABLED:
+        order, reason = list(ROUTING_DEFAULT_ORDER), "default"
+    else:
+        rows = db.execute(select(ProviderStat).where(ProviderStat.domain == domain)).scalars()
+        stats = {row.provider: row for row in rows}
+        order = _rank(stats)
+        reason = "learned" if any(stat.attempts >= ROUTING_MIN_ATTEMPTS for stat in stats.values()) else "default"
+        if len(order) > 1 and rng.random() < ROUTING_EXPLORE_RATE:
+            order.insert(0, order.pop(rng.randrange(1, len(order))))
+            reason = "explore"
+
+    metrics.inc("import_route_decisions_total", reason=reason, first=order[0])
+    return order, reason
+
+
+def record_attempts(db: Session, domain: str, attempts: List[Dict]):
+    """
+    Add import attempts to the domain's statistics and commit.
+
+    Each attempt is {"provider", "ok", "latency_ms", "completeness"}, with
+    completeness 0 for failures. Counters are incremented in SQL so
+    concurrent imports do not lose updates.
+    """
+    now = datetime.utcnow()
+    for attempt in attempts:
+        provider, ok = attempt["provider"], attempt["ok"]
+        metrics.inc("import_attempts_total", provider=provider, outcome="success" if ok else "failure")
+        metrics.observe("import_attempt_latency_ms", attempt["latency_ms"], provider=provider)
+
+        values = {
+            "attempts": ProviderStat.attempts + 1,
+            "successes": ProviderStat.successes + (1 if ok else 0),
+            "total_latency_ms": ProviderStat.total_latency_ms + attempt["latency_ms"],
+            "total_completeness": ProviderStat.total_completeness + attempt["completeness"],
+            "last_attempt_at": now,
+        }
+        if ok:
+            values["last_success_at"] = now
+        where = (ProviderStat.domain == domain) & (ProviderStat.provider == provider)
+
+        if db.execute(update(ProviderStat).where(where).values(**values)).rowcount == 0:
+            try:
+                with db.begin_nested():
+                    db.add(ProviderStat(
+                        domain=domain,
+                        provider=provider,
+                        attempts=1,
+                        successes=1 if ok else 0,
+                        total_latency_ms=attempt["latency_ms"],
+                        total_completeness=attempt["completeness"],
+                        last_attempt_at=now,
+                        last_success_at=now if ok else None,
+                    ))
+            except IntegrityError:
+                # Another import created the row first
+                db.execute(update(ProviderStat).where(where).values(**values))
+    db.commit()
+
+
+def domain_stats(db: Session, domain: str) -> List[Dict]:
+    """Summary of the recorded statistics for a domain, best method first."""
+    rows = {row.provider: row for row in db.execute(select(ProviderStat).where(ProviderStat.domain == domain)).scalars()}
+    summary = []
+    for provider in _rank(rows):
+        row = rows.get(provider)
+        if row is None:
+            continue
+        summary.append({
+            "provider": provider,
+            "attempts": row.attempts,
+            "success_rate": round(row.successes / row.attempts, 3),
+            "mean_latency_ms": round(row.total_latency_ms / row.attempts, 1),
+            "mean_completeness": round(row.total_completeness / row.successes, 3) if row.successes else None,
+        })
+    return summary
+
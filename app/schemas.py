@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from .derived import MAX_SERVINGS
+
+
+class CategoryOut(BaseModel):
+    id: int
+    name: str
+    color: Optional[str] = None
+    recipe_count: Optional[int] = None
+
+
+class RecipeOut(BaseModel):
+    """Full recipe shape. API responses contain the subset selected with ?fields=."""
+
+    id: int
+    title: str
+    source_url: str
+    ingredients: Optional[str] = None
+    instructions: Optional[str] = None
+    prep_time_minutes: Optional[int] = None
+    cook_time_minutes: Optional[int] = None
+    servings: Optional[str] = None
+    image_url: Optional[str] = None
+    total_time_minutes: Optional[int] = None
+    servings_min: Optional[int] = None
+    servings_max: Optional[int] = None
+    ingredient_count: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    categories: List[CategoryOut] = []
+
+
+class RecipePage(BaseModel):
+    items: List[RecipeOut]
+    next_cursor: Optional[str] = None
+
+
+class RecipeCreate(BaseModel):
+    title: str = Field(..., min_length=1, max_length=255)
+    source_url: str = Field(..., min_length=1, max_length=500)
+    ingredients: str = ""
+    instructions: str = ""
+    prep_time_minutes: Optional[int] = Field(None, ge=0)
+    cook_time_minutes: Optional[int] = Field(None, ge=0)
+    servings: str = Field("", max_length=50)
+    image_url: str = Field("", max_length=500)
+    category_ids: List[int] = []
+    new_category: str = Field("", max_length=100)
+
+
+class ShoppingListRecipe(BaseModel):
+    id: int
+    servings: Optional[float] = Field(
+        None, gt=0, le=MAX_SERVINGS, allow_inf_nan=False, description="Target servings; omit to keep the recipe's own"
+    )
+
+
+class ShoppingListRequest(BaseModel):
+    recipes: List[ShoppingListRecipe] = Field(..., min_length=1, max_length=200)
+
+
+class ShoppingItemOut(BaseModel):
+    name: str
+    quantity: Optional[float] = None
+    unit: Optional[str] = None
+    display: str
+    recipe_ids: List[int]
+
+
+class ShoppingSectionOut(BaseModel):
+    section: str
+    items: List[ShoppingItemOut]
+
+
+class ShoppingListOut(BaseModel):
+    recipes: List[dict]
+    missing_ids: List[int]
+    sections: List[ShoppingSectionOut]
+
+
+class RevisionOut(BaseModel):
+    id: int
+    recipe_id: int
+    status: str
+    method: Optional[str] = None
+    changes: Dict[str, Dict[str, Any]] = Field(..., description="{field: {old, new}}")
+    created_at: Optional[datetime] = None
+    reviewed_at: Optional[datetime] = None
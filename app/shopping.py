@@ -0,0 +1,269 @@
+"""
+Shopping lists: parse, scale and merge the ingredient lines of many recipes.
+
+Lines are parsed with one precompiled pattern and the results cached, since
+the same lines recur across recipes and requests. Quantities are converted
+to a base unit per family (ml for volume, g for weight) so "1 cup" and
+"4 tbsp" of the same ingredient add up. Totals are then shown in the
+largest convenient unit, as kitchen fractions.
+"""
+import math
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from .derived import MAX_SERVINGS, parse_servings_range
+from .models import Recipe
+from .units import UNIT_ALIASES, UNITS
+
+UNICODE_FRACTIONS = {"½": "1/2", "⅓": "1/3", "⅔": "2/3", "¼": "1/4", "¾": "3/4", "⅛": "1/8", "⅜": "3/8", "⅝": "5/8", "⅞": "7/8"}
+
+# Display units per family and system, largest first, with the smallest amount shown in each
+DISPLAY_UNITS = {
+    ("volume", False): [("gallon", 4.0), ("cup", 0.25), ("tbsp", 1.0), ("tsp", 0.0)],
+    ("volume", True): [("l", 1.0), ("ml", 0.0)],
+    ("weight", False): [("lb", 1.0), ("oz", 0.0)],
+    ("weight", True): [("kg", 1.0), ("g", 0.0)],
+}
+
+FRACTIONS = [(0.0, ""), (0.125, "1/8"), (0.25, "1/4"), (1 / 3, "1/3"), (0.375, "3/8"), (0.5, "1/2"),
+             (0.625, "5/8"), (2 / 3, "2/3"), (0.75, "3/4"), (0.875, "7/8"), (1.0, "")]
+
+SECTIONS = [
+    ("Produce", ("onion", "garlic", "carrot", "celery", "tomato", "basil", "cilantro", "parsley", "spinach",
+                 "mushroom", "lemon", "lime", "ginger", "potato", "pepper flakes", "bell pepper", "scallion",
+                 "green onion", "lettuce", "apple", "banana", "berry", "avocado", "zucchini", "herb", "eggplant",
+                 "squash")),
+    ("Meat & Seafood", ("chicken", "beef", "pork", "bacon", "sausage", "turkey", "lamb", "shrimp", "salmon", "fish")),
+    ("Dairy & Eggs", ("milk", "cream", "butter", "buttermilk", "cheese", "yogurt", "egg", "parmesan", "cheddar",
+                      "mozzarella")),
+    ("Baking", ("flour", "sugar", "baking", "yeast", "vanilla", "chocolate", "cocoa", "cornstarch", "honey")),
+    ("Spices", ("salt", "pepper", "cumin", "paprika", "oregano", "cinnamon", "thyme", "rosemary", "chili powder",
+                "nutmeg", "turmeric", "spice", "peppercorn")),
+    ("Pantry", ("oil", "vinegar", "sauce", "fish sauce", "broth", "stock", "rice", "pasta", "noodle", "bean", "paste",
+                "canned", "peanut butter")),
+]
+# Whole-word keywords, longest first so "peanut butter" wins over "butter"; ties keep section order
+_SECTION_KEYWORDS = sorted(
+    ((f" {keyword} ", order, section) for order, (section, keywords) in enumerate(SECTIONS) for keyword in keywords),
+    key=lambda item: (-len(item[0].split()), item[1]),
+)
+
+_QUANTITY = r"\d+\s+\d+/\d+|\d+/\d+|\d+(?:\.\d+)?|\.\d+"
+_UNIT_NAMES = "|".join(sorted((re.escape(alias) for alias in UNIT_ALIASES), key=len, reverse=True))
+_LINE_RE = re.compile(
+    rf"^\s*(?P<qty>{_QUANTITY})(?:\s*(?:-|–|to)\s*(?P<qty2>{_QUANTITY}))?\s*"
+    rf"(?:(?P<unit>{_UNIT_NAMES})\.?(?=\s|$))?\s*(?:of\s+)?(?P<name>.*)$",
+    re.IGNORECASE,
+)
+
+# Units written out in full get an "s" (or "es") above one
+PLURAL_UNITS = {"cup", "pint", "quart", "gallon", "clove", "can", "package", "stick", "slice", "sprig", "head", "stalk"}
+PLURAL_ES_UNITS = {"bunch", "pinch", "dash"}
+
+_PAREN_RE = re.compile(r"\([^)]*\)")
+
+
+def _to_number(text: str) -> float:
+    total = 0.0
+    for part in text.split():
+        if "/" in part:
+            num, den = part.split("/")
+            total += float(num) / float(den) if float(den) else 0.0
+        else:
+            total += float(part)
+    return total
+
+
+def _normalize_name(name: str) -> str:
+    """Key used to merge ingredients: lowercased, without prep notes or plurals."""
+    name = name.lower().split(",")[0]
+    name = re.sub(r"[^a-z\s-]", " ", name)
+    words = name.split()
+    if words:
+        last = words[-1]
+        if last.endswith("oes") or last.endswith("ches") or last.endswith("shes"):
+            words[-1] = last[:-2]
+        elif last.endswith("ies") and len(last) > 4:
+            words[-1] = last[:-3] + "y"
+        elif last.endswith("s") and not last.endswith("ss") and len(last) > 3:
+            words[-1] = last[:-1]
+    return " ".join(words)
+
+
+@lru_cache(maxsize=20000)
+def parse_line(line: str) -> Tuple[Optional[float], Optional[str], str, str]:
+    """
+    Parse one ingredient line into (quantity, unit, display name, merge key).
+
+    Quantity and unit are None when the line has no leading amount
+    ("salt to taste"); ranges ("2-3 cloves") use the upper bound.
+    """
+    text = line.strip()
+    for symbol, fraction in UNICODE_FRACTIONS.items():
+        if symbol in text:
+            text = re.sub(rf"(\d)\s*{symbol}", rf"\1 {fraction}", text).replace(symbol, fraction)
+    text = _PAREN_RE.sub(" ", text)
+
+    match = _LINE_RE.match(text)
+    if not match or not match.group("name").strip():
+        name = " ".join(text.split(",")[0].split())
+        return None, None, name, _normalize_name(name)
+
+    quantity = _to_number(match.group("qty2") or match.group("qty"))
+    unit = UNIT_ALIASES[match.group("unit").lower()] if match.group("unit") else None
+    name = " ".join(match.group("name").split(",")[0].split())
+    return quantity, unit, name, _normalize_name(name)
+
+
+def format_amount(value: float) -> str:
+    """Readable kitchen amount: whole part plus the nearest common fraction."""
+    if not math.isfinite(value):
+        return str(value)
+    whole = int(value)
+    rest = value - whole
+    position, label = min(FRACTIONS, key=lambda item: abs(item[0] - rest))
+    if abs(position - rest) < 0.05:
+        if position == 1.0:
+            whole, label = whole + 1, ""
+        if whole and label:
+            return f"{whole} {label}"
+        if label or whole:
+            return label or str(whole)
+    return f"{value:.2f}".rstrip("0").rstrip(".") or f"{value:.2g}"
+
+
+def _unit_label(unit: Optional[str], quantity: Optional[float]) -> str:
+    if not unit or not quantity or quantity <= 1:
+        return unit or ""
+    if unit in PLURAL_ES_UNITS:
+        return unit + "es"
+    return unit + "s" if unit in PLURAL_UNITS else unit
+
+
+def _display(family: str, metric: bool, base_amount: float) -> Tuple[float, str]:
+    for unit, minimum in DISPLAY_UNITS[(family, metric)]:
+        amount = base_amount / UNITS[unit][1]
+        if amount >= minimum:
+            return amount, unit
+    return base_amount, DISPLAY_UNITS[(family, metric)][-1][0]
+
+
+@lru_cache(maxsize=5000)
+def section_for(key: str) -> str:
+    padded = f" {key} "
+    for keyword, _, section in _SECTION_KEYWORDS:
+        if keyword in padded:
+            return section
+    return "Other"
+
+
+def aggregate(lines: Iterable[Tuple[str, float, int]]) -> List[Dict]:
+    """
+    Merge (ingredient line, scale factor, recipe id) triples into grouped totals.
+
+    Lines of one ingredient merge when their units share a family; counted
+    units merge only with themselves. Returns sections in a fixed order,
+    each with its items sorted by name.
+    """
+    # key -> [display name, base amount, metric votes, imperial votes, recipe ids]
+    totals: Dict[Tuple[str, str], list] = {}
+    for line, factor, recipe_id in lines:
+        if not line.strip():
+            continue
+        quantity, unit, name, key = parse_line(line)
+        if quantity is None:
+            family, amount, metric = "none", 0.0, None
+        elif unit in UNITS:
+            family, size, metric = UNITS[unit]
+            amount = quantity * size * factor
+        else:
+            family, amount, metric = f"count:{unit or ''}", quantity * factor, None
+
+        entry = totals.get((key, family))
+        if entry is None:
+            entry = totals[(key, family)] = [name, 0.0, 0, 0, set()]
+        entry[1] += amount
+        if metric is not None:
+            entry[2 if metric else 3] += 1
+        entry[4].add(recipe_id)
+
+    sections: Dict[str, List[Dict]] = {}
+    for (key, family), (name, amount, metric_votes, imperial_votes, recipe_ids) in totals.items():
+        if family == "none":
+            quantity, unit = None, None
+        elif family.startswith("count:"):
+            quantity, unit = amount, family[6:] or None
+        else:
+            quantity, unit = _display(family, metric_votes > imperial_votes, amount)
+        sections.setdefault(section_for(key), []).append({
+            "name": name,
+            "quantity": round(quantity, 3) if quantity is not None else None,
+            "unit": unit,
+            "display": " ".join(
+                part for part in (format_amount(quantity) if quantity else "", _unit_label(unit, quantity), name) if part
+            ),
+            "recipe_ids": sorted(recipe_ids),
+        })
+
+    order = [section for section, _ in SECTIONS] + ["Other"]
+    return [
+        {"section": section, "items": sorted(sections[section], key=lambda item: item["name"].lower())}
+        for section in order
+        if section in sections
+    ]
+
+
+def build_shopping_list(db: Session, requested: Sequence[Tuple[int, Optional[float]]]) -> Dict:
+    """
+    Build a shopping list for (recipe id, target servings) pairs.
+
+    A missing target, or a recipe whose servings have no number, keeps the
+    recipe's own quantities; the latter is flagged ``unscaled``. Servings
+    are read as app/derived.py does (the lower bound of a range). Unknown
+    ids are reported, not fatal.
+    """
+    ids = [recipe_id for recipe_id, _ in requested]
+    rows = {
+        row.id: row
+        for row in db.query(
+            Recipe.id, Recipe.title, Recipe.servings, Recipe.servings_min, Recipe.ingredients
+        ).filter(Recipe.id.in_(ids))
+    }
+
+    recipes, lines = [], []
+    for recipe_id, target in requested:
+        row = rows.get(recipe_id)
+        if row is None:
+            continue
+        original = row.servings_min or parse_servings_range(row.servings)[0]
+        factor = target / original if target and original else 1.0
+        recipes.append({
+            "id": row.id, "title": row.title, "servings": target if target and original else original,
+            "scale": round(factor, 3), "unscaled": bool(target and not original),
+        })
+        lines.extend((line, factor, row.id) for line in (row.ingredients or "").splitlines())
+
+    return {
+        "recipes": recipes,
+        "missing_ids": [recipe_id for recipe_id in dict.fromkeys(ids) if recipe_id not in rows],
+        "sections": aggregate(lines),
+    }
+
+
+def parse_selection(spec: str) -> List[Tuple[int, Optional[float]]]:
+    """
+    Parse "12:6,15,20:2.5" (recipe id, optional target servings) into pairs.
+    Raises ValueError for servings that are not a finite number between 0
+    and MAX_SERVINGS.
+    """
+    selection = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        recipe_id, _, servings = item.partition(":")
+        target = float(servings) if servings else None
+        if target is not None and not (math.isfinite(target) and 0 < target <= MAX_SERVINGS):
+            raise ValueError(f"servings must be between 0 and {MAX_SERVINGS}: {servings}")
+        selection.append((int(recipe_id), target))
+    return selection
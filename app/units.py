@@ -0,0 +1,45 @@
+"""
+Cooking units shared by ingredient parsing (app/shopping.py) and page
+scoring (app/chunking.py).
+"""
+from typing import Dict, Tuple
+
+# unit -> (family, size in the family's base unit, metric?)
+UNITS: Dict[str, Tuple[str, float, bool]] = {
+    "tsp": ("volume", 4.92892, False),
+    "tbsp": ("volume", 14.7868, False),
+    "fl oz": ("volume", 29.5735, False),
+    "cup": ("volume", 236.588, False),
+    "pint": ("volume", 473.176, False),
+    "quart": ("volume", 946.353, False),
+    "gallon": ("volume", 3785.41, False),
+    "ml": ("volume", 1.0, True),
+    "l": ("volume", 1000.0, True),
+    "oz": ("weight", 28.3495, False),
+    "lb": ("weight", 453.592, False),
+    "mg": ("weight", 0.001, True),
+    "g": ("weight", 1.0, True),
+    "kg": ("weight", 1000.0, True),
+}
+
+UNIT_ALIASES = {
+    "teaspoon": "tsp", "teaspoons": "tsp", "tsp": "tsp", "tsps": "tsp",
+    "tablespoon": "tbsp", "tablespoons": "tbsp", "tbsp": "tbsp", "tbsps": "tbsp", "tbs": "tbsp", "tbl": "tbsp",
+    "fluid ounce": "fl oz", "fluid ounces": "fl oz", "fl oz": "fl oz", "fl. oz": "fl oz",
+    "cup": "cup", "cups": "cup", "c": "cup",
+    "pint": "pint", "pints": "pint", "pt": "pint",
+    "quart": "quart", "quarts": "quart", "qt": "quart",
+    "gallon": "gallon", "gallons": "gallon", "gal": "gallon",
+    "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml", "ml": "ml",
+    "liter": "l", "liters": "l", "litre": "l", "litres": "l", "l": "l",
+    "ounce": "oz", "ounces": "oz", "oz": "oz",
+    "pound": "lb", "pounds": "lb", "lb": "lb", "lbs": "lb",
+    "milligram": "mg", "milligrams": "mg", "mg": "mg",
+    "gram": "g", "grams": "g", "g": "g",
+    "kilogram": "kg", "kilograms": "kg", "kg": "kg",
+    # Counted units only merge with the same unit
+    "clove": "clove", "cloves": "clove", "can": "can", "cans": "can", "package": "package",
+    "packages": "package", "pkg": "package", "stick": "stick", "sticks": "stick", "slice": "slice",
+    "slices": "slice", "bunch": "bunch", "bunches": "bunch", "pinch": "pinch", "dash": "dash",
+    "sprig": "sprig", "sprigs": "sprig", "head": "head", "heads": "head", "stalk": "stalk", "stalks": "stalk",
+}
@@ -0,0 +1,64 @@
+import importlib
+import os
+import threading
+import time
+from typing import Optional
+
+# Set WARMUP_ON_STARTUP=0 for one-shot or serverless processes that should
+# not spend CPU importing providers they may never use.
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1").lower() in ("1", "true", "yes")
+WARMUP_DELAY_SECONDS = float(os.getenv("WARMUP_DELAY_SECONDS", "1"))
+
+# Modules imported lazily by the request handlers, heaviest first
+WARMUP_MODULES = (
+    "google.generativeai",
+    "recipe_scrapers",
+    "bs4",
+    "requests",
+    "PIL.Image",
+)
+
+
+def warm_up():
+    """Import the lazily loaded provider and scraper modules."""
+    from .ai_parser import GEMINI_API_KEY, get_genai
+
+    start = time.perf_counter()
+    for name in WARMUP_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"Warm-up skipped {name}: {e}")
+    if GEMINI_API_KEY:
+        get_genai()
+    build_autocomplete_index()
+    print(f"Warm-up finished in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def build_autocomplete_index():
+    """Build the typeahead index now, so the first keystroke does not wait for it."""
+    from .autocomplete import get_index
+    from .database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        get_index(db)
+    except Exception as e:
+        print(f"Warm-up skipped autocomplete index: {e}")
+    finally:
+        db.close()
+
+
+def start_warmup() -> Optional[threading.Thread]:
+    """Run warm_up() in a daemon thread shortly after startup, if enabled."""
+    if not WARMUP_ON_STARTUP:
+        return None
+
+    def _run():
+        # Let the server bind and answer its first requests before competing for the GIL
+        time.sleep(WARMUP_DELAY_SECONDS)
+        warm_up()
+
+    thread = threading.Thread(target=_run, name="warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,64 @@
+"""
+Throughput of the JSON API compared with the HTML routes.
+
+Seeds a temporary SQLite database and issues sequential requests through the
+ASGI test client, so the numbers cover routing, queries and serialization
+but not network I/O.
+
+Usage:
+    python benchmarks/bench_api.py --recipes 1000 --requests 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+
+from app.main import app  # noqa: E402
+from benchmarks.synthetic import bench_client, make_engine, seed_database  # noqa: E402
+
+
+def throughput(client, urls, total: int) -> float:
+    start = time.perf_counter()
+    for i in range(total):
+        resp = client.get(urls[i % len(urls)])
+        assert resp.status_code == 200, resp.status_code
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(os.path.join(tmp, "bench.db"))
+        seed_database(engine, args.recipes)
+        ids = list(range(1, args.recipes + 1))
+        detail_ids = random.sample(ids, min(50, len(ids)))
+
+        scenarios = [
+            ("HTML  /recipes (all cards)", ["/recipes"]),
+            ("JSON  /api/v1/recipes?limit=100", ["/api/v1/recipes?limit=100"]),
+            ("JSON  /api/v1/recipes?limit=100&fields=id,title", ["/api/v1/recipes?limit=100&fields=id,title"]),
+            ("HTML  /recipes/{id}", [f"/recipes/{i}" for i in detail_ids]),
+            ("JSON  /api/v1/recipes/{id}", [f"/api/v1/recipes/{i}" for i in detail_ids]),
+            ("JSON  /api/v1/recipes/{id}?fields=id,title", [f"/api/v1/recipes/{i}?fields=id,title" for i in detail_ids]),
+        ]
+
+        with bench_client(app, os.path.join(tmp, "bench.db")) as client:
+            print(f"{args.recipes} recipes, {args.requests} sequential requests per scenario")
+            for label, urls in scenarios:
+                client.get(urls[0])  # warm caches and connections
+                print(f"  {label:<50} {throughput(client, urls, args.requests):8.1f} req/s")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
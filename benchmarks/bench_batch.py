@@ -0,0 +1,136 @@
+"""
+Gemini extraction throughput: one page per request versus multi-page batches.
+
+Starts the fake providers (benchmarks/fake_providers.py) and extracts the
+same synthetic pages twice with the same number of requests in flight:
+through parse_recipe_with_ai, one request per page, and through
+app/batching.extract_batch, several pages per request. Reports recipes per
+minute, Gemini requests made and pages that needed an individual retry.
+
+The default profile charges a fixed overhead per request plus time per
+prompt token and per recipe generated, so batches save the per-request
+overhead and request slots, not the generation time.
+
+Usage:
+    python benchmarks/bench_batch.py --pages 200 --concurrency 4
+    python benchmarks/bench_batch.py --gemini "latency=800,token_ms=20,item_ms=400,drop=0.05" --max-pages 4,8,16
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+
+from benchmarks.load_import import free_port, wait_ready  # noqa: E402
+from benchmarks.synthetic import TITLE_WORDS, make_html_page  # noqa: E402
+
+
+def make_pages(count: int, seed: int = 42) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    pages = []
+    for i in range(count):
+        slug = f"{rng.choice(TITLE_WORDS)}-{rng.choice(TITLE_WORDS)}-{i}".lower()
+        pages.append((f"https://blog.example.com/{slug}", make_html_page(rng, rng.randint(5, 30))))
+    return pages
+
+
+def gemini_calls(fake_url: str) -> int:
+    import httpx
+
+    return httpx.get(f"{fake_url}/stats").json()["calls"]["gemini"]
+
+
+def run_single(pages: List[Tuple[str, str]], concurrency: int) -> Dict[str, Dict]:
+    from app.ai_parser import parse_recipe_with_ai
+
+    def extract(page):
+        try:
+            return parse_recipe_with_ai(page[0], page[1], provider="gemini")
+        except Exception:
+            return {}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return dict(zip((url for url, _ in pages), pool.map(extract, pages)))
+
+
+def run_batch(pages: List[Tuple[str, str]], concurrency: int, token_budget: int, max_pages: int) -> Dict[str, Dict]:
+    from app.batching import extract_batch
+
+    return extract_batch(pages, token_budget=token_budget, max_pages=max_pages, workers=concurrency)
+
+
+def measure(name: str, fn, pages: List[Tuple[str, str]], fake_url: str) -> Dict:
+    from app import metrics
+
+    metrics.reset()
+    calls = gemini_calls(fake_url)
+    start = time.perf_counter()
+    results = fn()
+    elapsed = time.perf_counter() - start
+    extracted = sum(1 for url, _ in pages if (results.get(url) or {}).get("title"))
+    return {
+        "mode": name,
+        "pages": len(pages),
+        "extracted": extracted,
+        "seconds": round(elapsed, 2),
+        "recipes_per_minute": round(extracted / elapsed * 60, 1),
+        "requests": gemini_calls(fake_url) - calls,
+        "retried": int(metrics.value("gemini_batch_pages_total", outcome="retried")),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=120, help="synthetic pages to extract")
+    parser.add_argument("--concurrency", type=int, default=4, help="Gemini requests in flight")
+    parser.add_argument("--max-pages", default="8", help="comma separated pages-per-request limits to try")
+    parser.add_argument("--token-budget", type=int, default=24000, help="estimated prompt tokens per batch")
+    parser.add_argument("--gemini", default="latency=600,jitter=150,token_ms=20,item_ms=400,drop=0.02",
+                        help="fake Gemini profile")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    port = free_port()
+    fake_url = f"http://127.0.0.1:{port}"
+    os.environ.update(GEMINI_API_KEY="fake", GEMINI_API_ENDPOINT=fake_url, AI_CHUNKING="0")
+    fake = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_providers", "--port", str(port), "--gemini", args.gemini],
+        cwd=ROOT,
+    )
+    try:
+        wait_ready(f"{fake_url}/stats", fake)
+        pages = make_pages(args.pages)
+        print(f"{len(pages)} pages, {args.concurrency} requests in flight, gemini: {args.gemini}", file=sys.stderr)
+
+        results = [measure("single", lambda: run_single(pages, args.concurrency), pages, fake_url)]
+        for max_pages in (int(value) for value in args.max_pages.split(",") if value.strip()):
+            results.append(measure(
+                f"batch x{max_pages}",
+                lambda: run_batch(pages, args.concurrency, args.token_budget, max_pages),
+                pages, fake_url,
+            ))
+        for result in results:
+            print(
+                f"  {result['mode']:<10} {result['recipes_per_minute']:8.1f} recipes/min  "
+                f"{result['requests']:4d} requests  {result['extracted']}/{result['pages']} extracted  "
+                f"{result['retried']} retried  {result['seconds']:6.2f}s"
+            )
+    finally:
+        fake.terminate()
+        fake.wait()
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
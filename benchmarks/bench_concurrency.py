@@ -0,0 +1,147 @@
+"""
+Concurrent read capacity of sync versus async database sessions.
+
+Serves the same recipe lookup two ways, a sync route on get_db (one
+threadpool slot per request for the whole query) and an async route on
+get_async_db, and drives each with many concurrent clients through an
+in-process ASGI transport. A sync /probe route is polled at the same time:
+when readers hold every worker thread, its latency shows the stall that
+every other sync route would see.
+
+Client and app share one event loop, so absolute latencies include client
+overhead; compare the sync and async rows with each other.
+
+Usage:
+    python benchmarks/bench_concurrency.py --recipes 5000 --concurrency 16,64,256 --requests 2000
+    python benchmarks/bench_concurrency.py --threads 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.crud import get_recipe, get_recipe_async  # noqa: E402
+from app.database import get_async_db, get_db  # noqa: E402
+from benchmarks.synthetic import bench_client, make_engine, seed_database  # noqa: E402
+
+
+def _summary(recipe) -> Dict:
+    return {"id": recipe.id, "title": recipe.title, "categories": [c.name for c in recipe.categories]}
+
+
+def make_app() -> FastAPI:
+    bench = FastAPI()
+
+    @bench.get("/sync/{recipe_id}")
+    def read_sync(recipe_id: int, db: Session = Depends(get_db)):
+        return _summary(get_recipe(db, recipe_id))
+
+    @bench.get("/async/{recipe_id}")
+    async def read_async(recipe_id: int, db: AsyncSession = Depends(get_async_db)):
+        return _summary(await get_recipe_async(db, recipe_id))
+
+    @bench.get("/probe")
+    def probe():
+        return {}
+
+    return bench
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_level(app: FastAPI, mode: str, ids: List[int], total: int, concurrency: int) -> Dict:
+    import httpx
+
+    latencies: List[float] = []
+    probes: List[float] = []
+    errors = 0
+    queue = iter(range(total))
+    done = asyncio.Event()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def reader():
+            nonlocal errors
+            for i in queue:
+                start = time.perf_counter()
+                resp = await client.get(f"/{mode}/{ids[i % len(ids)]}")
+                latencies.append((time.perf_counter() - start) * 1000)
+                errors += resp.status_code != 200
+
+        async def prober():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/probe")
+                probes.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.005)
+
+        probe_task = asyncio.create_task(prober())
+        start = time.perf_counter()
+        await asyncio.gather(*(reader() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(_percentile(latencies, 0.99), 2),
+        "probe_p99_ms": round(_percentile(probes, 0.99), 2) if probes else None,
+        "errors": errors,
+    }
+
+
+def main():
+    import anyio.to_thread
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=5000)
+    parser.add_argument("--concurrency", default="16,64,256")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per mode and level")
+    parser.add_argument("--threads", type=int, default=40, help="worker threads for sync routes (anyio default 40)")
+    args = parser.parse_args()
+
+    levels = [int(value) for value in args.concurrency.split(",") if value.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine = make_engine(path)
+        seed_database(engine, args.recipes)
+        engine.dispose()
+        ids = random.Random(5).sample(range(1, args.recipes + 1), min(500, args.recipes))
+
+        bench = make_app()
+        with bench_client(bench, path) as client:
+            async def set_threads():
+                anyio.to_thread.current_default_thread_limiter().total_tokens = args.threads
+
+            client.portal.call(set_threads)
+            print(f"{args.recipes} recipes, {args.requests} requests per run, {args.threads} worker threads")
+            print(f"  {'mode':<6} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'probe p99':>10} {'errors':>7}")
+            for level in levels:
+                for mode in ("sync", "async"):
+                    r = client.portal.call(run_level, bench, mode, ids, args.requests, level)
+                    print(
+                        f"  {r['mode']:<6} {r['concurrency']:>5} {r['throughput_rps']:>9.1f} {r['p50_ms']:>9.2f} "
+                        f"{r['p99_ms']:>9.2f} {r['probe_p99_ms']:>10.2f} {r['errors']:>7}"
+                    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Render benchmark for the recipe list page.
+
+Builds N transient recipes (no database) with a few categories each and
+times rendering recipes_list.html with a cold fragment cache, then warm.
+
+Usage:
+    python benchmarks/bench_render.py --cards 1000 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.fragment_cache import fragment_cache  # noqa: E402
+from app.main import templates  # noqa: E402
+from app.models import Category, Recipe  # noqa: E402
+
+
+def build_recipes(count: int):
+    palette = [None, "#5eead4", "#fcd34d", "#f9a8d4"]
+    categories = [Category(id=i + 1, name=f"Category {i + 1}", color=palette[i % len(palette)]) for i in range(12)]
+    base = datetime(2026, 1, 1)
+    recipes = []
+    for i in range(count):
+        recipe = Recipe(
+            id=i + 1,
+            title=f"Recipe number {i + 1} with a reasonably long title",
+            source_url=f"https://example.com/recipes/{i + 1}",
+            image_url=f"https://example.com/images/{i + 1}.jpg" if i % 3 else None,
+            created_at=base + timedelta(minutes=i),
+            updated_at=base + timedelta(minutes=i),
+        )
+        recipe.categories = [categories[(i + k) % len(categories)] for k in range(3)]
+        recipes.append(recipe)
+    return recipes, categories
+
+
+def time_render(template, context, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        template.render(**context)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    recipes, categories = build_recipes(args.cards)
+    template = templates.env.get_template("recipes_list.html")
+    context = {
+        "recipes": recipes,
+        "categories": categories,
+        "selected_category_id": None,
+        "search_query": None,
+        "filters": {},
+        "sort": "newest",
+    }
+
+    cold = []
+    for _ in range(args.repeat):
+        fragment_cache.clear()
+        cold.extend(time_render(template, context, 1))
+
+    fragment_cache.clear()
+    template.render(**context)
+    warm = time_render(template, context, args.repeat)
+
+    print(f"recipes_list.html with {args.cards} cards ({args.repeat} runs)")
+    print(f"  cold fragment cache: median {statistics.median(cold):8.2f} ms")
+    print(f"  warm fragment cache: median {statistics.median(warm):8.2f} ms")
+    print(f"  speedup: {statistics.median(cold) / statistics.median(warm):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Cold-start benchmark based on ``python -X importtime``.
+
+Imports the app in fresh interpreters, reports the median cumulative import
+time of the target module and its heaviest dependencies, and fails when the
+budget is exceeded or a module that must stay lazy was imported eagerly.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --budget-ms 1500
+    python benchmarks/bench_startup.py --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# These are loaded on first use (or by the background warm-up), never at import
+LAZY_MODULES = (
+    "google.generativeai",
+    "recipe_scrapers",
+    "bs4",
+    "requests",
+    "PIL",
+)
+
+
+def _parse_line(line: str) -> Tuple[str, int, int]:
+    self_us, cumulative_us, name = line[len("import time:"):].split("|")
+    return name.strip(), int(self_us), int(cumulative_us)
+
+
+def measure(target: str, runs: int) -> Dict:
+    totals = []
+    cumulative: Dict[str, List[int]] = {}
+    imported = set()
+
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {target} failed:\n{proc.stderr}")
+
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            name, _, cum = _parse_line(line)
+            imported.add(name)
+            cumulative.setdefault(name, []).append(cum)
+            if name == target:
+                totals.append(cum)
+
+    top_level = {name: statistics.median(values) for name, values in cumulative.items() if "." not in name}
+    heaviest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:15]
+    eager = sorted(m for m in LAZY_MODULES if m in imported)
+
+    return {
+        "target": target,
+        "runs": runs,
+        "median_ms": statistics.median(totals) / 1000,
+        "min_ms": min(totals) / 1000,
+        "heaviest_ms": {name: value / 1000 for name, value in heaviest},
+        "eager_lazy_modules": eager,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if the median import exceeds this")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    result = measure(args.target, args.runs)
+
+    print(f"import {result['target']}: median {result['median_ms']:.1f} ms, min {result['min_ms']:.1f} ms ({result['runs']} runs)")
+    print("heaviest top-level packages (cumulative):")
+    for name, value in result["heaviest_ms"].items():
+        print(f"  {value:8.1f} ms  {name}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(result, fh, indent=2)
+
+    failed = False
+    if result["eager_lazy_modules"]:
+        print(f"FAIL: imported eagerly: {', '.join(result['eager_lazy_modules'])}")
+        failed = True
+    if args.budget_ms is not None and result["median_ms"] > args.budget_ms:
+        print(f"FAIL: median {result['median_ms']:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
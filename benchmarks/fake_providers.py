@@ -0,0 +1,171 @@
+"""
+Local stand-ins for the Ollama and Gemini APIs.
+
+Serves Ollama's /api/chat and /api/tags and Gemini's REST generateContent
+with configurable latency and failure profiles, so imports can be load
+tested fully offline. Point the app at it with:
+
+    OLLAMA_HOST=http://127.0.0.1:11500
+    GEMINI_API_KEY=fake GEMINI_API_ENDPOINT=http://127.0.0.1:11500
+
+Usage:
+    python -m benchmarks.fake_providers --port 11500 \\
+        --gemini "latency=800,jitter=200,fail=0.05,mode=error" \\
+        --ollama "latency=2500,jitter=500"
+
+Profile keys: latency and jitter in ms, fail as a 0-1 rate, and mode, one
+of error (HTTP 500), timeout (hang for 120 s), garbage (invalid JSON) or
+empty (a recipe with no title). token_ms adds latency per 1000 prompt
+tokens and item_ms per recipe generated. Multi-page prompts
+(app/batching.py) get a JSON array back, with each page left out at the
+0-1 rate drop.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+from typing import Any, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+DEFAULT_PROFILE = {"latency": 0.0, "jitter": 0.0, "fail": 0.0, "mode": "error", "token_ms": 0.0, "item_ms": 0.0,
+                   "drop": 0.0}
+FAILURE_MODES = ("error", "timeout", "garbage", "empty")
+
+app = FastAPI(title="Fake AI providers")
+app.state.profiles = {"ollama": dict(DEFAULT_PROFILE), "gemini": dict(DEFAULT_PROFILE)}
+app.state.calls = {"ollama": 0, "gemini": 0}
+
+
+def parse_profile(spec: str) -> Dict[str, Any]:
+    """Parse "latency=800,jitter=200,fail=0.1,mode=error" into a profile dict."""
+    profile = dict(DEFAULT_PROFILE)
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        key, _, value = item.partition("=")
+        if key not in profile:
+            raise ValueError(f"Unknown profile key: {key}")
+        profile[key] = value if key == "mode" else float(value)
+    if profile["mode"] not in FAILURE_MODES:
+        raise ValueError(f"Unknown failure mode: {profile['mode']}")
+    return profile
+
+
+PAGE_RE = re.compile(r"=== PAGE (\d+) ===\s*Source URL:\s*(\S+)")
+
+
+def fake_recipe(prompt: str) -> Dict[str, Any]:
+    """A plausible extraction result for the page named in the prompt."""
+    match = re.search(r"Source URL:\s*(\S+)", prompt)
+    url = match.group(1) if match else "https://example.com/unknown"
+    slug = url.rstrip("/").rsplit("/", 1)[-1].replace("-", " ").title() or "Recipe"
+    return {
+        "title": slug,
+        "ingredients": "2 cups all-purpose flour\n1 teaspoon salt\n3 large eggs",
+        "instructions": "Mix the dry ingredients.\nAdd the eggs.\nBake for 25 minutes.",
+        "prep_time_minutes": 10,
+        "cook_time_minutes": 25,
+        "servings": "4",
+        "image_url": None,
+    }
+
+
+async def simulate(provider: str, prompt: str = ""):
+    """Apply latency and pick a failure mode (or None) for one call."""
+    profile = app.state.profiles[provider]
+    app.state.calls[provider] += 1
+    delay = max(0.0, profile["latency"] + random.uniform(-profile["jitter"], profile["jitter"]))
+    delay += profile["token_ms"] * len(prompt) / 4000 + profile["item_ms"] * max(1, len(PAGE_RE.findall(prompt)))
+    await asyncio.sleep(delay / 1000)
+    if random.random() < profile["fail"]:
+        if profile["mode"] == "timeout":
+            await asyncio.sleep(120)
+        return profile["mode"]
+    return None
+
+
+def content_for(failure, prompt: str) -> str:
+    if failure == "garbage":
+        return "Sure! Here is the recipe you asked for: {not json"
+    pages = PAGE_RE.findall(prompt)
+    if pages:
+        drop = app.state.profiles["gemini"]["drop"]
+        recipes = []
+        for number, url in pages:
+            if random.random() < drop:
+                continue
+            recipe = fake_recipe(f"Source URL: {url}")
+            recipes.append({"page": int(number), "url": url, **recipe})
+        return json.dumps(recipes)
+    recipe = fake_recipe(prompt)
+    if failure == "empty":
+        recipe["title"] = ""
+    return json.dumps(recipe)
+
+
+@app.post("/api/chat")
+async def ollama_chat(request: Request):
+    body = await request.json()
+    prompt = body.get("messages", [{}])[-1].get("content", "")
+    failure = await simulate("ollama", prompt)
+    if failure == "error":
+        return JSONResponse({"error": "model runner crashed"}, status_code=500)
+    return {
+        "model": body.get("model", "llama3.2"),
+        "message": {"role": "assistant", "content": content_for(failure, prompt)},
+        "done": True,
+    }
+
+
+@app.get("/api/tags")
+async def ollama_tags():
+    return {"models": [{"name": "llama3.2:latest"}]}
+
+
+@app.post("/v1beta/models/{model_action}")
+async def gemini_generate(model_action: str, request: Request):
+    body = await request.json()
+    parts = body.get("contents", [{}])[-1].get("parts", [{}])
+    prompt = "".join(part.get("text", "") for part in parts)
+    failure = await simulate("gemini", prompt)
+    if failure == "error":
+        return JSONResponse({"error": {"code": 500, "message": "Internal error", "status": "INTERNAL"}}, status_code=500)
+    return {
+        "candidates": [
+            {
+                "content": {"parts": [{"text": content_for(failure, prompt)}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }
+        ],
+        "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": 120},
+    }
+
+
+@app.get("/v1beta/models/{model}")
+async def gemini_model(model: str):
+    return {"name": f"models/{model}", "supportedGenerationMethods": ["generateContent"]}
+
+
+@app.get("/stats")
+async def stats():
+    return {"calls": app.state.calls, "profiles": app.state.profiles}
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--ollama", default="", help="Ollama latency/failure profile")
+    parser.add_argument("--gemini", default="", help="Gemini latency/failure profile")
+    args = parser.parse_args()
+
+    app.state.profiles = {"ollama": parse_profile(args.ollama), "gemini": parse_profile(args.gemini)}
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+End-to-end load test of POST /import, fully offline.
+
+Starts the fake AI providers (benchmarks/fake_providers.py) and the app under
+uvicorn in replay mode, then drives imports at each concurrency level and
+reports throughput, p50/p99 latency, success rate and which extraction
+method served each request.
+
+Pages come from a recorded fixture store (--fixtures, see record_pages.py)
+or are generated: --structured-ratio of them carry schema.org JSON-LD on a
+domain the standard scraper supports, the rest fall through to the AI
+providers.
+
+Usage:
+    python benchmarks/load_import.py --concurrency 1,4,16 --requests 200
+    python benchmarks/load_import.py --fixtures fixtures/pages --gemini "latency=800,jitter=200,fail=0.1"
+    python benchmarks/load_import.py --structured-ratio 0 --gemini "fail=1" --ollama "latency=2000" --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.database import Base  # noqa: E402
+from app.fetcher import FixtureStore  # noqa: E402
+from benchmarks.synthetic import TITLE_WORDS, make_engine, make_html_page  # noqa: E402
+
+METHOD_RE = re.compile(r"Recipe imported using (\w+) method")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def generate_fixtures(store: FixtureStore, count: int, structured_ratio: float, seed: int = 42) -> List[str]:
+    """Write synthetic pages into the store and return their URLs."""
+    rng = random.Random(seed)
+    urls = []
+    for i in range(count):
+        title = f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} {i}"
+        slug = title.lower().replace(" ", "-")
+        if rng.random() < structured_ratio:
+            url = f"https://www.allrecipes.com/recipe/{100000 + i}/{slug}/"
+            html = make_html_page(rng, rng.randint(5, 60), title=title)
+        else:
+            url = f"https://blog.example.com/{slug}"
+            html = make_html_page(rng, rng.randint(5, 60))
+        store.save(url, html)
+        urls.append(url)
+    return urls
+
+
+def recorded_urls(store: FixtureStore) -> List[str]:
+    return [json.loads(path.read_text(encoding="utf-8"))["url"] for path in sorted(store.root.glob("*.json"))]
+
+
+def wait_ready(url: str, proc: subprocess.Popen, timeout: float = 30.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{proc.args} exited with {proc.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+async def drive(base_url: str, urls: List[str], total: int, concurrency: int, timeout: float) -> Dict:
+    import httpx
+
+    latencies: List[float] = []
+    methods: Counter = Counter()
+    queue = iter(range(total))
+
+    async def worker(client):
+        for i in queue:
+            start = time.perf_counter()
+            try:
+                resp = await client.post("/import", data={"url": urls[i % len(urls)]})
+                match = METHOD_RE.search(resp.text) if resp.status_code == 200 else None
+                methods[match.group(1).lower() if match else "failed"] += 1
+            except httpx.HTTPError:
+                methods["error"] += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    succeeded = total - methods["failed"] - methods["error"]
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 1),
+        "success_rate": round(succeeded / total, 4),
+        "methods": dict(methods),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,4,16", help="comma separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="imports per concurrency level")
+    parser.add_argument("--fixtures", help="recorded fixture store to replay (default: generate synthetic pages)")
+    parser.add_argument("--pages", type=int, default=50, help="synthetic pages to generate")
+    parser.add_argument("--structured-ratio", type=float, default=0.5, help="share of synthetic pages with JSON-LD")
+    parser.add_argument("--gemini", default="latency=800,jitter=200", help="fake Gemini profile")
+    parser.add_argument("--ollama", default="latency=2500,jitter=500", help="fake Ollama profile")
+    parser.add_argument("--fetch-latency-ms", type=float, default=50, help="simulated page fetch latency")
+    parser.add_argument("--timeout", type=float, default=180, help="per-request client timeout in seconds")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    levels = [int(value) for value in args.concurrency.split(",") if value.strip()]
+    procs: List[subprocess.Popen] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.fixtures:
+            store = FixtureStore(args.fixtures)
+            urls = recorded_urls(store)
+        else:
+            store = FixtureStore(os.path.join(tmp, "pages"))
+            urls = generate_fixtures(store, args.pages, args.structured_ratio)
+        if not urls:
+            parser.error("no pages to replay")
+
+        db_path = os.path.join(tmp, "load.db")
+        engine = make_engine(db_path)
+        Base.metadata.create_all(bind=engine)
+        engine.dispose()
+
+        fake_port, app_port = free_port(), free_port()
+        fake_url = f"http://127.0.0.1:{fake_port}"
+        app_url = f"http://127.0.0.1:{app_port}"
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{db_path}",
+            "FETCH_REPLAY_DIR": str(store.root),
+            "FETCH_REPLAY_LATENCY_MS": str(args.fetch_latency_ms),
+            "FETCH_RECORD_DIR": "",
+            "OLLAMA_HOST": fake_url,
+            "GEMINI_API_KEY": "fake",
+            "GEMINI_API_ENDPOINT": fake_url,
+            "IMAGE_CACHE_DIR": os.path.join(tmp, "images"),
+            "PAGE_ARCHIVE_DIR": os.path.join(tmp, "archive"),
+            "WARMUP_ON_STARTUP": "0",
+        }
+
+        try:
+            fake = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.fake_providers", "--port", str(fake_port),
+                 "--gemini", args.gemini, "--ollama", args.ollama],
+                cwd=ROOT, env=env,
+            )
+            procs.append(fake)
+            wait_ready(f"{fake_url}/stats", fake)
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(app_port), "--log-level", "warning"],
+                cwd=ROOT, env=env,
+            )
+            procs.append(server)
+            wait_ready(f"{app_url}/", server)
+
+            print(f"{len(urls)} pages, {args.requests} imports per level", file=sys.stderr)
+            print(f"gemini: {args.gemini or 'instant'} | ollama: {args.ollama or 'instant'}", file=sys.stderr)
+            results = []
+            for level in levels:
+                result = asyncio.run(drive(app_url, urls, args.requests, level, args.timeout))
+                results.append(result)
+                methods = ", ".join(f"{name} {count}" for name, count in sorted(result["methods"].items()))
+                print(
+                    f"  c={level:<3} {result['throughput_rps']:7.2f} req/s  p50 {result['p50_ms']:8.1f} ms  "
+                    f"p99 {result['p99_ms']:8.1f} ms  ok {result['success_rate']:6.1%}  [{methods}]"
+                )
+        finally:
+            for proc in reversed(procs):
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"profiles": {"gemini": args.gemini, "ollama": args.ollama}, "results": results}, fh, indent=2)
+        print(f"wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
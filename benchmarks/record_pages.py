@@ -0,0 +1,54 @@
+"""
+Record live recipe pages into a fixture store for offline replay.
+
+Fixtures are read back by app.fetcher when FETCH_REPLAY_DIR points at the
+same directory, and by benchmarks/load_import.py --fixtures.
+
+Usage:
+    python benchmarks/record_pages.py --store fixtures/pages urls.txt
+    echo https://www.allrecipes.com/recipe/... | python benchmarks/record_pages.py --store fixtures/pages -
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.fetcher import FETCH_HEADERS, FETCH_TIMEOUT, FixtureStore  # noqa: E402
+
+
+def main():
+    import requests
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", help="file with one URL per line, or - for stdin")
+    parser.add_argument("--store", required=True, help="fixture directory to write")
+    parser.add_argument("--force", action="store_true", help="re-record URLs that already have a fixture")
+    args = parser.parse_args()
+
+    store = FixtureStore(args.store)
+    source = sys.stdin if args.urls == "-" else open(args.urls, encoding="utf-8")
+    with source:
+        urls = [line.strip() for line in source if line.strip() and not line.startswith("#")]
+
+    recorded = skipped = failed = 0
+    for url in urls:
+        if not args.force and store.load(url) is not None:
+            skipped += 1
+            continue
+        try:
+            resp = requests.get(url, headers=FETCH_HEADERS, timeout=FETCH_TIMEOUT)
+        except Exception as e:
+            print(f"  failed  {url}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        # Error pages are kept too, so replay reproduces the failure
+        store.save(url, resp.text, resp.status_code, resp.headers.get("content-type", "text/html"))
+        recorded += 1
+        print(f"  {resp.status_code}     {url} ({len(resp.text) // 1024} KiB)", file=sys.stderr)
+
+    print(f"Recorded {recorded}, skipped {skipped}, failed {failed}; store has {len(store)} pages", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Micro-benchmarks for the DB, search, rendering, insert, shopping list, autocomplete and HTML-cleaning hot paths.
+
+Each scale gets its own temporary SQLite database seeded with synthetic
+recipes. Results are written as JSON; pass --compare to flag any benchmark
+whose median got slower than the baseline by more than --threshold.
+
+Usage:
+    python benchmarks/suite.py --scales 1000,10000 --output bench.json
+    python benchmarks/suite.py --scales 1000,10000 --compare bench.json --threshold 0.15
+    python benchmarks/suite.py --scales 100000 --only query,render --repeat 3
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.ai_parser import clean_html  # noqa: E402
+from app.autocomplete import build_from_db  # noqa: E402
+from app.crud import create_recipe_record, get_recipe, list_recipes_query  # noqa: E402
+from app.fragment_cache import fragment_cache  # noqa: E402
+from app.main import app, templates  # noqa: E402
+from app.models import Category  # noqa: E402
+from app.shopping import build_shopping_list, parse_line  # noqa: E402
+from benchmarks.synthetic import bench_client, make_engine, make_html_page, seed_database  # noqa: E402
+
+GROUPS = ("query", "render", "insert", "route", "shopping", "autocomplete", "clean_html")
+
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "runs": repeat,
+    }
+
+
+def scale_benchmarks(scale: int, groups: List[str], repeat: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(os.path.join(tmp, "bench.db"))
+        seeded = seed_database(engine, scale)
+        print(f"[{scale}] seeded {seeded['restored']} recipes in {seeded['seconds']:.1f}s", file=sys.stderr)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+        db = SessionLocal()
+        rng = random.Random(7)
+        ids = [rng.randint(1, scale) for _ in range(repeat + 1)]
+
+        def record(name: str, fn: Callable[[], object], runs: int = repeat):
+            key = f"{name}[{scale}]"
+            results[key] = measure(fn, runs)
+            print(f"  {key:<40} median {results[key]['median_ms']:10.3f} ms", file=sys.stderr)
+
+        if "query" in groups:
+            category_id = db.query(Category.id).order_by(Category.id).first()[0]
+            record("query.list_all", lambda: list_recipes_query(db).all())
+            record("query.list_category", lambda: list_recipes_query(db, category_id=category_id).all())
+            record("query.search", lambda: list_recipes_query(db, q="chocolate").all())
+            detail_ids = iter(ids * 2)
+            record("query.detail", lambda: get_recipe(db, next(detail_ids)))
+
+        if "render" in groups:
+            recipes = list_recipes_query(db).all()
+            categories = db.query(Category).order_by(Category.name).all()
+            context = {
+                "recipes": recipes,
+                "categories": categories,
+                "selected_category_id": None,
+                "search_query": None,
+                "filters": {},
+                "sort": "newest",
+            }
+            list_template = templates.env.get_template("recipes_list.html")
+
+            def render_cold():
+                fragment_cache.clear()
+                list_template.render(**context)
+
+            record("render.list_cold", render_cold)
+            record("render.list_warm", lambda: list_template.render(**context))
+
+            detail_template = templates.env.get_template("recipe_detail.html")
+            recipe = get_recipe(db, ids[0])
+
+            def render_detail_cold():
+                fragment_cache.clear()
+                detail_template.render(recipe=recipe)
+
+            record("render.detail_cold", render_detail_cold)
+
+        if "insert" in groups:
+            counter = iter(range(10**9))
+
+            def insert_batch():
+                for _ in range(20):
+                    n = next(counter)
+                    create_recipe_record(
+                        db,
+                        title=f"Inserted {n}",
+                        source_url=f"https://example.com/inserted/{n}",
+                        ingredients="2 cups flour\n1 tsp salt\n3 large eggs",
+                        instructions="Mix.\nBake.",
+                        servings="4",
+                        category_ids=[1, 2],
+                    )
+
+            record("insert.create_recipe_x20", insert_batch)
+
+        if "shopping" in groups:
+            menu = [(recipe_id, rng.choice([2, 4, 6, 8])) for recipe_id in rng.sample(range(1, scale + 1), min(50, scale))]
+
+            def shopping_cold():
+                parse_line.cache_clear()
+                build_shopping_list(db, menu)
+
+            record("shopping.list_50_cold", shopping_cold)
+            record("shopping.list_50_warm", lambda: build_shopping_list(db, menu))
+
+        if "autocomplete" in groups:
+            tracemalloc.start()
+            index = build_from_db(db)
+            size_mb = tracemalloc.get_traced_memory()[0] / 2**20
+            tracemalloc.stop()
+            print(f"  autocomplete index: {len(index)} suggestions, {size_mb:.1f} MiB", file=sys.stderr)
+            record("autocomplete.build", lambda: build_from_db(db), runs=max(1, repeat // 5))
+            prefixes = iter(["c", "ch", "cho", "choc", "chocolate c", "garl", "flou", "s", "bu", "xyz"] * (repeat + 1))
+            record("autocomplete.suggest", lambda: index.suggest(next(prefixes), 10))
+            counter = iter(range(10**9))
+            record(
+                "autocomplete.add_recipe",
+                lambda: index.add_recipe(10**7 + next(counter), "Brown Butter Cookies", "1 cup butter\n2 cups flour"),
+            )
+
+        if "route" in groups:
+            with bench_client(app, os.path.join(tmp, "bench.db")) as client:
+                record("route.list_recipes", lambda: client.get("/recipes"))
+                detail_ids = iter(ids * 2)
+                record("route.recipe_detail", lambda: client.get(f"/recipes/{next(detail_ids)}"))
+                record("route.api_list", lambda: client.get("/api/v1/recipes?limit=100"))
+
+        db.close()
+        engine.dispose()
+
+    return results
+
+
+def html_benchmarks(repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    rng = random.Random(11)
+    for label, paragraphs in (("small", 5), ("large", 400)):
+        page = make_html_page(rng, paragraphs)
+        key = f"clean_html.{label}[{len(page) // 1024}KiB]"
+        results[key] = measure(lambda: clean_html(page), repeat)
+        print(f"  {key:<40} median {results[key]['median_ms']:10.3f} ms", file=sys.stderr)
+    return results
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Print a comparison table and return the keys that regressed beyond the threshold."""
+    regressions = []
+    print(f"\n{'benchmark':<42} {'baseline':>11} {'current':>11} {'change':>8}")
+    for key in sorted(current["results"]):
+        if key not in baseline.get("results", {}):
+            continue
+        old = baseline["results"][key]["median_ms"]
+        new = current["results"][key]["median_ms"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"{key:<42} {old:9.3f}ms {new:9.3f}ms {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1000,10000", help="comma separated recipe counts, e.g. 1000,10000,100000")
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"comma separated groups from: {', '.join(GROUPS)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before flagging (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    groups = [group.strip() for group in args.only.split(",") if group.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(sorted(unknown))}")
+    scales = [int(value) for value in args.scales.split(",") if value.strip()]
+
+    results: Dict[str, Dict[str, float]] = {}
+    for scale in scales:
+        results.update(scale_benchmarks(scale, groups, args.repeat))
+    if "clean_html" in groups:
+        results.update(html_benchmarks(args.repeat))
+
+    current = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scales": scales,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(current, fh, indent=2)
+        print(f"wrote {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
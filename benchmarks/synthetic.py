@@ -0,0 +1,157 @@
+"""
+Synthetic recipe data for benchmarks.
+
+Produces deterministic recipes with realistic ingredient lines, instructions
+and category assignments, and loads them through the NDJSON restore path.
+"""
+import json
+import os
+import random
+import sys
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+from app.backup import restore  # noqa: E402
+from app.database import Base, get_async_db, get_db  # noqa: E402
+
+QUANTITIES = ["1", "2", "3", "4", "1/2", "1/4", "3/4", "1 1/2", "2 1/2", "6", "8", "12"]
+UNITS = [
+    "cup", "cups", "tablespoon", "tablespoons", "teaspoon", "teaspoons", "tbsp", "tsp",
+    "ounce", "ounces", "oz", "pound", "lb", "gram", "g", "kg", "ml", "liter", "clove", "cloves", "",
+]
+INGREDIENTS = [
+    "all-purpose flour", "granulated sugar", "brown sugar", "unsalted butter, softened", "large eggs",
+    "whole milk", "heavy cream", "kosher salt", "black pepper", "olive oil", "garlic, minced",
+    "yellow onion, diced", "carrots, peeled and chopped", "celery stalks", "chicken broth",
+    "boneless chicken thighs", "ground beef", "canned tomatoes", "tomato paste", "fresh basil",
+    "parmesan cheese, grated", "cheddar cheese, shredded", "baking soda", "baking powder",
+    "vanilla extract", "semisweet chocolate chips", "lemon juice", "soy sauce", "rice vinegar",
+    "fresh ginger, grated", "long-grain white rice", "dried oregano", "ground cumin", "paprika",
+    "red pepper flakes", "spinach", "mushrooms, sliced", "green onions", "cilantro", "lime wedges",
+]
+STEPS = [
+    "Preheat the oven to 375°F and line a baking sheet with parchment.",
+    "Whisk the dry ingredients together in a large bowl.",
+    "Melt the butter in a skillet over medium heat until foaming.",
+    "Add the onion and cook, stirring often, until soft and translucent, about 6 minutes.",
+    "Stir in the garlic and spices and cook until fragrant, about 1 minute.",
+    "Pour in the broth, scrape up any browned bits, and bring to a simmer.",
+    "Reduce the heat and simmer uncovered until thickened, 20 to 25 minutes.",
+    "Fold in the cheese and season to taste with salt and pepper.",
+    "Transfer to the prepared pan and bake until golden, 25 to 30 minutes.",
+    "Let rest for 10 minutes before slicing and serving.",
+]
+TITLE_WORDS = [
+    "Roasted", "Creamy", "Spicy", "Classic", "Weeknight", "Lemon", "Garlic", "Herb", "Smoky", "Crispy",
+    "Chicken", "Pasta", "Soup", "Tacos", "Curry", "Salad", "Casserole", "Cookies", "Bread", "Stew",
+]
+SERVINGS = ["2", "4", "4 servings", "6", "6-8", "8 servings", "12 cookies", "1 loaf", "Serves 4"]
+PALETTE = [None, "#5eead4", "#fcd34d", "#f9a8d4", "#93c5fd"]
+
+
+def ingredient_line(rng: random.Random) -> str:
+    parts = [rng.choice(QUANTITIES), rng.choice(UNITS), rng.choice(INGREDIENTS)]
+    return " ".join(part for part in parts if part)
+
+
+def make_recipes(count: int, category_count: int = 20, seed: int = 42) -> Iterator[Dict]:
+    """Yield recipe records in the NDJSON export shape."""
+    rng = random.Random(seed)
+    categories = [{"name": f"Category {i}", "color": PALETTE[i % len(PALETTE)]} for i in range(category_count)]
+    for i in range(count):
+        yield {
+            "id": i + 1,
+            "title": f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} #{i + 1}",
+            "source_url": f"https://example.com/recipes/{i + 1}",
+            "ingredients": "\n".join(ingredient_line(rng) for _ in range(rng.randint(6, 18))),
+            "instructions": "\n".join(rng.sample(STEPS, rng.randint(4, len(STEPS)))),
+            "prep_time_minutes": rng.choice([5, 10, 15, 20, 30, None]),
+            "cook_time_minutes": rng.choice([10, 20, 30, 45, 60, 90, None]),
+            "servings": rng.choice(SERVINGS),
+            "image_url": f"https://example.com/images/{i + 1}.jpg" if rng.random() < 0.7 else None,
+            "categories": rng.sample(categories, rng.randint(0, min(3, category_count))),
+        }
+
+
+def make_html_page(rng: random.Random, paragraphs: int, title: Optional[str] = None) -> str:
+    """
+    A recipe blog page: long story preamble, then the recipe card, with scripts and nav noise.
+
+    With a title the page also carries schema.org Recipe JSON-LD, as sites
+    supported by the standard scraper do.
+    """
+    story = "\n".join(
+        f"<p>{' '.join(rng.choice(INGREDIENTS) for _ in range(40))}.</p>" for _ in range(paragraphs)
+    )
+    ingredients = "".join(f"<li>{ingredient_line(rng)}</li>" for _ in range(12))
+    steps = "".join(f"<li>{step}</li>" for step in STEPS)
+    noise = "<script>window.dataLayer = [];" + "x=1;" * 2000 + "</script><style>.a{color:red}</style>"
+    if title:
+        schema = {
+            "@context": "https://schema.org",
+            "@type": "Recipe",
+            "name": title,
+            "recipeIngredient": [ingredient_line(rng) for _ in range(12)],
+            "recipeInstructions": [{"@type": "HowToStep", "text": step} for step in STEPS],
+            "prepTime": "PT15M",
+            "cookTime": "PT30M",
+            "recipeYield": "4",
+            "image": "https://example.com/images/synthetic.jpg",
+        }
+        noise += f'<script type="application/ld+json">{json.dumps(schema)}</script>'
+    return (
+        f"<html><head>{noise}</head><body><nav><a href='/'>Home</a></nav><header>Site</header>"
+        f"<article>{story}<div class='recipe-card'><h2>Ingredients</h2><ul>{ingredients}</ul>"
+        f"<h2>Instructions</h2><ol>{steps}</ol></div></article><footer>Footer</footer></body></html>"
+    )
+
+
+def seed_database(engine: Engine, count: int, category_count: int = 20, seed: int = 42) -> Dict:
+    """Create the schema and bulk-load ``count`` synthetic recipes."""
+    Base.metadata.create_all(bind=engine)
+    lines = (json.dumps(record) for record in make_recipes(count, category_count, seed))
+    return restore(lines, engine, chunk_size=2000)
+
+
+def make_engine(path: str) -> Engine:
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}, future=True)
+
+
+
+@contextmanager
+def bench_client(app, path: str):
+    """A TestClient whose sync and async sessions both use the SQLite file at path."""
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    engine = make_engine(path)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        with TestClient(app) as client:
+            yield client
+            client.portal.call(async_engine.dispose)
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
@@ -0,0 +1,54 @@
+import os
+
+# Keep test processes from importing every provider SDK in the background
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+# and from probing providers that are not running
+os.environ.setdefault("HEALTH_PROBES_ENABLED", "0")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app import archive, autocomplete, health  # noqa: E402
+from app.database import Base, get_async_db, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    """A TestClient backed by a fresh database, shared by the sync and async sessions."""
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}, future=True)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    # The in-memory autocomplete index is built from whichever database it sees first
+    autocomplete.reset()
+    health.reset()
+    monkeypatch.setattr(archive, "page_archive", archive.PageArchive(str(tmp_path / "page_archive")))
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        with TestClient(app) as test_client:
+            test_client.session_factory = SessionLocal
+            yield test_client
+            # Dispose on the app's event loop, which owns the aiosqlite connections
+            test_client.portal.call(async_engine.dispose)
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
@@ -0,0 +1,53 @@
+def _create(client, title, **extra):
+    payload = {"title": title, "source_url": f"http://example.com/{title.lower()}", **extra}
+    resp = client.post("/api/v1/recipes", json=payload)
+    assert resp.status_code == 201
+    return resp.json()
+
+
+def test_create_and_get_recipe(client):
+    created = _create(client, "Soup", ingredients="1 cup water", new_category="Dinner")
+    assert created["ingredients"] == "1 cup water"
+    assert created["categories"][0]["name"] == "Dinner"
+
+    fetched = client.get(f"/api/v1/recipes/{created['id']}").json()
+    assert fetched["title"] == "Soup"
+    assert client.get("/api/v1/recipes/999").status_code == 404
+
+
+def test_sparse_fieldsets(client):
+    created = _create(client, "Soup", ingredients="1 cup water")
+
+    summary = client.get("/api/v1/recipes").json()["items"][0]
+    assert "ingredients" not in summary
+    assert "title" in summary
+
+    sparse = client.get(f"/api/v1/recipes/{created['id']}?fields=title").json()
+    assert sparse == {"id": created["id"], "title": "Soup"}
+
+    assert client.get("/api/v1/recipes?fields=title,bogus").status_code == 400
+
+
+def test_cursor_pagination_walks_every_recipe(client):
+    for i in range(5):
+        _create(client, f"Recipe{i}")
+
+    seen = []
+    url = "/api/v1/recipes?limit=2&fields=title"
+    while url:
+        page = client.get(url).json()
+        seen.extend(item["title"] for item in page["items"])
+        url = f"/api/v1/recipes?limit=2&fields=title&cursor={page['next_cursor']}" if page["next_cursor"] else None
+
+    assert seen == [f"Recipe{i}" for i in reversed(range(5))]
+
+
+def test_search_and_categories(client):
+    _create(client, "Soup", ingredients="2 carrots", new_category="Dinner")
+    _create(client, "Cake", ingredients="flour", new_category="Dessert")
+
+    found = client.get("/api/v1/recipes/search?q=carrot").json()["items"]
+    assert [item["title"] for item in found] == ["Soup"]
+
+    categories = client.get("/api/v1/categories").json()
+    assert [(c["name"], c["recipe_count"]) for c in categories] == [("Dessert", 1), ("Dinner", 1)]
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from app import fetcher, routing
+from app.archive import PageArchive, archive_page
+from app.crud import create_recipe_record
+from app.fetcher import FixtureStore
+from app.models import PageSnapshot, Recipe
+from app.reextract import latest_snapshots, reextract
+from benchmarks.synthetic import make_html_page
+
+URL = "https://www.allrecipes.com/recipe/100001/lemon-herb-chicken/"
+
+
+@pytest.fixture()
+def db(client):
+    session = client.session_factory()
+    yield session
+    session.close()
+
+
+@pytest.mark.parametrize("codec", ["zstd", "gzip"])
+def test_blobs_are_compressed_and_content_addressed(tmp_path, codec):
+    store = PageArchive(str(tmp_path), codec=codec)
+    html = make_html_page(random.Random(1), 8)
+
+    digest, used, size, stored = store.put(html)
+    assert store.put(html)[:2] == (digest, codec)
+    assert used == codec and stored < size / 2
+    assert len(list(tmp_path.glob("blobs/*/*"))) == 1
+    assert store.get(digest, codec) == html
+    # An archive switched to the other codec still finds existing blobs
+    other = PageArchive(str(tmp_path), codec="gzip" if codec == "zstd" else "zstd")
+    assert other.put(html)[1] == codec
+
+
+def test_imported_page_is_archived_and_linked_on_save(client, db, tmp_path, monkeypatch):
+    monkeypatch.setattr(fetcher, "FETCH_REPLAY_DIR", str(tmp_path / "pages"))
+    monkeypatch.setattr(routing, "ROUTING_EXPLORE_RATE", 0.0)
+    FixtureStore(str(tmp_path / "pages")).save(URL, make_html_page(random.Random(1), 5, title="Lemon Herb Chicken"))
+
+    assert "STANDARD method" in client.post("/import", data={"url": URL}).text
+    client.post("/import", data={"url": URL})
+    snapshot = db.query(PageSnapshot).one()
+    assert snapshot.recipe_id is None
+
+    recipe = create_recipe_record(db, title="Lemon Herb Chicken", source_url=URL)
+    db.refresh(snapshot)
+    assert snapshot.recipe_id == recipe.id
+    assert [row[0] for row in latest_snapshots(db)] == [recipe.id]
+
+
+def test_reextract_updates_only_changed_fields(db):
+    page = make_html_page(random.Random(1), 5, title="Lemon Herb Chicken")
+    stale = create_recipe_record(db, title="Lemon Herb Chicken", source_url=URL, ingredients="old line", servings="2")
+    broken = create_recipe_record(db, title="Broken", source_url="https://www.allrecipes.com/recipe/2/broken/")
+    archive_page(db, URL, "<html>older</html>", stale.id)
+    archive_page(db, URL, page, stale.id)
+    archive_page(db, broken.source_url, "<html><body>no recipe</body></html>", broken.id)
+    stale_id, updated_at = stale.id, stale.updated_at
+
+    preview = reextract(db, workers=2, dry_run=True)
+    assert (preview["pages"], preview["changed"], preview["failed"]) == (2, 1, 1)
+    db.expire_all()
+    assert db.get(Recipe, stale_id).ingredients == "old line"
+
+    stats = reextract(db, workers=2)
+    db.expire_all()
+    recipe = db.get(Recipe, stale_id)
+    assert "title" not in stats["fields"] and stats["fields"]["ingredients"] == 1
+    assert recipe.title == "Lemon Herb Chicken" and recipe.ingredients != "old line"
+    assert recipe.ingredient_count == len(recipe.ingredients.splitlines()) > 1
+    assert recipe.updated_at > updated_at
+    assert reextract(db, workers=1)["changed"] == 0
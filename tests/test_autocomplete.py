@@ -0,0 +1,104 @@
+import random
+import threading
+
+from app import autocomplete
+from app.autocomplete import PrefixIndex, normalize
+from app.crud import create_recipe_record
+from app.models import Recipe
+from benchmarks.synthetic import make_recipes
+
+RECIPES = [
+    (1, "Lemon Herb Chicken", "2 lb chicken thighs\n1 lemon\n2 tbsp olive oil", 1.0),
+    (2, "Chicken Noodle Soup", "1 lb chicken thighs\n8 oz egg noodles\n1 onion", 1.0),
+    (3, "Crème Brûlée", "2 cups heavy cream\n5 egg yolks\n1/2 cup sugar", 1.0),
+    (4, "Chickpea Curry", "1 can chickpeas\n1 onion\n2 tbsp curry powder", 5.0),
+]
+CATEGORIES = [(1, "Chinese", 0), (2, "Dinner", 3)]
+
+
+def _texts(suggestions):
+    return [(s["kind"], s["text"]) for s in suggestions]
+
+
+def test_normalize_strips_accents_and_punctuation():
+    assert normalize("  Crème-Brûlée! ") == "creme brulee"
+
+
+def test_matches_any_word_start_ranked_by_weight():
+    index = PrefixIndex.build(RECIPES, CATEGORIES)
+
+    assert _texts(index.suggest("chick")) == [
+        ("recipe", "Chickpea Curry"),
+        ("ingredient", "chicken thighs"),
+        ("recipe", "Lemon Herb Chicken"),
+        ("recipe", "Chicken Noodle Soup"),
+        ("ingredient", "chickpeas"),
+    ]
+    assert ("recipe", "Crème Brûlée") in _texts(index.suggest("brul"))
+    assert _texts(index.suggest("noodle s")) == [("recipe", "Chicken Noodle Soup")]
+    assert index.suggest("zzz") == [] and index.suggest("  ") == []
+
+
+def test_incremental_adds_match_bulk_build():
+    recipes = [(r["id"], r["title"], r["ingredients"], 1.0) for r in make_recipes(300, seed=4)]
+    built = PrefixIndex.build(recipes, [])
+    grown = PrefixIndex()
+    for recipe_id, title, ingredients, weight in recipes:
+        grown.add_recipe(recipe_id, title, ingredients, weight=weight)
+
+    rng = random.Random(2)
+    prefixes = ["c", "ch", "cho", "s", "fl", "butt"] + [title.split()[-1][:4].lower() for _, title, _, _ in rng.sample(recipes, 20)]
+    for prefix in prefixes:
+        assert [s["weight"] for s in grown.suggest(prefix, 20)] == [s["weight"] for s in built.suggest(prefix, 20)], prefix
+
+
+def test_new_recipes_appear_in_autocomplete(client):
+    db = client.session_factory()
+    create_recipe_record(db, title="Lemon Bars", source_url="https://example.com/bars", ingredients="3 lemons")
+    db.close()
+
+    first = client.get("/autocomplete?prefix=lem").json()
+    assert [s["text"] for s in first["suggestions"]] == ["Lemon Bars", "lemons"]
+
+    resp = client.post("/api/v1/recipes", json={
+        "title": "Lemon Tart", "source_url": "https://example.com/tart",
+        "ingredients": "2 lemons\n1 cup sugar", "new_category": "Desserts",
+    })
+    assert resp.status_code == 201
+    suggestions = {s["text"]: s for s in client.get("/autocomplete?prefix=lemo").json()["suggestions"]}
+
+    assert suggestions["Lemon Tart"]["url"] == f"/recipes/{resp.json()['id']}"
+    assert suggestions["lemons"]["weight"] == 2
+    assert suggestions["lemons"]["url"] == "/recipes?q=lemons"
+    assert client.get("/autocomplete?prefix=dess").json()["suggestions"][0]["kind"] == "category"
+
+
+def _wait_for_rebuild():
+    for thread in threading.enumerate():
+        if thread.name == "autocomplete-rebuild":
+            thread.join(5)
+
+
+def test_recipes_saved_by_another_worker_appear_after_a_version_check(client, monkeypatch):
+    assert client.get("/autocomplete?prefix=lem").json()["suggestions"] == []
+
+    # Written without add_recipe, as another worker process would
+    db = client.session_factory()
+    db.add(Recipe(title="Lemon Bars", source_url="https://example.com/bars"))
+    db.commit()
+    db.close()
+    assert client.get("/autocomplete?prefix=lem").json()["suggestions"] == []
+
+    monkeypatch.setattr(autocomplete, "AUTOCOMPLETE_CHECK_SECONDS", 0.0)
+    client.get("/autocomplete?prefix=lem")
+    _wait_for_rebuild()
+    assert [s["text"] for s in client.get("/autocomplete?prefix=lem").json()["suggestions"]] == ["Lemon Bars"]
+
+
+def test_failed_rebuild_leaves_the_index_stale(client, monkeypatch):
+    client.get("/autocomplete?prefix=lem")
+    monkeypatch.setattr(autocomplete, "build_from_db", lambda db: 1 / 0)
+    autocomplete.invalidate()
+    client.get("/autocomplete?prefix=lem")
+    _wait_for_rebuild()
+    assert autocomplete._stale
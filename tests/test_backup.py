@@ -0,0 +1,96 @@
+import json
+
+from app.backup import iter_export, restore
+from app.models import Category, Recipe, RecipeCategory
+
+
+def _seed(db):
+    dinner = Category(name="Dinner", color="#5eead4")
+    soup = Recipe(title="Soup", source_url="http://example.com/soup", ingredients="1 cup water")
+    soup.categories.append(dinner)
+    salad = Recipe(title="Salad", source_url="http://example.com/salad")
+    db.add_all([soup, salad])
+    db.commit()
+
+
+def test_export_streams_one_line_per_recipe(client):
+    db = client.session_factory()
+    _seed(db)
+
+    lines = list(iter_export(db, batch_size=1))
+    db.close()
+
+    records = [json.loads(line) for line in lines]
+    assert [r["title"] for r in records] == ["Soup", "Salad"]
+    assert records[0]["categories"] == [{"name": "Dinner", "color": "#5eead4"}]
+    assert records[1]["categories"] == []
+
+
+def test_restore_round_trip_is_idempotent(client):
+    db = client.session_factory()
+    _seed(db)
+    lines = list(iter_export(db))
+
+    # Wipe and restore into the same database
+    db.query(RecipeCategory).delete()
+    db.query(Recipe).delete()
+    db.query(Category).delete()
+    db.commit()
+
+    stats = restore(lines, db.get_bind(), chunk_size=1)
+    assert stats["restored"] == 2
+    assert restore(lines, db.get_bind())["skipped"] == 2
+
+    soup = db.query(Recipe).filter(Recipe.title == "Soup").one()
+    assert [c.name for c in soup.categories] == ["Dinner"]
+    assert db.query(Category).count() == 1
+    db.close()
+
+
+def test_export_and_restore_routes(client):
+    client.post("/recipes", data={"title": "Soup", "source_url": "http://example.com/soup", "new_category": "Dinner"})
+
+    export = client.get("/export.ndjson")
+    assert export.status_code == 200
+    assert export.headers["content-type"].startswith("application/x-ndjson")
+    record = json.loads(export.text.splitlines()[0])
+    assert record["title"] == "Soup"
+
+    record.pop("id")
+    resp = client.post("/restore", files={"file": ("r.ndjson", json.dumps(record) + "\n")})
+    assert resp.json()["restored"] == 1
+    assert len(client.get("/api/v1/recipes").json()["items"]) == 2
+
+
+def test_restore_skips_ids_repeated_within_an_upload(client):
+    lines = [
+        json.dumps({"id": 7, "title": "Soup", "source_url": "http://example.com/soup"}) + "\n",
+        json.dumps({"id": 7, "title": "Soup again", "source_url": "http://example.com/soup2"}) + "\n",
+        json.dumps({"title": "Salad", "source_url": "http://example.com/salad"}) + "\n",
+    ]
+    resp = client.post("/restore", files={"file": ("r.ndjson", "".join(lines))})
+    assert resp.status_code == 200
+    assert (resp.json()["restored"], resp.json()["skipped"]) == (2, 1)
+
+    db = client.session_factory()
+    assert db.get(Recipe, 7).title == "Soup"
+    db.close()
+
+
+def test_restore_skips_invalid_lines_and_marks_rows_changed(client):
+    lines = [
+        json.dumps({"title": "Soup", "source_url": "http://example.com/soup", "updated_at": "2001-01-01T00:00:00"}),
+        "{not json",
+        json.dumps({"source_url": "http://example.com/untitled"}),
+        json.dumps({"title": "Bad date", "source_url": "http://example.com/x", "created_at": "yesterday"}),
+        json.dumps({"title": "Salad", "source_url": "http://example.com/salad"}),
+    ]
+    resp = client.post("/restore", files={"file": ("r.ndjson", "\n".join(lines) + "\n")})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert (body["restored"], body["skipped"], body["invalid_lines"]) == (2, 3, [2, 3, 4])
+
+    db = client.session_factory()
+    soup = db.query(Recipe).filter(Recipe.title == "Soup").one()
+    assert soup.updated_at.year > 2001
+    db.close()
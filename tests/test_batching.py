@@ -0,0 +1,108 @@
+import json
+
+from app import batching, reextract as reextract_module
+from app.archive import archive_page
+from app.batching import build_batch_prompt, extract_batch, pack_batches, parse_batch_response
+from app.crud import create_recipe_record
+from app.models import Recipe
+from app.reextract import reextract
+
+URLS = [f"https://blog.example.com/recipe-{i}" for i in range(5)]
+
+
+def _page(title):
+    return f"<html><body><h1>{title}</h1><p>2 cups flour</p><p>Bake for 20 minutes.</p></body></html>"
+
+
+def _item(number, url, title=None):
+    title = url.rstrip("/").rsplit("/", 1)[-1] if title is None else title
+    return {"page": number, "url": url, "title": title, "ingredients": "2 cups flour\\n1 egg"}
+
+
+def test_pack_batches_respects_token_budget_and_page_limit():
+    pages = [(url, "x" * 400) for url in URLS]
+    assert [len(batch) for batch in pack_batches(pages, token_budget=250, max_pages=8)] == [2, 2, 1]
+    assert [len(batch) for batch in pack_batches(pages, token_budget=10000, max_pages=3)] == [3, 2]
+    # A page over the budget still goes out, on its own
+    assert [len(batch) for batch in pack_batches([(URLS[0], "x" * 4000)] + pages[1:2], token_budget=100)] == [1, 1]
+
+
+def test_prompt_numbers_pages_with_their_urls():
+    prompt = build_batch_prompt([(URLS[0], "first page"), (URLS[1], "second page")])
+    assert f"=== PAGE 1 ===\nSource URL: {URLS[0]}" in prompt
+    assert f"=== PAGE 2 ===\nSource URL: {URLS[1]}" in prompt
+
+
+def test_response_is_split_back_per_url():
+    content = "```json\n" + json.dumps([
+        _item(2, URLS[1]),
+        _item(1, "http://blog.example.com/recipe-0/"),  # rewritten URL, matched by page number
+        _item(3, URLS[2], title=""),  # no recipe found
+        _item(2, URLS[1], title="Duplicate"),
+        _item(9, "https://elsewhere.example.com/"),
+    ]) + "\n```"
+
+    results = parse_batch_response(content, URLS[:3])
+    assert set(results) == {URLS[0], URLS[1]}
+    assert results[URLS[0]]["source_url"] == URLS[0]
+    assert results[URLS[1]]["title"] == "recipe-1"
+    assert results[URLS[1]]["ingredients"] == "2 cups flour\n1 egg"
+
+
+def test_only_missing_pages_are_retried_individually(monkeypatch):
+    requests, retried = [], []
+
+    def fake_batch(pages):
+        requests.append([url for url, _ in pages])
+        # The model skips the second page of every batch
+        return {url: {"title": url, "source_url": url} for i, (url, _) in enumerate(pages) if i != 1}
+
+    def fake_single(url, text):
+        retried.append(url)
+        return {"title": f"single {url}", "source_url": url}
+
+    monkeypatch.setattr(batching, "parse_batch_with_gemini", fake_batch)
+    monkeypatch.setattr(batching, "parse_with_gemini", fake_single)
+
+    results = extract_batch([(url, _page(url)) for url in URLS], max_pages=3, workers=2)
+    assert requests == [URLS[:3], URLS[3:]]
+    assert sorted(retried) == [URLS[1], URLS[4]]
+    assert results[URLS[0]]["title"] == URLS[0] and results[URLS[4]]["title"] == f"single {URLS[4]}"
+
+
+def test_failed_batch_falls_back_to_single_pages(monkeypatch):
+    def broken_batch(pages):
+        raise ValueError("Expecting value: line 1 column 1")
+
+    monkeypatch.setattr(batching, "parse_batch_with_gemini", broken_batch)
+    monkeypatch.setattr(batching, "parse_with_gemini", lambda url, text: {"title": "ok"} if url != URLS[2] else {})
+
+    results = extract_batch([(url, _page(url)) for url in URLS], max_pages=8)
+    assert set(results) == set(URLS)
+    assert results[URLS[2]] == {} and results[URLS[0]] == {"title": "ok"}
+
+
+def test_reextract_in_batch_mode(client, monkeypatch):
+    db = client.session_factory()
+    stale = create_recipe_record(db, title="Old", source_url=URLS[0], ingredients="old line")
+    empty = create_recipe_record(db, title="Kept", source_url=URLS[1], ingredients="kept")
+    archive_page(db, URLS[0], _page("New"), stale.id)
+    archive_page(db, URLS[1], _page("Nothing"), empty.id)
+    sent = []
+
+    def fake_batch(pages):
+        sent.append(len(pages))
+        return {URLS[0]: {"title": "New", "source_url": URLS[0], "ingredients": "2 cups flour"}}
+
+    monkeypatch.setattr(batching, "parse_batch_with_gemini", fake_batch)
+    monkeypatch.setattr(batching, "parse_with_gemini", lambda url, text: {})
+    # Batches run in this process; no worker pool is started for them
+    monkeypatch.setattr(reextract_module, "ProcessPoolExecutor", None)
+
+    stats = reextract(db, method="gemini", batch=True)
+    assert sent == [2]
+    assert (stats["changed"], stats["failed"]) == (1, 1)
+    db.expire_all()
+    assert db.get(Recipe, stale.id).ingredients == "2 cups flour"
+    assert db.get(Recipe, empty.id).ingredients == "kept"
+    db.close()
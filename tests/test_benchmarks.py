@@ -0,0 +1,16 @@
+from benchmarks.suite import compare
+from benchmarks.synthetic import make_recipes
+
+
+def test_synthetic_recipes_are_deterministic():
+    first = list(make_recipes(5, seed=1))
+    assert first == list(make_recipes(5, seed=1))
+    assert [r["id"] for r in first] == [1, 2, 3, 4, 5]
+    assert all(r["ingredients"].count("\n") >= 5 for r in first)
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    baseline = {"results": {"a[1]": {"median_ms": 10.0}, "b[1]": {"median_ms": 10.0}, "c[1]": {"median_ms": 10.0}}}
+    current = {"results": {"a[1]": {"median_ms": 11.0}, "b[1]": {"median_ms": 13.0}, "c[1]": {"median_ms": 5.0}}}
+
+    assert compare(current, baseline, threshold=0.2) == ["b[1]"]
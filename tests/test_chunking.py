@@ -0,0 +1,78 @@
+from app import ai_parser, chunking
+from app.chunking import merge_results, score_chunk, split_chunks, top_chunks
+
+RECIPE_CARD = """Lemon Herb Chicken
+Prep Time: 15 minutes
+Servings: 4
+Ingredients
+2 tablespoons olive oil
+1 1/2 pounds chicken thighs
+3 cloves garlic
+Instructions
+1. Preheat the oven and whisk the oil with the garlic.
+2. Roast the chicken for 30 minutes.
+"""
+
+
+def _long_page(paragraphs=120):
+    story = "\n".join(f"We went to the market on day {i} and it was lovely weather." for i in range(paragraphs))
+    return story + "\n" + RECIPE_CARD + "\nLeave a comment below!\n"
+
+
+def test_split_chunks_overlap_and_cover_the_page():
+    text = "\n".join(f"line {i:04d}" for i in range(2000))
+    chunks = split_chunks(text, size=3000, overlap=500)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 3000 for chunk in chunks)
+    assert chunks[0].startswith("line 0000") and chunks[-1].endswith("line 1999")
+    for before, after in zip(chunks, chunks[1:]):
+        assert after.splitlines()[0] in before
+
+
+def test_split_chunks_makes_progress_with_large_overlap():
+    text = "x" * 5000
+    assert "".join(chunk[:1] for chunk in split_chunks(text, size=100, overlap=100))
+
+
+def test_recipe_card_at_end_of_long_page_scores_highest():
+    chunks = split_chunks(_long_page(), size=2000, overlap=200)
+    best = max(range(len(chunks)), key=lambda i: score_chunk(chunks[i]))
+
+    assert best >= len(chunks) - 2
+    assert "2 tablespoons olive oil" in chunks[best]
+    assert [pos for pos, _, _ in top_chunks(chunks, 2)] == sorted(pos for pos, _, _ in top_chunks(chunks, 2))
+
+
+def test_merge_dedups_overlap_and_votes_on_title():
+    merged = merge_results([
+        (20.0, {"title": "Lemon Chicken", "ingredients": "2 tbsp olive oil\n3 cloves garlic", "servings": "4"}),
+        (30.0, {"title": "Lemon Herb Chicken", "ingredients": "3 Cloves garlic.\n1 lemon", "prep_time_minutes": 15}),
+        (25.0, {"title": "Lemon Herb Chicken", "instructions": "Roast."}),
+        (1.0, {"title": "Market Day", "ingredients": "sunshine"}),
+    ])
+
+    assert merged["title"] == "Lemon Herb Chicken"
+    assert merged["ingredients"].splitlines() == ["2 tbsp olive oil", "3 cloves garlic", "1 lemon"]
+    assert merged["prep_time_minutes"] == 15 and merged["servings"] == "4"
+    assert merged["cook_time_minutes"] is None and merged["image_url"] == ""
+
+
+def test_long_page_is_extracted_in_small_chunks(monkeypatch):
+    seen = []
+
+    def fake_parse(url, text, outcomes=None):
+        seen.append(len(text))
+        if "olive oil" not in text:
+            return {"title": "", "ingredients": "", "source_url": url}
+        return {"title": "Lemon Herb Chicken", "ingredients": "2 tablespoons olive oil", "source_url": url}
+
+    monkeypatch.setattr(ai_parser, "parse_with_ollama", fake_parse)
+    monkeypatch.setattr(ai_parser, "AI_CHUNK_THRESHOLD", 3000)
+    html = "<html><body>" + "".join(f"<p>{line}</p>" for line in _long_page(400).splitlines()) + "</body></html>"
+
+    result = ai_parser.parse_recipe_with_ai("https://blog.example.com/x", html, provider="ollama")
+
+    assert result["title"] == "Lemon Herb Chicken"
+    assert len(seen) == chunking.AI_CHUNK_TOP_K
+    assert max(seen) <= chunking.AI_CHUNK_SIZE < len(ai_parser.page_text(html))
@@ -0,0 +1,21 @@
+from app.database import async_url
+
+
+def test_async_url_swaps_in_async_drivers():
+    assert async_url("sqlite:///./recipes.db") == "sqlite+aiosqlite:///./recipes.db"
+    assert async_url("postgresql://u:p@db/recipes") == "postgresql+asyncpg://u:p@db/recipes"
+    assert async_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+
+def test_async_read_routes_see_sync_writes(client):
+    from app.crud import create_recipe_record
+
+    db = client.session_factory()
+    recipe = create_recipe_record(db, title="Pho", source_url="https://example.com/pho", new_category="Soup")
+    recipe_id = recipe.id
+    db.close()
+
+    assert "Pho" in client.get("/recipes").text
+    assert "Pho" in client.get(f"/recipes/{recipe_id}").text
+    assert "Soup" in client.get("/manual").text
+    assert client.get("/recipes/9999").status_code == 404
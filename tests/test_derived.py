@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.crud import create_recipe_record
+from app.derived import count_ingredients, derived_fields, parse_servings_range
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("4", (4, 4)),
+        ("Serves 6-8", (6, 8)),
+        ("4 to 6 servings", (4, 6)),
+        ("8–10 people", (8, 10)),
+        ("2 dozen cookies", (24, 24)),
+        ("Serves four", (4, 4)),
+        ("1 loaf", (1, 1)),
+        ("a big pot", (None, None)),
+        # Number words inside other words
+        ("often", (None, None)),
+        ("pork tenderloin", (None, None)),
+        ("none", (None, None)),
+        ("Serves eighteen", (None, None)),
+        ("Serves ten, often more", (10, 10)),
+        ("", (None, None)),
+    ],
+)
+def test_parse_servings_range(text, expected):
+    assert parse_servings_range(text) == expected
+
+
+def test_derived_fields():
+    ingredients = "For the dough:\n2 cups flour\n\n1 tsp salt\nFor the filling:\n3 apples"
+    assert count_ingredients(ingredients) == 3
+    assert derived_fields(15, None, "6", ingredients) == {
+        "total_time_minutes": 15, "servings_min": 6, "servings_max": 6, "ingredient_count": 3,
+    }
+    assert derived_fields(None, None, None, None)["total_time_minutes"] is None
+
+
+def test_recipes_filter_and_sort_on_derived_fields(client):
+    db = client.session_factory()
+    for title, prep, cook, servings in (
+        ("Salad", 10, 0, "2"),
+        ("Stir Fry", 10, 15, "4 servings"),
+        ("Lasagna", 30, 60, "8-10"),
+        ("Mystery Stew", None, None, "Serves 6"),
+    ):
+        create_recipe_record(
+            db, title=title, source_url=f"https://example.com/{title}", ingredients="1 onion\n2 carrots",
+            prep_time_minutes=prep, cook_time_minutes=cook, servings=servings,
+        )
+    db.close()
+
+    def titles(query):
+        resp = client.get(f"/recipes?{query}")
+        assert resp.status_code == 200
+        return [t for t in ("Salad", "Stir Fry", "Lasagna", "Mystery Stew") if f">{t}<" in resp.text]
+
+    page = client.get("/recipes?sort=quickest").text
+    assert page.index(">Salad<") < page.index(">Stir Fry<") < page.index(">Lasagna<") < page.index(">Mystery Stew<")
+    assert titles("max_time=30") == ["Salad", "Stir Fry"]
+    assert titles("min_servings=4&max_servings=6") == ["Stir Fry", "Mystery Stew"]
+    assert titles("category_id=&max_time=&q=") == ["Salad", "Stir Fry", "Lasagna", "Mystery Stew"]
+    assert titles("max_ingredients=1") == []
+    assert titles("max_ingredients=&max_servings=") == ["Salad", "Stir Fry", "Lasagna", "Mystery Stew"]
+    assert 'name="max_ingredients" min="1" value="2"' in client.get("/recipes?max_ingredients=2").text
+    assert client.get("/recipes?sort=tastiest").status_code == 400
+    assert client.get("/recipes?max_time=soon").status_code == 400
+
+    api = client.get("/api/v1/recipes?min_servings=7&fields=title,servings_min,servings_max,total_time_minutes").json()
+    assert api["items"] == [
+        {"id": 3, "title": "Lasagna", "servings_min": 8, "servings_max": 10, "total_time_minutes": 90},
+    ]
+
+
+def test_migration_backfills_existing_rows(tmp_path):
+    path = tmp_path / "migrate.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{path}"}
+
+    def alembic(*args):
+        subprocess.run([sys.executable, "-m", "alembic", *args], cwd=ROOT, env=env, check=True, capture_output=True)
+
+    alembic("upgrade", "0004_recipe_refresh")
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO recipes (title, source_url, ingredients, prep_time_minutes, cook_time_minutes, servings, check_failures, view_count) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0, 0)",
+            [(f"R{i}", f"https://example.com/{i}", "1 egg\n2 cups milk", 5, i, "4-6") for i in range(2500)],
+        )
+    alembic("upgrade", "head")
+
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute(
+            "SELECT total_time_minutes, servings_min, servings_max, ingredient_count FROM recipes ORDER BY id"
+        ).fetchall()
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT id FROM recipes WHERE total_time_minutes <= 30").fetchall()
+    assert len(rows) == 2500
+    assert rows[0] == (5, 4, 6, 2) and rows[-1] == (2504, 4, 6, 2)
+    assert "ix_recipes_total_time_minutes" in str(plan)
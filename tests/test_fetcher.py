@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from app import ai_parser, fetcher, importer, routing
+from app.fetcher import FixtureStore, fetch_page
+from benchmarks.fake_providers import fake_recipe, parse_profile
+from benchmarks.synthetic import make_html_page
+
+STRUCTURED_URL = "https://www.allrecipes.com/recipe/100001/lemon-herb-chicken/"
+BLOG_URL = "https://blog.example.com/lemon-herb-chicken"
+
+
+@pytest.fixture()
+def store(tmp_path, monkeypatch):
+    store = FixtureStore(str(tmp_path))
+    monkeypatch.setattr(fetcher, "FETCH_REPLAY_DIR", str(tmp_path))
+    monkeypatch.setattr(routing, "ROUTING_EXPLORE_RATE", 0.0)
+    return store
+
+
+def test_replay_serves_recorded_pages_without_network(store, monkeypatch):
+    import requests
+
+    monkeypatch.setattr(requests, "get", lambda *a, **kw: pytest.fail("network used in replay mode"))
+    store.save(BLOG_URL, "<html>recorded</html>")
+    store.save("https://blog.example.com/gone", "Not found", status=404)
+
+    assert fetch_page(BLOG_URL) == "<html>recorded</html>"
+    assert len(store) == 2
+    with pytest.raises(LookupError):
+        fetch_page("https://blog.example.com/gone")
+    with pytest.raises(LookupError):
+        fetch_page("https://blog.example.com/never-recorded")
+
+
+def test_import_uses_standard_scraper_on_structured_page(client, store, monkeypatch):
+    store.save(STRUCTURED_URL, make_html_page(random.Random(1), 5, title="Lemon Herb Chicken"))
+    monkeypatch.setattr(importer, "parse_recipe_with_ai", lambda *a, **kw: pytest.fail("AI fallback used"))
+
+    resp = client.post("/import", data={"url": STRUCTURED_URL})
+
+    assert resp.status_code == 200
+    assert "Recipe imported using STANDARD method" in resp.text
+    assert "Lemon Herb Chicken" in resp.text
+
+
+def test_import_falls_back_through_providers_on_one_fetch(client, store, monkeypatch):
+    store.save(BLOG_URL, make_html_page(random.Random(1), 5))
+    fetches, providers = [], []
+    real_fetch = importer.fetch_page
+    monkeypatch.setattr(importer, "fetch_page", lambda url: fetches.append(url) or real_fetch(url))
+    monkeypatch.setattr(ai_parser, "GEMINI_API_KEY", "fake")
+
+    def fake_parse(url, html, provider=None):
+        providers.append(provider)
+        return {} if provider == "gemini" else {**fake_recipe(f"Source URL: {url}"), "source_url": url}
+
+    monkeypatch.setattr(importer, "parse_recipe_with_ai", fake_parse)
+
+    resp = client.post("/import", data={"url": BLOG_URL})
+
+    assert "Recipe imported using OLLAMA method" in resp.text
+    assert "STANDARD and GEMINI failed" in resp.text
+    assert providers == ["gemini", "ollama"]
+    assert fetches == [BLOG_URL]
+
+
+def test_parse_profile_rejects_unknown_keys_and_modes():
+    assert parse_profile("latency=800,fail=0.1,mode=garbage") == {
+        "latency": 800.0, "jitter": 0.0, "fail": 0.1, "mode": "garbage", "token_ms": 0.0, "item_ms": 0.0,
+        "drop": 0.0,
+    }
+    with pytest.raises(ValueError):
+        parse_profile("speed=fast")
+    with pytest.raises(ValueError):
+        parse_profile("mode=explode")
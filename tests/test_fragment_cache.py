@@ -0,0 +1,87 @@
+import os
+from datetime import datetime
+
+from jinja2 import DictLoader, Environment
+
+from app.fragment_cache import FragmentCache, fragment_cache, install
+from app.models import Category, Recipe
+
+
+def test_lru_keeps_most_recent_entries():
+    cache = FragmentCache(max_entries=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+
+def test_disk_tier_survives_memory_eviction(tmp_path):
+    cache = FragmentCache(max_entries=1, disk_dir=str(tmp_path))
+    cache.set("a", "<p>A</p>")
+    cache.set("b", "<p>B</p>")
+
+    assert cache.get("a") == "<p>A</p>"
+    assert FragmentCache(max_entries=1, disk_dir=str(tmp_path)).get("b") == "<p>B</p>"
+
+
+def test_disk_tier_drops_least_recently_used_files(tmp_path):
+    cache = FragmentCache(max_entries=1, disk_dir=str(tmp_path), max_disk_entries=10)
+    for i in range(11):
+        cache.set(f"k{i}", f"<p>{i}</p>")
+        path = cache._disk_path(f"k{i}")
+        os.utime(path, (1000 + i, 1000 + i))
+
+    assert len(cache._disk_files()) == 9
+    assert cache.get("k0") is None and cache.get("k10") == "<p>10</p>"
+    assert FragmentCache(max_entries=1, disk_dir=str(tmp_path))._disk_entries == 9
+
+
+def test_fragment_rerenders_when_recipe_version_changes():
+    env = Environment(loader=DictLoader({"fragments/card.html": "{{ recipe.title }}"}), autoescape=True)
+    cache = FragmentCache(max_entries=10)
+    install(env, cache)
+    fragment = env.globals["fragment"]
+
+    recipe = Recipe(id=1, title="Soup & Bread")
+    assert fragment("card", recipe) == "Soup &amp; Bread"
+
+    recipe.title = "Stew"
+    assert fragment("card", recipe) == "Soup &amp; Bread"
+
+    recipe.updated_at = datetime(2026, 1, 2)
+    assert fragment("card", recipe) == "Stew"
+
+
+def test_fragment_rerenders_when_a_category_changes():
+    env = Environment(loader=DictLoader({
+        "fragments/card.html": "{% for c in recipe.categories %}{{ c.name }} {{ c.color }}{% endfor %}",
+    }))
+    install(env, FragmentCache(max_entries=10))
+    fragment = env.globals["fragment"]
+
+    dinner = Category(id=1, name="Dinner", color="#fff")
+    recipe = Recipe(id=1, title="Soup", updated_at=datetime(2026, 1, 2), categories=[dinner])
+    assert fragment("card", recipe) == "Dinner #fff"
+
+    dinner.name, dinner.color = "Supper", "#000"
+    assert fragment("card", recipe) == "Supper #000"
+    recipe.categories.append(Category(id=2, name="Soup"))
+    assert fragment("card", recipe) == "Supper #000Soup None"
+
+
+def test_list_page_uses_cached_cards(client):
+    client.post("/recipes", data={"title": "Soup", "source_url": "http://example.com/soup"})
+    fragment_cache.clear()
+
+    first = client.get("/recipes")
+    misses = fragment_cache.misses
+    second = client.get("/recipes")
+
+    assert "Soup" in first.text
+    assert second.text == first.text
+    assert fragment_cache.misses == misses
+    assert fragment_cache.hits >= 1
@@ -0,0 +1,205 @@
+import time
+
+import pytest
+
+from app import ai_parser, health, importer
+from app.health import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ProviderUnavailable, guard
+from app.models import ProviderStat
+
+BLOG_URL = "https://blog.example.com/lemon-herb-chicken"
+
+
+@pytest.fixture(autouse=True)
+def closed_breakers():
+    health.reset()
+    yield
+    health.reset()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_consecutive_failures_and_recovers_through_half_open():
+    clock = Clock()
+    breaker = CircuitBreaker("ollama", failure_threshold=3, reset_seconds=30, clock=clock)
+
+    breaker.record_failure("timeout")
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure("timeout")
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure("ConnectionError: refused")
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    # Only one trial call at a time
+    assert not breaker.allow()
+    breaker.record_failure("still down")
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.failures == 0
+
+
+def test_guard_refuses_calls_while_open():
+    calls = []
+    for _ in range(health.BREAKER_FAILURES):
+        with pytest.raises(ConnectionError):
+            with guard("ollama"):
+                calls.append(1)
+                raise ConnectionError("refused")
+
+    with pytest.raises(ProviderUnavailable, match="circuit open: ConnectionError: refused"):
+        with guard("ollama"):
+            calls.append(1)
+    assert len(calls) == health.BREAKER_FAILURES
+
+
+def test_parsers_raise_instead_of_returning_empty(monkeypatch):
+    # Nothing listens on port 9
+    monkeypatch.setattr(ai_parser, "OLLAMA_HOST", "http://127.0.0.1:9")
+    import requests
+
+    with pytest.raises(requests.ConnectionError):
+        ai_parser.parse_with_ollama(BLOG_URL, "page text")
+    assert health.breakers["ollama"].failures == 1
+
+
+def test_long_page_counts_as_one_breaker_outcome(monkeypatch):
+    calls = []
+
+    def fake_request(*args, **kwargs):
+        calls.append(1)
+        raise ConnectionError("refused")
+
+    import requests
+
+    monkeypatch.setattr(requests, "post", fake_request)
+    monkeypatch.setattr(ai_parser, "AI_CHUNK_THRESHOLD", 3000)
+    page = "\n".join(f"Step {i}. Stir the sauce and simmer for {i} minutes." for i in range(400))
+
+    with pytest.raises(ConnectionError):
+        ai_parser.parse_recipe_with_ai(BLOG_URL, f"<html><body><pre>{page}</pre></body></html>", provider="ollama")
+    assert len(calls) > 1
+    assert health.breakers["ollama"].failures == 1 and health.breakers["ollama"].state == CLOSED
+
+
+def test_bad_model_json_is_not_a_breaker_failure_on_either_path(monkeypatch):
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"message": {"content": "not json"}}
+
+    import requests
+
+    monkeypatch.setattr(requests, "post", lambda *args, **kwargs: Response())
+    monkeypatch.setattr(ai_parser, "AI_CHUNK_THRESHOLD", 3000)
+    page = "\n".join(f"Step {i}. Stir the sauce and simmer for {i} minutes." for i in range(400))
+
+    for html in ("<p>short page</p>", f"<html><body><pre>{page}</pre></body></html>"):
+        with pytest.raises(ValueError):
+            ai_parser.parse_recipe_with_ai(BLOG_URL, html, provider="ollama")
+    assert health.breakers["ollama"].failures == 0 and health.breakers["ollama"].state == CLOSED
+
+
+def test_interrupted_trial_call_releases_the_half_open_breaker():
+    clock = Clock()
+    health.breakers["ollama"] = CircuitBreaker("ollama", failure_threshold=1, reset_seconds=30, clock=clock)
+    health.breakers["ollama"].record_failure("timeout")
+    clock.now += 30
+
+    with pytest.raises(KeyboardInterrupt):
+        with guard("ollama"):
+            raise KeyboardInterrupt
+    assert health.breakers["ollama"].state == HALF_OPEN and health.breakers["ollama"].allow()
+
+
+def test_probes_trip_and_release_breakers(monkeypatch):
+    monkeypatch.setitem(health.PROBES, "ollama", lambda: (_ for _ in ()).throw(ConnectionError("refused")))
+    assert not health.probe("ollama")
+    assert health.breakers["ollama"].state == OPEN
+    with pytest.raises(ProviderUnavailable):
+        health.breakers["ollama"].check()
+
+    monkeypatch.setitem(health.PROBES, "ollama", lambda: None)
+    assert health.probe("ollama")
+    assert health.breakers["ollama"].state == HALF_OPEN
+    with guard("ollama"):
+        pass
+    assert health.breakers["ollama"].state == CLOSED
+
+
+def test_ollama_probe_requires_the_model(monkeypatch):
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"models": [{"name": "mistral:latest"}]}
+
+    import requests
+
+    monkeypatch.setattr(requests, "get", lambda url, timeout: Response())
+    with pytest.raises(RuntimeError, match="not pulled"):
+        health.probe_ollama()
+
+
+def test_healthz_reports_provider_state(client, monkeypatch):
+    monkeypatch.setattr(health, "configured", lambda: {"ollama": True, "gemini": False})
+    body = client.get("/healthz").json()
+    assert body["status"] == "ok" and body["database"] == {"ok": True}
+    assert body["providers"]["ollama"]["state"] == "closed"
+
+    health.breakers["ollama"].trip("probe failed: ConnectionError")
+    health.breakers["gemini"].trip("GEMINI_API_KEY not set")
+    resp = client.get("/healthz")
+    body = resp.json()
+    assert resp.status_code == 200 and body["status"] == "degraded"
+    assert body["providers"]["ollama"]["last_error"] == "probe failed: ConnectionError"
+    assert body["providers"]["gemini"]["configured"] is False
+
+
+def test_import_skips_open_providers_in_milliseconds(client, monkeypatch):
+    monkeypatch.setattr(importer, "fetch_page", lambda url: "<html><body>No schema here</body></html>")
+    monkeypatch.setattr(ai_parser, "GEMINI_API_KEY", "fake")
+    monkeypatch.setattr(ai_parser, "get_genai", lambda: pytest.fail("Gemini called while its circuit is open"))
+    for name in ("gemini", "ollama"):
+        health.breakers[name].trip("probe failed")
+
+    start = time.perf_counter()
+    resp = client.post("/import", data={"url": BLOG_URL})
+    assert time.perf_counter() - start < 1.0
+    assert "Gemini is unavailable" in resp.text
+
+    db = client.session_factory()
+    assert [row.provider for row in db.query(ProviderStat)] == ["standard"]
+    db.close()
+
+
+def test_import_skips_unconfigured_gemini_without_recording_it(client, monkeypatch):
+    monkeypatch.setattr(importer, "fetch_page", lambda url: "<html><body>No schema here</body></html>")
+    monkeypatch.setattr(ai_parser, "GEMINI_API_KEY", "")
+    tried = []
+
+    def fake_ai(url, html, provider=None):
+        tried.append(provider)
+        raise ConnectionError("refused")
+
+    monkeypatch.setattr(importer, "parse_recipe_with_ai", fake_ai)
+    resp = client.post("/import", data={"url": BLOG_URL})
+    assert "Gemini: not configured" in resp.text
+    assert tried == ["ollama"]
+
+    db = client.session_factory()
+    assert sorted(row.provider for row in db.query(ProviderStat)) == ["ollama", "standard"]
+    db.close()
@@ -0,0 +1,58 @@
+def _create(client, title="Soup"):
+    resp = client.post(
+        "/recipes",
+        data={"title": title, "source_url": "http://example.com/" + title.lower()},
+        follow_redirects=False,
+    )
+    assert resp.status_code == 303
+    return resp.headers["location"]
+
+
+def test_recipe_detail_returns_304_for_matching_etag(client):
+    location = _create(client)
+
+    first = client.get(location)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    second = client.get(location, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+
+    third = client.get(location, headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert third.status_code == 304
+
+
+def test_recipe_list_etag_changes_after_create(client):
+    _create(client, "Soup")
+    first = client.get("/recipes")
+    etag = first.headers["etag"]
+    assert client.get("/recipes", headers={"If-None-Match": etag}).status_code == 304
+
+    # Different query parameters render a different page
+    assert client.get("/recipes?q=soup", headers={"If-None-Match": etag}).status_code == 200
+
+    _create(client, "Salad")
+    after = client.get("/recipes", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["etag"] != etag
+    assert "Salad" in after.text
+
+
+def test_missing_recipe_is_404(client):
+    assert client.get("/recipes/999").status_code == 404
+
+
+def test_list_etag_is_the_same_in_every_worker(client, monkeypatch):
+    from app import http_cache
+
+    _create(client, "Soup")
+    etag = client.get("/recipes").headers["etag"]
+    # A second worker (or a restarted one) derives the same build id from the templates
+    assert http_cache._build_id() == http_cache.BUILD_ID
+    assert client.get("/recipes", headers={"If-None-Match": etag}).status_code == 304
+
+    monkeypatch.setattr(http_cache, "BUILD_ID", "next-deploy")
+    assert client.get("/recipes", headers={"If-None-Match": etag}).status_code == 200
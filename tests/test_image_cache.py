@@ -0,0 +1,138 @@
+from io import BytesIO
+
+import pytest
+import requests
+from PIL import Image
+
+from app import image_cache
+from app.image_cache import ImageCache, download_image, resize_variants
+
+
+@pytest.fixture(autouse=True)
+def public_hosts(monkeypatch):
+    # example.com's address, without a DNS lookup
+    monkeypatch.setattr(image_cache, "_addresses", lambda host: ["93.184.216.34"])
+
+
+class FakeResponse:
+    def __init__(self, data=b"", headers=None, status=200):
+        self.data = data
+        self.headers = headers or {}
+        self.is_redirect = status in (301, 302, 303, 307, 308)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        for start in range(0, len(self.data), size):
+            yield self.data[start:start + size]
+
+
+def _png(width, height, color="red"):
+    out = BytesIO()
+    Image.new("RGB", (width, height), color).save(out, format="PNG")
+    return out.getvalue()
+
+
+def test_resize_variants_fit_bounding_box():
+    variants = resize_variants(_png(2400, 1800))
+
+    with Image.open(BytesIO(variants["thumb"])) as thumb:
+        assert thumb.size == (480, 360)
+    with Image.open(BytesIO(variants["detail"])) as detail:
+        assert detail.size == (1200, 900)
+
+
+def test_get_fetches_once_and_dedupes_by_content(tmp_path, monkeypatch):
+    cache = ImageCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    data = _png(800, 600)
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        return FakeResponse(data)
+
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    path, digest = cache.get("http://a.example/img.png", "thumb")
+    assert path.exists()
+    assert cache.get("http://a.example/img.png", "detail")[1] == digest
+    assert calls == ["http://a.example/img.png"]
+
+    # A second URL serving the same bytes shares the stored blob
+    other_path, other_digest = cache.get("http://b.example/img.png", "thumb")
+    assert other_digest == digest
+    assert other_path == path
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=250)
+    a = tmp_path / "blobs" / "aa" / "a-thumb.jpg"
+    b = tmp_path / "blobs" / "bb" / "b-thumb.jpg"
+    c = tmp_path / "blobs" / "cc" / "c-thumb.jpg"
+
+    cache._store(a, b"x" * 100)
+    cache._store(b, b"x" * 100)
+    cache._touch(a)
+    cache._store(c, b"x" * 100)
+
+    assert a.exists()
+    assert not b.exists()
+    assert c.exists()
+
+
+@pytest.mark.parametrize("url", ["file:///etc/passwd", "ftp://a.example/x.png", "http:///x.png"])
+def test_download_refuses_other_schemes(url):
+    with pytest.raises(ValueError, match="http"):
+        download_image(url)
+
+
+@pytest.mark.parametrize("address", ["127.0.0.1", "10.0.0.5", "169.254.169.254", "::1"])
+def test_download_refuses_private_hosts_and_redirects_to_them(monkeypatch, address):
+    monkeypatch.setattr(image_cache, "_addresses", lambda host: [address] if host == "internal" else ["93.184.216.34"])
+    monkeypatch.setattr(requests, "get", lambda url, **kwargs: FakeResponse(
+        headers={"location": "http://internal/admin.png"}, status=302,
+    ))
+    with pytest.raises(ValueError, match="private"):
+        download_image("http://internal/x.png")
+    with pytest.raises(ValueError, match="private"):
+        download_image("http://a.example/x.png")
+
+
+def test_download_caps_size(monkeypatch):
+    monkeypatch.setattr(image_cache, "IMAGE_MAX_BYTES", 1000)
+    monkeypatch.setattr(requests, "get", lambda url, **kwargs: FakeResponse(headers={"content-length": "5000"}))
+    with pytest.raises(ValueError, match="too large"):
+        download_image("http://a.example/x.png")
+
+    # A missing or understated Content-Length is caught while reading
+    monkeypatch.setattr(requests, "get", lambda url, **kwargs: FakeResponse(b"x" * 5000))
+    with pytest.raises(ValueError, match="too large"):
+        download_image("http://a.example/x.png")
+
+
+def test_resize_refuses_huge_images(monkeypatch):
+    monkeypatch.setattr(image_cache, "IMAGE_MAX_PIXELS", 100 * 100)
+    with pytest.raises(ValueError, match="too large"):
+        resize_variants(_png(200, 200))
+
+
+def test_image_route_honours_weak_and_listed_etags(client, tmp_path, monkeypatch):
+    from app import main
+
+    path = tmp_path / "thumb.jpg"
+    path.write_bytes(b"jpeg")
+    monkeypatch.setattr(main.image_cache, "get", lambda url, size: (path, "ab" * 32))
+    client.post("/recipes", data={"title": "Soup", "source_url": "http://example.com/soup",
+                                  "image_url": "http://example.com/soup.jpg"})
+
+    etag = client.get("/images/1").headers["etag"]
+    for header in (etag, f"W/{etag}", f'"other", {etag}'):
+        assert client.get("/images/1", headers={"If-None-Match": header}).status_code == 304
+    assert client.get("/images/1", headers={"If-None-Match": '"other"'}).status_code == 200
@@ -0,0 +1,152 @@
+import random
+from collections import Counter
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import fetcher, refresh, routing
+from app.crud import create_recipe_record
+from app.fetcher import FixtureStore
+from app.models import Recipe, RecipeRevision
+from app.refresh import (
+    acquire_scheduler_lock, due_recipes, flush_views, interleave_hosts, record_view, refresh_recipe,
+    release_scheduler_lock, run_once,
+)
+from benchmarks.synthetic import make_html_page
+
+URL = "https://www.allrecipes.com/recipe/100001/lemon-herb-chicken/"
+
+
+@pytest.fixture()
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetcher, "FETCH_REPLAY_DIR", str(tmp_path))
+    monkeypatch.setattr(routing, "ROUTING_EXPLORE_RATE", 0.0)
+    return FixtureStore(str(tmp_path))
+
+
+@pytest.fixture()
+def db(client, monkeypatch):
+    # Views buffered by detail-page requests in other tests
+    monkeypatch.setattr(refresh, "_views", Counter())
+    session = client.session_factory()
+    yield session
+    session.close()
+
+
+def _recipe(db, url=URL, title="Lemon Herb Chicken"):
+    return create_recipe_record(db, title=title, source_url=url, ingredients="1 lemon", instructions="Roast.").id
+
+
+def test_refresh_skips_unchanged_pages_and_records_diffs(client, db, store):
+    recipe_id = _recipe(db)
+    store.save(URL, make_html_page(random.Random(1), 5, title="Lemon Herb Chicken"), etag='"v1"')
+    updated_at = db.get(Recipe, recipe_id).updated_at
+
+    assert refresh_recipe(db, recipe_id) == "baseline"
+    assert refresh_recipe(db, recipe_id) == "not_modified"
+    db.expire_all()
+    recipe = db.get(Recipe, recipe_id)
+    assert (recipe.source_etag, recipe.source_status) == ('"v1"', "ok")
+    assert recipe.updated_at == updated_at
+
+    # Same text under a new ETag is not re-extracted
+    store.save(URL, make_html_page(random.Random(1), 5, title="Lemon Herb Chicken"), etag='"v2"')
+    assert refresh_recipe(db, recipe_id) == "unchanged"
+
+    store.save(URL, make_html_page(random.Random(2), 7, title="Lemon Herb Chicken"), etag='"v3"')
+    assert refresh_recipe(db, recipe_id) == "changed"
+    revision = db.query(RecipeRevision).filter_by(recipe_id=recipe_id).one()
+    assert revision.status == "pending" and revision.method == "standard"
+
+    listed = client.get("/api/v1/revisions").json()
+    assert [r["id"] for r in listed] == [revision.id]
+    assert set(listed[0]["changes"]) >= {"ingredients", "instructions"}
+    assert "title" not in listed[0]["changes"]
+
+    assert client.post(f"/api/v1/revisions/{revision.id}/apply").json()["status"] == "applied"
+    assert client.post(f"/api/v1/revisions/{revision.id}/reject").status_code == 409
+    db.expire_all()
+    assert db.get(Recipe, recipe_id).ingredients == listed[0]["changes"]["ingredients"]["new"]
+
+
+def test_removed_pages_are_marked_gone_and_not_revisited(db, store):
+    recipe_id = _recipe(db)
+    store.save(URL, "Not found", status=404)
+
+    assert refresh_recipe(db, recipe_id) == "gone"
+    db.get(Recipe, recipe_id).last_checked_at = datetime.utcnow() - timedelta(days=365)
+    db.commit()
+    assert due_recipes(db) == []
+
+
+def test_due_recipes_priority(db):
+    old, fresh, popular, never = (_recipe(db, f"https://site{i}.example.com/r") for i in range(4))
+    now = datetime.utcnow()
+    for recipe_id, checked in ((old, now - timedelta(days=30)), (fresh, now), (popular, now - timedelta(days=10))):
+        db.get(Recipe, recipe_id).last_checked_at = checked
+    db.commit()
+    for _ in range(3):
+        record_view(popular)
+    flush_views(db)
+
+    assert [i for i, _ in due_recipes(db, priority="oldest")] == [never, old, popular]
+    assert [i for i, _ in due_recipes(db, priority="views")] == [popular, never, old]
+
+
+def test_detail_views_are_written_without_the_scheduler(client, db, monkeypatch):
+    recipe_id = _recipe(db)
+    monkeypatch.setattr(refresh, "VIEW_FLUSH_SECONDS", 3600)
+    monkeypatch.setattr(refresh, "_views_flushed_at", time.monotonic())
+    client.get(f"/recipes/{recipe_id}")
+    assert db.get(Recipe, recipe_id).view_count == 0
+
+    monkeypatch.setattr(refresh, "VIEW_FLUSH_SECONDS", 0)
+    client.get(f"/recipes/{recipe_id}")
+    db.expire_all()
+    assert db.get(Recipe, recipe_id).view_count == 2
+
+
+def test_only_one_process_holds_the_scheduler_lock(tmp_path):
+    path = str(tmp_path / "refresh.lock")
+    assert acquire_scheduler_lock(path)
+    try:
+        # A second open file description conflicts just as another worker's would
+        assert not acquire_scheduler_lock(path)
+    finally:
+        release_scheduler_lock()
+    assert acquire_scheduler_lock(path)
+    release_scheduler_lock()
+
+
+def test_interleave_hosts_round_robins():
+    items = [(1, "https://a.com/1"), (2, "https://a.com/2"), (3, "https://a.com/3"), (4, "https://b.com/1")]
+    assert [i for i, _ in interleave_hosts(items)] == [1, 4, 2, 3]
+
+
+def test_run_once_caps_concurrency_per_host(client, monkeypatch):
+    db = client.session_factory()
+    for i in range(6):
+        _recipe(db, f"https://www.slow.example.com/r{i}")
+    _recipe(db, "https://other.example.com/r")
+    db.close()
+
+    active, peak, lock = {}, {}, threading.Lock()
+
+    def fake_fetch(url, etag=None, last_modified=None):
+        host = routing.domain_of(url)
+        with lock:
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+        time.sleep(0.02)
+        with lock:
+            active[host] -= 1
+        return {"status": 304, "html": None, "etag": None, "last_modified": None}
+
+    monkeypatch.setattr(refresh, "fetch_if_changed", fake_fetch)
+    outcomes = run_once(client.session_factory, workers=4, rate_per_minute=0, per_host=2)
+
+    assert outcomes == {"not_modified": 7}
+    assert peak["slow.example.com"] == 2
+    assert run_once(client.session_factory) == {}
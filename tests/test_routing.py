@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from app import ai_parser, importer, metrics, routing
+from app.models import ProviderStat
+from app.routing import domain_of, plan, record_attempts
+
+BLOG_URL = "https://www.blog.example.com/lemon-herb-chicken"
+
+
+@pytest.fixture()
+def db(client, monkeypatch):
+    monkeypatch.setattr(routing, "ROUTING_EXPLORE_RATE", 0.0)
+    session = client.session_factory()
+    yield session
+    session.close()
+
+
+def _attempts(provider, ok, latency_ms, count=1, completeness=1.0):
+    return [{"provider": provider, "ok": ok, "latency_ms": latency_ms, "completeness": completeness if ok else 0.0}] * count
+
+
+def test_domain_of_strips_www_and_port():
+    assert domain_of("https://www.Allrecipes.com/recipe/1/") == "allrecipes.com"
+    assert domain_of("http://blog.example.com:8080/x") == "blog.example.com"
+
+
+def test_unknown_domain_uses_default_order(db):
+    assert plan(db, "new.example.com") == (["standard", "gemini", "ollama"], "default")
+
+
+def test_default_order_without_valid_names_falls_back_to_every_provider(db, monkeypatch):
+    assert routing.parse_default_order("gemini, nope,gemini,standard") == ["gemini", "standard"]
+    monkeypatch.setattr(routing, "ROUTING_DEFAULT_ORDER", routing.parse_default_order("chatgpt,,"))
+    assert plan(db, "new.example.com") == (["standard", "gemini", "ollama"], "default")
+
+
+def test_failing_method_moves_last_and_fastest_reliable_goes_first(db):
+    record_attempts(db, "blog.example.com", _attempts("standard", False, 40, count=5))
+    record_attempts(db, "blog.example.com", _attempts("gemini", True, 900, count=4))
+    record_attempts(db, "blog.example.com", _attempts("ollama", True, 3000, count=4))
+
+    assert plan(db, "blog.example.com") == (["gemini", "ollama", "standard"], "learned")
+    row = db.query(ProviderStat).filter_by(domain="blog.example.com", provider="standard").one()
+    assert (row.attempts, row.successes) == (5, 0)
+
+
+def test_sparse_results_rank_below_complete_ones(db):
+    record_attempts(db, "sparse.example.com", _attempts("gemini", True, 800, count=4, completeness=0.2))
+    record_attempts(db, "sparse.example.com", _attempts("ollama", True, 1500, count=4, completeness=1.0))
+
+    order, _ = plan(db, "sparse.example.com")
+    assert order.index("ollama") < order.index("gemini")
+
+
+def test_override_and_exploration(db, monkeypatch):
+    monkeypatch.setattr(routing, "_overrides", routing.parse_overrides("example.com=ollama,gemini;bad=nope"))
+    assert plan(db, "blog.example.com") == (["ollama", "gemini"], "override")
+    assert "bad" not in routing._overrides
+
+    monkeypatch.setattr(routing, "ROUTING_EXPLORE_RATE", 1.0)
+    order, reason = plan(db, "other.org", rng=random.Random(3))
+    assert reason == "explore"
+    assert order[0] != "standard" and sorted(order) == ["gemini", "ollama", "standard"]
+
+
+def test_import_learns_to_skip_failing_scraper(client, db, monkeypatch):
+    monkeypatch.setattr(importer, "fetch_page", lambda url: "<html><body>No schema here</body></html>")
+    monkeypatch.setattr(ai_parser, "GEMINI_API_KEY", "fake")
+    monkeypatch.setattr(
+        importer, "parse_recipe_with_ai",
+        lambda url, html, provider=None: {"title": "Soup", "ingredients": "water", "source_url": url},
+    )
+    metrics.reset()
+
+    for _ in range(routing.ROUTING_MIN_ATTEMPTS):
+        assert "STANDARD failed" in client.post("/import", data={"url": BLOG_URL}).text
+    resp = client.post("/import", data={"url": BLOG_URL})
+
+    assert "Recipe imported using GEMINI method." in resp.text
+    assert "failed, used" not in resp.text
+    assert metrics.value("import_route_decisions_total", reason="learned", first="gemini") == 1
+    assert 'import_attempts_total{outcome="failure",provider="standard"} 3' in client.get("/metrics").text
+
+    stats = client.get("/api/v1/routing/www.blog.example.com").json()
+    assert stats["domain"] == "blog.example.com"
+    assert [s["provider"] for s in stats["stats"]] == ["gemini", "standard"]
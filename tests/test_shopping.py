@@ -0,0 +1,134 @@
+import pytest
+
+from app.crud import create_recipe_record
+from app.shopping import aggregate, format_amount, parse_line, parse_selection, section_for
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("2 cups all-purpose flour", (2.0, "cup", "all-purpose flour", "all-purpose flour")),
+        ("1 1/2 Tbsp. olive oil", (1.5, "tbsp", "olive oil", "olive oil")),
+        ("1½ cups sugar", (1.5, "cup", "sugar", "sugar")),
+        ("2-3 cloves garlic, minced", (3.0, "clove", "garlic", "garlic")),
+        ("2 (14 oz) cans diced tomatoes", (2.0, "can", "diced tomatoes", "diced tomato")),
+        ("3 large eggs", (3.0, None, "large eggs", "large egg")),
+        ("salt to taste", (None, None, "salt to taste", "salt to taste")),
+    ],
+)
+def test_parse_line(line, expected):
+    assert parse_line(line) == expected
+
+
+def test_format_amount_is_safe_on_non_finite_values():
+    assert format_amount(float("inf")) == "inf" and format_amount(float("nan")) == "nan"
+
+
+def test_format_amount_uses_kitchen_fractions():
+    assert [format_amount(v) for v in (0.5, 1.3333, 2.98, 0.02, 4)] == ["1/2", "1 1/3", "3", "0.02", "4"]
+
+
+def test_aggregate_merges_within_unit_families():
+    sections = aggregate([
+        ("1 cup whole milk", 1.0, 1),
+        ("8 tablespoons whole milk", 1.0, 2),
+        ("1 egg", 2.0, 1),
+        ("2 eggs", 1.0, 2),
+        ("500 g ground beef", 1.0, 1),
+        ("1 kg ground beef", 1.0, 2),
+        ("2 cups flour", 1.0, 1),
+        ("100 g flour", 1.0, 2),
+    ])
+    items = {(item["name"], item["unit"]): item for section in sections for item in section["items"]}
+
+    assert items[("whole milk", "cup")]["display"] == "1 1/2 cups whole milk"
+    assert items[("egg", None)]["quantity"] == 4
+    assert items[("ground beef", "kg")]["display"] == "1 1/2 kg ground beef"
+    # Volume and weight cannot be merged without a density
+    assert ("flour", "cup") in items and ("flour", "g") in items
+    assert [s["section"] for s in sections] == ["Meat & Seafood", "Dairy & Eggs", "Baking"]
+
+
+@pytest.mark.parametrize(
+    "key, section",
+    [
+        ("eggplant", "Produce"),
+        ("butternut squash", "Produce"),
+        ("peanut butter", "Pantry"),
+        ("boiling water", "Other"),
+        ("foil", "Other"),
+        ("large egg", "Dairy & Eggs"),
+        ("unsalted butter", "Dairy & Eggs"),
+        ("olive oil", "Pantry"),
+        ("bell pepper", "Produce"),
+    ],
+)
+def test_section_for_matches_whole_words(key, section):
+    assert section_for(key) == section
+
+
+def test_parse_selection():
+    assert parse_selection("12:6, 15,20:2.5") == [(12, 6.0), (15, None), (20, 2.5)]
+    with pytest.raises(ValueError):
+        parse_selection("twelve")
+
+
+@pytest.mark.parametrize("servings", ["inf", "nan", "1e308", "-2", "0"])
+def test_shopping_list_rejects_bad_servings(client, servings):
+    with pytest.raises(ValueError):
+        parse_selection(f"1:{servings}")
+    assert client.get(f"/shopping-list?recipes=1:{servings}").status_code == 400
+    assert client.post("/api/v1/shopping-list", json={"recipes": [{"id": 1, "servings": servings}]}).status_code == 422
+
+
+def test_shopping_list_scales_to_target_servings(client):
+    db = client.session_factory()
+    soup = create_recipe_record(
+        db, title="Soup", source_url="https://example.com/soup",
+        ingredients="2 cups chicken broth\n1 onion, diced\nsalt to taste", instructions="", servings="4 servings",
+    )
+    stew = create_recipe_record(
+        db, title="Stew", source_url="https://example.com/stew",
+        ingredients="1 quart chicken broth\n2 onions", instructions="", servings="6",
+    )
+    soup_id, stew_id = soup.id, stew.id
+    db.close()
+
+    resp = client.post(
+        "/api/v1/shopping-list",
+        json={"recipes": [{"id": soup_id, "servings": 8}, {"id": stew_id}, {"id": 999}]},
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    items = {item["name"]: item for section in body["sections"] for item in section["items"]}
+
+    assert body["missing_ids"] == [999]
+    assert [r["scale"] for r in body["recipes"]] == [2.0, 1.0]
+    assert items["chicken broth"]["display"] == "8 cups chicken broth"
+    assert items["onion"]["quantity"] == 4
+    assert items["salt to taste"]["quantity"] is None
+
+    page = client.get(f"/shopping-list?recipes={soup_id}:8,{stew_id}")
+    assert page.status_code == 200 and "8 cups chicken broth" in page.text
+    assert client.get("/shopping-list?recipes=abc").status_code == 400
+
+
+def test_shopping_list_reads_servings_like_derived_fields(client):
+    db = client.session_factory()
+    cookies = create_recipe_record(
+        db, title="Cookies", source_url="https://example.com/cookies",
+        ingredients="2 cups flour", instructions="", servings="2 dozen cookies",
+    )
+    bread = create_recipe_record(
+        db, title="Bread", source_url="https://example.com/bread",
+        ingredients="3 cups flour", instructions="", servings="a loaf",
+    )
+    cookies_id, bread_id = cookies.id, bread.id
+    db.close()
+
+    body = client.post(
+        "/api/v1/shopping-list", json={"recipes": [{"id": cookies_id, "servings": 48}, {"id": bread_id, "servings": 4}]},
+    ).json()
+    assert body["recipes"][0]["scale"] == 2.0 and not body["recipes"][0]["unscaled"]
+    assert body["recipes"][1] == {"id": bread_id, "title": "Bread", "servings": None, "scale": 1.0, "unscaled": True}
+    assert "not scaled" in client.get(f"/shopping-list?recipes={bread_id}:4").text